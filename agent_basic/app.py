@@ -83,8 +83,14 @@ async def messages(req: Request) -> Response:
         logger.error(traceback.format_exc())
         return Response(status=HTTPStatus.INTERNAL_SERVER_ERROR)
 
+async def on_cleanup(app: web.Application):
+    # Close the agent's trace so the last run is written out
+    if BOT.mcp_client:
+        await BOT.mcp_client.cleanup()
+
 APP = web.Application()
 APP.router.add_post("/api/messages", messages)
+APP.on_cleanup.append(on_cleanup)
 
 if __name__ == "__main__":
     try:
@@ -286,7 +286,7 @@ class TeamsConversationBot(ActivityHandler):
             
             # Process query and get result
             self.logger.info("Calling MCP client process_query...")
-            result = await self.mcp_client.process_query(query)
+            result, history = await self.mcp_client.process_query(query)
             self.logger.debug(f"Query processing result: {result}")
             
             # Update card with result
@@ -295,8 +295,8 @@ class TeamsConversationBot(ActivityHandler):
                 title="✅ Agent Processing Complete",
                 subtitle="Query processed successfully",
                 text=f"Query: {query}\n\nResult: {result}\n\nExecution Steps:\n" + 
-                     "\n".join([f"- {step['tool']}: {step['result']}" 
-                               for step in self.mcp_client.execution_history.steps])
+                     "\n".join([f"- {step['function']}: {step['result']}" 
+                               for step in history.steps])
             )
             
             self.logger.info("Sending final result activity...")
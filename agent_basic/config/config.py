@@ -1,5 +1,6 @@
 # eag4/math_agent/config.py
 import os
+import sys
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -26,6 +27,61 @@ class Config:
     LAPTOP_MONITOR_TOOLBAR_RECTANGLE_Y_POS = 130
     PAINT_CANVAS_WIDTH = 1030
     PAINT_CANVAS_HEIGHT = 632
+    # Tool groups mounted by the math/paint MCP server
+    MCP_TOOLSETS = [name.strip() for name in os.getenv("MCP_TOOLSETS", "math,paint").split(",") if name.strip()]
+    # "mspaint" drives Microsoft Paint (Windows only), "pillow" draws on a headless in-memory canvas
+    PAINT_BACKEND = os.getenv("PAINT_BACKEND", "mspaint" if sys.platform == "win32" else "pillow")
+    CANVAS_FONT_SIZE = 24
+    # UI driver of the mspaint backend, "fake" simulates Paint for benchmarks on any platform
+    UI_DRIVER = os.getenv("PAINT_UI_DRIVER", "pywinauto")
+    # Longest wait for a Paint window state, and pause after input with no state to wait on
+    UI_WAIT_TIMEOUT = 10.0
+    UI_SETTLE_SECONDS = 0.1
+    # Display lists built with begin_scene / commit_scene
+    MAX_SCENE_OPERATIONS = 200
+    MAX_OPEN_SCENES = 16
+    # Layout presets of the render_result tool, sizes in canvas pixels
+    RENDER_STYLES = {
+        "default": {"inset": 40, "padding": 24, "min_font_size": 12, "max_font_size": 96},
+        "large": {"inset": 20, "padding": 16, "min_font_size": 24, "max_font_size": 160},
+        "compact": {"inset": 80, "padding": 24, "min_font_size": 10, "max_font_size": 48},
+    }
+    # Largest array accepted by the vectorized math tools
+    MAX_ARRAY_LENGTH = 1_000_000
+    # Integer results larger than this are summarized, kept below Python's
+    # default 4300 digit int/str conversion limit
+    MAX_RESULT_DIGITS = 4000
+    # Total digits of the list returned by fibonacci_numbers, large lists go
+    # to the result store; longer sequences are paged with fibonacci_sequence_chunk
+    FIBONACCI_LIST_MAX_DIGITS = 1_000_000
+    # Largest number of entries accepted by the batch_call tool
+    MAX_BATCH_CALLS = 100
+    # determine_datatype limits: elements counted per container, nesting depth
+    # inspected and the longest list/dict literal that is parsed at all
+    DATATYPE_MAX_ELEMENTS = 10_000
+    DATATYPE_MAX_DEPTH = 32
+    DATATYPE_MAX_PARSE_LENGTH = 5_000_000
+    # Only inputs up to this length are kept in the classification cache
+    DATATYPE_CACHE_MAX_LENGTH = 1024
+    # Worker processes for CPU-heavy math tools, per-call CPU-time limit, and
+    # the estimated cost (bigint.py digit operations, ~0.25ns each) below which
+    # a call runs inline on the loop; tools listed in MCP_WORKER_TOOLS always
+    # run in the pool
+    WORKER_POOL_SIZE = max(1, (os.cpu_count() or 2) - 1)
+    WORKER_CPU_SECONDS = 10
+    WORKER_INLINE_COST = 5_000_000
+    WORKER_TOOLS = {name.strip() for name in os.getenv("MCP_WORKER_TOOLS", "").split(",") if name.strip()}
+    # Tool results serialized larger than RESULT_INLINE_BYTES are stored on the
+    # math server and returned as result://{id} handles, read back in pages
+    RESULT_INLINE_BYTES = 4096
+    RESULT_PAGE_BYTES = 4096
+    RESULT_STORE_MAX_BYTES = 64 * 1024 * 1024
+    # On-disk cache and thread pool of the thumbnail tools
+    THUMBNAIL_CACHE_DIR = os.getenv("THUMBNAIL_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "mcp_thumbnails"))
+    THUMBNAIL_WORKERS = 4
+    THUMBNAIL_WEBP_QUALITY = 80
+    # Record LLM and MCP traffic of every run to this file (.jsonl or .jsonl.zst)
+    TRACE_PATH = os.getenv("AGENT_TRACE_PATH", "")
     #DESKTOP_MONITOR_RESOLUTION = (1920, 1080)
     #LAPTOP_MONITOR_RESOLUTION = (2496, 1664)
 
@@ -37,7 +93,7 @@ You are a math agent who helps visually impaired individuals. Such visually impa
 Goal:
 Your goal is to understand the math problem and solve it step-by-step via reasoning, you have access to mathematical tools and you determine the steps, required tools and parameters for the tools to be used. Once you have the result of the math problem, you then display the result on a canvas with appropriate dimensions, colour contrast, font size and text formatting. 
 
-The canvas is a rectangular drawing area which is contained within the screen resolution and is available at a specific co-ordinate on the screen for drawing. You first determine the (x,y) co-ordinates for drawing the elements on the canvas, and then determine the width and height parameters for the elements based on the dimensions of the canvas. You first draw a boundary around the canvas, and then draw the result on the canvas. 
+The canvas is a rectangular drawing area which is contained within the screen resolution and is available at a specific co-ordinate on the screen for drawing. To display the result, open the canvas with open_paint and then call render_result ONCE with the result text. render_result measures the text, picks the font size, centers the result and draws a boundary smaller than the canvas, so you do not compute co-ordinates, width or height yourself. Only use draw_rectangle, add_text_in_paint or the scene tools for additional elements. 
 
 Finally you send an email to the user with the following details:
 - Initial Plan - This section should contain ALL DETAILS of the plan that you created in the first step.
@@ -175,6 +231,9 @@ Important:
 - Make sure that the email has REASONING details for each step and the reasoning is captured in the email
 - Make sure that the email is well formatted for audit and each section has a heading and a body and background color, ensure its not too flashy
 - When a function returns multiple values, you need to process all of them
+- When a tool returns a result_handle, the full value is stored on the server; work from its summary and call read_result only for the parts you need
+- When a calculation needs several chained mathematical operations, prefer a single evaluate_expression call over one function call per operation, and use its returned steps as the reasoning trace
+- To draw several shapes, prefer begin_scene, then scene_add_rectangle / scene_add_text for each shape, then a single commit_scene over one draw_rectangle or add_text_in_paint call per shape
 - Do not repeat function calls with the same parameters at any cost
 - Only when you have computed the result of the mathematical problem, you start the process of displaying the result on a canvas
 - Make sure that you draw the elements on the canvas and the result should be in the center of the canvas. 
@@ -0,0 +1,281 @@
+import asyncio
+import json
+import logging
+import traceback
+from types import SimpleNamespace
+from typing import Any, Dict
+
+from config import Config
+
+
+class ExecutionHistory:
+    def __init__(self, user_query: str = None, tools_description: str = None):
+        self.plan = None
+        self.steps = []
+        self.final_answer = None
+        self.user_query = user_query
+        self.tools_description = tools_description
+        self.iterations = 0
+        self.error = None
+
+
+def build_tools_description(tools: list, logger: logging.Logger = None) -> str:
+    """Create description of available tools for LLM"""
+    logger = logger or logging.getLogger(__name__)
+    tools_description = []
+    for i, tool in enumerate(tools):
+        try:
+            params = tool.inputSchema
+            desc = getattr(tool, 'description', 'No description available')
+            name = getattr(tool, 'name', f'tool_{i}')
+
+            if 'properties' in params:
+                param_details = []
+                for param_name, param_info in params['properties'].items():
+                    param_type = param_info.get('type', 'unknown')
+                    param_details.append(f"{param_name}: {param_type}")
+                params_str = ', '.join(param_details)
+            else:
+                params_str = 'no parameters'
+
+            tool_desc = f"{i+1}. {name}({params_str}) - {desc}"
+            tools_description.append(tool_desc)
+        except Exception as e:
+            logger.error(f"Error processing tool {i}: {e}")
+            tools_description.append(f"{i+1}. Error processing tool")
+    return "\n".join(tools_description)
+
+
+def clean_llm_json(response_text: str) -> str:
+    """Strip markdown code fences around a JSON response"""
+    cleaned_response = response_text.strip()
+    if cleaned_response.startswith("```json"):
+        cleaned_response = cleaned_response[7:]
+    elif cleaned_response.startswith("```"):
+        cleaned_response = cleaned_response[3:]
+    if cleaned_response.endswith("```"):
+        cleaned_response = cleaned_response[:-3]
+    return cleaned_response.strip()
+
+
+class AgentEngine:
+    """
+    Reentrant plan -> function_call -> final_answer loop.
+
+    The engine only holds immutable configuration (model, tools, limits). All
+    per-query state lives in the ExecutionHistory created by run(), so several
+    runs can share one engine concurrently inside the same event loop.
+    Each tool is expected to carry a `server_session` attribute exposing
+    `call_tool(name, arguments=...)`.
+    """
+
+    def __init__(self,
+                 model: Any,
+                 tools: list,
+                 max_iterations: int = Config.MAX_ITERATIONS,
+                 timeout: float = Config.TIMEOUT_SECONDS,
+                 logger: logging.Logger = None):
+        self.model = model
+        self.tools = list(tools)
+        self.tools_by_name = {tool.name: tool for tool in self.tools}
+        self.max_iterations = max_iterations
+        self.timeout = timeout
+        self.logger = logger or logging.getLogger(__name__)
+        self.tools_description = build_tools_description(self.tools, self.logger)
+
+    async def generate_with_timeout(self, prompt: str, timeout: float = None) -> Any:
+        """Generate content with timeout using LLM"""
+        self.logger.info("Starting LLM generation...")
+        try:
+            loop = asyncio.get_running_loop()
+            response = await asyncio.wait_for(
+                loop.run_in_executor(
+                    None,
+                    lambda: self.model.generate_content(contents=prompt)
+                ),
+                timeout=timeout or self.timeout
+            )
+            self.logger.info("LLM generation completed")
+            return response
+        except asyncio.TimeoutError:
+            self.logger.error("LLM generation timed out!")
+            raise
+        except Exception as e:
+            self.logger.error(f"Error in LLM generation: {e}")
+            raise
+
+    def build_prompt(self, history: ExecutionHistory) -> str:
+        """Render the system prompt for the current state of a run"""
+        return Config.SYSTEM_PROMPT.format(
+            tools_description=history.tools_description,
+            execution_history=history
+        )
+
+    def convert_arguments(self, tool: Any, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convert LLM supplied parameters to the types declared in the tool's input schema.
+        Parameters are matched by name first, remaining schema properties are
+        filled positionally from the unmatched values.
+        """
+        schema_properties = tool.inputSchema.get('properties', {})
+        required = set(tool.inputSchema.get('required', schema_properties.keys()))
+        unmatched = [value for name, value in parameters.items() if name not in schema_properties]
+
+        arguments = {}
+        for param_name, param_info in schema_properties.items():
+            if param_name in parameters:
+                value = parameters[param_name]
+            elif unmatched:
+                value = unmatched.pop(0)
+            elif param_name in required:
+                raise ValueError(f"Not enough parameters provided for {tool.name}")
+            else:
+                continue
+            arguments[param_name] = self._convert_value(param_info, value)
+        return arguments
+
+    def _convert_value(self, param_info: Dict[str, Any], value: Any) -> Any:
+        """Convert a single value according to its JSON schema entry"""
+        param_type = param_info.get('type', 'string')
+        if param_type == 'integer':
+            return int(value)
+        if param_type == 'number':
+            return float(value)
+        if param_type == 'boolean':
+            if isinstance(value, str):
+                return value.strip().lower() in ('true', '1', 'yes')
+            return bool(value)
+        if param_type == 'array':
+            if isinstance(value, str):
+                # Items are converted per the declared item schema, e.g. number or string
+                items = param_info.get('items') or {}
+                value = value.strip().strip('[]')
+                return [self._convert_value(items, x.strip().strip('"\''))
+                        for x in value.split(',') if x.strip()]
+            if isinstance(value, list):
+                # The LLM sometimes wraps the list in another list
+                if len(value) > 0 and isinstance(value[0], list):
+                    return value[0]
+                return value
+            raise ValueError(f"Invalid array parameter: {value}")
+        if param_type == 'object':
+            if isinstance(value, str):
+                return json.loads(value)
+            return value
+        if param_type == 'string':
+            return str(value)
+        # anyOf/unknown schemas are passed through untouched
+        return value
+
+    @staticmethod
+    def result_to_text(result: Any) -> Any:
+        """Flatten an MCP CallToolResult into text for the execution history"""
+        if hasattr(result, 'content'):
+            if isinstance(result.content, list):
+                return [AgentEngine.content_to_text(item) for item in result.content]
+            return str(result.content)
+        return str(result)
+
+    @staticmethod
+    def content_to_text(item: Any) -> str:
+        """
+        Text of a content item. Images, audio and binary resources are summarized
+        by type, MIME type and size, their base64 data would be resent in every prompt."""
+        if hasattr(item, 'text'):
+            return item.text
+        resource = getattr(item, 'resource', None)
+        if resource is not None:
+            if getattr(resource, 'text', None) is not None:
+                return resource.text
+            item = SimpleNamespace(type=f"resource {getattr(resource, 'uri', '')}".strip(),
+                                   mimeType=getattr(resource, 'mimeType', None),
+                                   data=getattr(resource, 'blob', None))
+        data = getattr(item, 'data', None)
+        if isinstance(data, str):
+            size = len(data.rstrip('=')) * 3 // 4
+            mime_type = getattr(item, 'mimeType', None) or 'unknown type'
+            return f"[{getattr(item, 'type', 'binary')} content: {mime_type}, {size} bytes]"
+        return str(item)
+
+    async def call_tool(self, func_name: str, parameters: Dict[str, Any]) -> Any:
+        """Resolve, convert arguments for and execute a tool call"""
+        tool = self.tools_by_name.get(func_name)
+        if not tool:
+            self.logger.info(f"Available tools: {list(self.tools_by_name)}")
+            raise ValueError(f"Unknown tool: {func_name}")
+
+        session = getattr(tool, 'server_session', None)
+        if not session:
+            raise ValueError(f"No session found for tool: {func_name}")
+
+        arguments = self.convert_arguments(tool, parameters)
+        self.logger.debug(f"Calling tool {func_name} with arguments: {arguments}")
+        return await session.call_tool(func_name, arguments=arguments)
+
+    async def run(self, query: str) -> ExecutionHistory:
+        """Run the agent loop for one query and return its execution history"""
+        history = ExecutionHistory(user_query=query, tools_description=self.tools_description)
+
+        while history.iterations < self.max_iterations:
+            self.logger.info(f"--- Iteration {history.iterations + 1} ---")
+            try:
+                response = await self.generate_with_timeout(self.build_prompt(history))
+                response_text = response.text.strip()
+                self.logger.info(f"LLM Response: {response_text}")
+            except Exception as e:
+                self.logger.error(f"Failed to get LLM response: {e}")
+                history.error = f"Failed to get LLM response: {e}"
+                break
+
+            try:
+                response_json = json.loads(clean_llm_json(response_text))
+            except json.JSONDecodeError:
+                self.logger.error("Failed to parse JSON response")
+                history.error = "Failed to parse JSON response"
+                break
+
+            response_type = response_json.get("response_type")
+
+            if response_type == "plan":
+                for step in response_json.get("steps", []):
+                    self.logger.info(f"Step {step.get('step_number')}: {step.get('description')}")
+                history.plan = response_json
+
+            elif response_type == "function_call":
+                function_info = response_json.get("function", {})
+                func_name = function_info.get("name")
+                parameters = function_info.get("parameters", {})
+                try:
+                    result = await self.call_tool(func_name, parameters)
+                except Exception as e:
+                    self.logger.error(f"Error calling {func_name}: {e}")
+                    self.logger.debug(traceback.format_exc())
+                    history.error = f"Error in iteration {history.iterations + 1}: {e}"
+                    break
+
+                history.steps.append({
+                    "step_number": len(history.steps) + 1,
+                    "function": func_name,
+                    "parameters": parameters,
+                    "reasoning_tag": function_info.get("reasoning_tag"),
+                    "reasoning": function_info.get("reasoning"),
+                    "result": self.result_to_text(result)
+                })
+
+            elif response_type == "final_answer":
+                self.logger.info(f"Final Result: {response_json.get('result')}")
+                history.final_answer = response_json
+                history.iterations += 1
+                break
+
+            else:
+                self.logger.error(f"Unknown response type: {response_type}")
+                history.error = f"Unknown response type: {response_type}"
+                break
+
+            history.iterations += 1
+
+        if history.final_answer is None and history.error is None:
+            history.error = f"Reached MAX_ITERATIONS ({self.max_iterations}) without a final answer"
+            self.logger.warning(history.error)
+        return history
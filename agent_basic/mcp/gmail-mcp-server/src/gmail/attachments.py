@@ -0,0 +1,106 @@
+"""
+Attachment storage for the Gmail MCP server.
+
+users.messages.attachments.get answers with JSON holding the attachment as one
+base64url string. decode_data_stream() decodes that string out of the response
+while it is being received, and AttachmentStore writes the bytes to disk as they
+come, hashing them on the way. Files are stored by content hash, so identical
+attachments of different emails are kept once.
+"""
+import base64
+import hashlib
+import logging
+import os
+import re
+import tempfile
+from typing import Iterable, Iterator
+
+logger = logging.getLogger(__name__)
+
+# Base64 characters decoded per step, a multiple of 4
+DECODE_CHUNK_CHARS = 64 * 1024
+
+
+def decode_data_stream(chunks: Iterable[bytes], field: bytes = b'"data"') -> Iterator[bytes]:
+    """Decode the base64url string value of field from a stream of JSON response chunks"""
+    head = b''
+    pending = b''
+    in_value = False
+    for chunk in chunks:
+        if not in_value:
+            head += chunk
+            key = head.find(field)
+            quote = head.find(b'"', key + len(field)) if key != -1 else -1
+            if quote == -1:
+                continue
+            chunk = head[quote + 1:]
+            head = b''
+            in_value = True
+        # base64url has no characters JSON escapes, the value ends at the next quote
+        end = chunk.find(b'"')
+        pending += chunk if end == -1 else chunk[:end]
+        while len(pending) >= DECODE_CHUNK_CHARS or (end != -1 and len(pending) >= 4):
+            cut = len(pending) // 4 * 4 if end != -1 else DECODE_CHUNK_CHARS
+            yield base64.urlsafe_b64decode(pending[:cut])
+            pending = pending[cut:]
+        if end != -1:
+            break
+    if not in_value:
+        raise ValueError(f"No {field.decode()} in attachment response")
+    if pending.rstrip(b'='):
+        # Unpadded tail
+        yield base64.urlsafe_b64decode(pending + b'=' * (-len(pending) % 4))
+
+
+def safe_filename(filename: str, fallback: str) -> str:
+    """Attachment filename usable on any file system"""
+    filename = re.sub(r'[\x00-\x1f<>:"/\\|?*]', '_', os.path.basename(filename or '')).strip(' .')
+    return filename[:200] or fallback
+
+
+class AttachmentStore:
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def save(self, data: Iterable[bytes], filename: str) -> dict:
+        """
+        Write attachment bytes to <directory>/<sha256>/<filename> while hashing them.
+        If an attachment with the same content is stored already, that file is kept
+        and returned instead. Returns path, size, sha256 and whether it was a duplicate."""
+        os.makedirs(self.directory, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix='.download-')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                for block in data:
+                    file.write(block)
+                    digest.update(block)
+                    size += len(block)
+
+            sha256 = digest.hexdigest()
+            content_directory = os.path.join(self.directory, sha256)
+            existing = self.find(sha256)
+            if existing is not None:
+                os.unlink(temp_path)
+                logger.info(f"Attachment {filename} is a duplicate of {existing}")
+                return {"path": existing, "size": size, "sha256": sha256, "deduplicated": True}
+
+            os.makedirs(content_directory, exist_ok=True)
+            path = os.path.join(content_directory, filename)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+        logger.info(f"Attachment saved: {path} ({size} bytes)")
+        return {"path": path, "size": size, "sha256": sha256, "deduplicated": False}
+
+    def find(self, sha256: str) -> str | None:
+        """Stored file with this content hash"""
+        content_directory = os.path.join(self.directory, sha256)
+        if not os.path.isdir(content_directory):
+            return None
+        for name in sorted(os.listdir(content_directory)):
+            return os.path.join(content_directory, name)
+        return None
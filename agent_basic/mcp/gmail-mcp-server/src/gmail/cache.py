@@ -0,0 +1,366 @@
+"""
+SQLite cache of the mailbox for the Gmail MCP server.
+
+Holds the parsed messages (headers, snippet, plain-text body) and their labels,
+plus the historyId and time of the last sync. GmailService fills it with a full
+sync once and keeps it current through users.history.list from that historyId.
+Sync writes run on a worker thread while tool calls read on the event loop.
+Writes go through one connection, each public write is a single transaction;
+reads use a second connection, which WAL lets read the last committed state
+while a write is in progress, so readers never wait for a sync.
+An FTS5 index over subject, from, to and body follows the messages table through
+triggers, so every sync keeps search current.
+"""
+import functools
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Iterable
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id TEXT PRIMARY KEY,
+    thread_id TEXT,
+    internal_date INTEGER,
+    subject TEXT,
+    from_addr TEXT,
+    to_addr TEXT,
+    date TEXT,
+    snippet TEXT,
+    body TEXT
+);
+CREATE INDEX IF NOT EXISTS messages_internal_date ON messages (internal_date DESC);
+CREATE TABLE IF NOT EXISTS message_labels (
+    message_id TEXT NOT NULL REFERENCES messages (id) ON DELETE CASCADE,
+    label TEXT NOT NULL,
+    PRIMARY KEY (message_id, label)
+);
+CREATE INDEX IF NOT EXISTS message_labels_label ON message_labels (label, message_id);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS attachments (
+    message_id TEXT NOT NULL,
+    part_id TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    PRIMARY KEY (message_id, part_id)
+);
+"""
+
+# External content index over messages, kept in sync by triggers
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    subject, from_addr, to_addr, body,
+    content='messages', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts (rowid, subject, from_addr, to_addr, body)
+    VALUES (new.rowid, new.subject, new.from_addr, new.to_addr, new.body);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, subject, from_addr, to_addr, body)
+    VALUES ('delete', old.rowid, old.subject, old.from_addr, old.to_addr, old.body);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_fts_update AFTER UPDATE ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, subject, from_addr, to_addr, body)
+    VALUES ('delete', old.rowid, old.subject, old.from_addr, old.to_addr, old.body);
+    INSERT INTO messages_fts (rowid, subject, from_addr, to_addr, body)
+    VALUES (new.rowid, new.subject, new.from_addr, new.to_addr, new.body);
+END;
+"""
+
+# search() query prefixes -> indexed columns
+SEARCH_COLUMNS = {"subject": "subject", "from": "from_addr", "to": "to_addr", "body": "body"}
+# bm25 column weights in messages_fts column order: subject, from, to, body
+SEARCH_WEIGHTS = (10.0, 5.0, 5.0, 1.0)
+
+
+def _writing(method):
+    """Run method as one transaction on the write connection, writes it calls join that transaction"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._write_lock:
+            if self._in_transaction:
+                return method(self, *args, **kwargs)
+            self._in_transaction = True
+            try:
+                with self.conn:
+                    return method(self, *args, **kwargs)
+            finally:
+                self._in_transaction = False
+    return wrapper
+
+
+def _reading(method):
+    """Run method holding the read connection, which is shared between threads"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._read_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class MailCache:
+    def __init__(self, path: str):
+        self.path = path
+        # Write connection, used from the event loop and the sync writer thread
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self._write_lock = threading.RLock()
+        self._in_transaction = False
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+        self.searchable = self._create_search_index()
+        # Read connection, opened once the schema exists
+        self._reader = sqlite3.connect(path, check_same_thread=False)
+        self._read_lock = threading.Lock()
+        self._reader.row_factory = sqlite3.Row
+        self._reader.execute("PRAGMA query_only=ON")
+        logger.info(f"Mail cache opened: {path}")
+
+    def _create_search_index(self) -> bool:
+        """Create the FTS5 index, False if this SQLite build lacks FTS5"""
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'messages_fts'"
+        ).fetchone()
+        try:
+            self.conn.executescript(FTS_SCHEMA)
+        except sqlite3.OperationalError as error:
+            logger.warning(f"Mail search disabled, SQLite has no FTS5: {error}")
+            return False
+        if not exists:
+            # Index messages cached before the index existed
+            with self.conn:
+                self.conn.execute("INSERT INTO messages_fts (messages_fts) VALUES ('rebuild')")
+        return True
+
+    def close(self) -> None:
+        with self._read_lock:
+            self._reader.close()
+        with self._write_lock:
+            self.conn.close()
+
+    # Sync state
+
+    @_reading
+    def _get_state(self, key: str) -> str | None:
+        row = self._reader.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def _set_state(self, key: str, value: str | None) -> None:
+        self.conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (key, value))
+
+    @property
+    def history_id(self) -> str | None:
+        """historyId the cache is synced to, None before the first full sync"""
+        return self._get_state("history_id")
+
+    def is_fresh(self, max_age: float) -> bool:
+        synced_at = self._get_state("synced_at")
+        return synced_at is not None and time.time() - float(synced_at) <= max_age
+
+    @_writing
+    def mark_synced(self, history_id: str) -> None:
+        self._set_state("history_id", history_id)
+        self._set_state("synced_at", str(time.time()))
+
+    @property
+    def pending_ids(self) -> set[str]:
+        """Messages a sync could not fetch, retried by the next one"""
+        return set(json.loads(self._get_state("pending_ids") or "[]"))
+
+    @_writing
+    def replace_all(self, messages: list[dict[str, Any]], history_id: str, pending: Iterable[str] = ()) -> None:
+        """Store the result of a full sync, readers never see the cache half replaced"""
+        self.clear()
+        self.put_messages(messages)
+        self._set_state("pending_ids", json.dumps(sorted(pending)))
+        self.mark_synced(history_id)
+
+    @_writing
+    def apply_changes(self, messages: list[dict[str, Any]], deleted: Iterable[str],
+                      labels: dict[str, list[str]], history_id: str, pending: Iterable[str] = ()) -> None:
+        """Store the result of an incremental sync"""
+        self.delete_messages(deleted)
+        self.put_messages(messages)
+        self.set_labels(labels)
+        self._set_state("pending_ids", json.dumps(sorted(pending)))
+        self.mark_synced(history_id)
+
+    @_writing
+    def mark_stale(self) -> None:
+        """Force a sync before the next cached listing, e.g. after this server changed the mailbox"""
+        self._set_state("synced_at", None)
+
+    # Messages
+
+    @_writing
+    def clear(self) -> None:
+        self.conn.execute("DELETE FROM messages")
+        self.conn.execute("DELETE FROM state")
+
+    @_writing
+    def put_messages(self, messages: Iterable[dict[str, Any]]) -> None:
+        """Insert or replace parsed messages (see GmailService._parse_full_message) with their labels"""
+        for message in messages:
+            # An upsert rather than INSERT OR REPLACE, whose implicit delete skips the index trigger
+            self.conn.execute(
+                "INSERT INTO messages "
+                "(id, thread_id, internal_date, subject, from_addr, to_addr, date, snippet, body) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET thread_id = excluded.thread_id, "
+                "internal_date = excluded.internal_date, subject = excluded.subject, "
+                "from_addr = excluded.from_addr, to_addr = excluded.to_addr, date = excluded.date, "
+                "snippet = excluded.snippet, body = excluded.body",
+                (message["id"], message.get("threadId"), int(message.get("internalDate") or 0),
+                 message.get("subject", ""), message.get("from", ""), message.get("to", ""),
+                 message.get("date", ""), message.get("snippet", ""), message.get("content"))
+            )
+            self._replace_labels(message["id"], message.get("labelIds", []))
+
+    @_writing
+    def set_labels(self, labels_by_id: dict[str, list[str]]) -> None:
+        """Replace the labels of cached messages, unknown IDs are ignored"""
+        for message_id, labels in labels_by_id.items():
+            if self.conn.execute("SELECT 1 FROM messages WHERE id = ?", (message_id,)).fetchone():
+                self._replace_labels(message_id, labels)
+
+    def _replace_labels(self, message_id: str, labels: list[str]) -> None:
+        self.conn.execute("DELETE FROM message_labels WHERE message_id = ?", (message_id,))
+        self.conn.executemany(
+            "INSERT INTO message_labels (message_id, label) VALUES (?, ?)",
+            [(message_id, label) for label in labels]
+        )
+
+    @_writing
+    def delete_messages(self, message_ids: Iterable[str]) -> None:
+        self.conn.executemany("DELETE FROM messages WHERE id = ?", [(i,) for i in message_ids])
+
+    @_reading
+    def cached_ids(self, message_ids: Iterable[str]) -> set[str]:
+        """Subset of message_ids present in the cache"""
+        message_ids = list(message_ids)
+        found = set()
+        # Stay below SQLite's bound parameter limit
+        for start in range(0, len(message_ids), 500):
+            chunk = message_ids[start:start + 500]
+            rows = self._reader.execute(
+                f"SELECT id FROM messages WHERE id IN ({','.join('?' * len(chunk))})", chunk
+            )
+            found.update(row["id"] for row in rows)
+        return found
+
+    @_reading
+    def get_email(self, message_id: str) -> dict[str, str] | None:
+        """Cached message in the shape read_email returns, None if it is not cached with a body"""
+        row = self._reader.execute(
+            "SELECT subject, from_addr, to_addr, date, body FROM messages WHERE id = ? AND body IS NOT NULL",
+            (message_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            "content": row["body"],
+            "subject": row["subject"],
+            "from": row["from_addr"],
+            "to": row["to_addr"],
+            "date": row["date"],
+        }
+
+    @_reading
+    def list_by_labels(self, labels: list[str], limit: int | None = None) -> list[dict[str, Any]]:
+        """Messages carrying all of labels, newest first, with the fields of a metadata listing"""
+        rows = self._reader.execute(
+            "SELECT m.id, m.thread_id, m.subject, m.from_addr, m.date, m.snippet, "
+            "(SELECT group_concat(label, ' ') FROM message_labels WHERE message_id = m.id) AS labels "
+            "FROM messages m WHERE m.id IN ("
+            f"  SELECT message_id FROM message_labels WHERE label IN ({','.join('?' * len(labels))})"
+            "  GROUP BY message_id HAVING count(*) = ?"
+            ") ORDER BY m.internal_date DESC LIMIT ?",
+            [*labels, len(labels), -1 if limit is None else limit]
+        )
+        return [
+            {
+                "id": row["id"],
+                "threadId": row["thread_id"],
+                "from": row["from_addr"],
+                "subject": row["subject"],
+                "date": row["date"],
+                "snippet": row["snippet"],
+                "labelIds": (row["labels"] or "").split(),
+            }
+            for row in rows
+        ]
+
+    @_reading
+    def get_attachment(self, message_id: str, part_id: str) -> dict[str, Any] | None:
+        """Previously downloaded attachment of a message part"""
+        row = self._reader.execute(
+            "SELECT sha256, size, path FROM attachments WHERE message_id = ? AND part_id = ?",
+            (message_id, part_id)
+        ).fetchone()
+        return dict(row) if row else None
+
+    @_writing
+    def put_attachment(self, message_id: str, part_id: str, sha256: str, size: int, path: str) -> None:
+        self.conn.execute(
+            "INSERT OR REPLACE INTO attachments (message_id, part_id, sha256, size, path) VALUES (?, ?, ?, ?, ?)",
+            (message_id, part_id, sha256, size, path)
+        )
+
+    @_reading
+    def search(self, query: str, limit: int = 20) -> list[dict[str, Any]]:
+        """
+        Full-text search of cached messages, best bm25 match first.
+        Words must all match, "quoted phrases" match as a phrase, a trailing * matches
+        a prefix and subject:, from:, to: or body: restricts a term to that field."""
+        match = self._match_expression(query)
+        if not match:
+            return []
+        rows = self._reader.execute(
+            "SELECT m.id, m.thread_id, m.subject, m.from_addr, m.date, "
+            "snippet(messages_fts, 3, '[', ']', '...', 16) AS body_snippet "
+            "FROM messages_fts JOIN messages m ON m.rowid = messages_fts.rowid "
+            f"WHERE messages_fts MATCH ? ORDER BY bm25(messages_fts, {', '.join(map(str, SEARCH_WEIGHTS))}) "
+            "LIMIT ?",
+            (match, limit)
+        )
+        return [
+            {
+                "id": row["id"],
+                "threadId": row["thread_id"],
+                "from": row["from_addr"],
+                "subject": row["subject"],
+                "date": row["date"],
+                "snippet": row["body_snippet"],
+            }
+            for row in rows
+        ]
+
+    @staticmethod
+    def _match_expression(query: str) -> str:
+        """Translate a search query into an FTS5 MATCH expression with every term quoted"""
+        terms = []
+        for field, phrase, word in re.findall(r'(?:(\w+):)?(?:"([^"]*)"|(\S+))', query):
+            prefix = word.endswith('*')
+            text = (phrase or word).rstrip('*').replace('"', '""').strip()
+            if not text:
+                continue
+            term = f'"{text}"' + ('*' if prefix else '')
+            column = SEARCH_COLUMNS.get(field.lower())
+            if column:
+                term = f"{column} : {term}"
+            elif field:
+                # Not a field prefix, e.g. a time like 10:30
+                term = f'"{field}:{text}"'
+            terms.append(term)
+        return " AND ".join(terms)
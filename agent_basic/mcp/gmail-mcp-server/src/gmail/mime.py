@@ -0,0 +1,158 @@
+"""
+Lightweight parsing of raw (RFC 2822) messages for the Gmail MCP server.
+
+Only headers are parsed with the email package (BytesParser, policy=default,
+headersonly). Multipart bodies are walked by locating boundaries in the raw
+bytes, so attachments and alternative HTML parts are skipped without being
+parsed or decoded. Of the first text part only as much is decoded as the body
+size cap needs, and quoted replies can be stripped to shrink what goes into
+the LLM prompt.
+"""
+import binascii
+import quopri
+import re
+from email.message import EmailMessage
+from email.parser import BytesParser
+from email.policy import default
+from typing import Iterator
+
+from bs4 import BeautifulSoup
+
+HEADER_PARSER = BytesParser(policy=default)
+# Nested multiparts deeper than this are not searched for a text part
+MAX_MIME_DEPTH = 8
+# Encoded bytes read per decoded character: base64 (4/3) of up to 4 byte UTF-8,
+# or quoted-printable (3x) of it, with room to spare
+RAW_BYTES_PER_CHAR = 12
+TRUNCATION_MARKER = "\n[... truncated]"
+
+# Lines that introduce the quoted original in a reply, everything after them is dropped
+QUOTE_HEADER_PATTERNS = [
+    re.compile(r"^On .{0,200}wrote:\s*$"),
+    re.compile(r"^-{2,}\s*Original Message\s*-{2,}\s*$", re.IGNORECASE),
+    re.compile(r"^_{10,}\s*$"),
+]
+
+
+def parse_raw_message(raw: bytes, max_body_chars: int = 0, strip_quotes: bool = False) -> dict[str, str]:
+    """
+    Extract to, from, subject, date and the first text part of a raw message.
+    The body is cut to max_body_chars (0 for no limit), after stripping quoted
+    replies if strip_quotes."""
+    headers, body_start = _parse_headers(raw, 0, len(raw))
+    body = None
+    text_part = _find_text_part(raw, body_start, len(raw), headers, 0)
+    if text_part is not None:
+        part_headers, start, end = text_part
+        body = _decode_text(raw, start, end, part_headers, max_body_chars)
+        body = shrink_body(body, max_body_chars, strip_quotes)
+    return {
+        'content': body,
+        'subject': str(headers.get('subject', '')),
+        'from': str(headers.get('from', '')),
+        'to': str(headers.get('to', '')),
+        'date': str(headers.get('date', '')),
+    }
+
+
+def shrink_body(body: str | None, max_chars: int = 0, strip_quotes: bool = False) -> str | None:
+    """Strip quoted replies if asked and cut to max_chars (0 for no limit)"""
+    if body is None:
+        return None
+    if strip_quotes:
+        # Keep messages that are nothing but a quote, e.g. a bare forward
+        body = strip_quoted_reply(body) or body
+    if max_chars and len(body) > max_chars:
+        body = body[:max_chars] + TRUNCATION_MARKER
+    return body
+
+
+def strip_quoted_reply(text: str) -> str:
+    """Drop '>' quoted lines and everything after an 'On ... wrote:' style header"""
+    kept = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if any(pattern.match(stripped) for pattern in QUOTE_HEADER_PATTERNS):
+            break
+        if stripped.startswith('>'):
+            continue
+        kept.append(line)
+    return '\n'.join(kept).rstrip()
+
+
+def _parse_headers(data: bytes, start: int, end: int) -> tuple[EmailMessage, int]:
+    """Parse the header block at data[start:end], returns the headers and where the body begins"""
+    # A part without headers starts with the empty line
+    for empty_line in (b'\r\n', b'\n'):
+        if data.startswith(empty_line, start, end):
+            return HEADER_PARSER.parsebytes(b'', headersonly=True), start + len(empty_line)
+    crlf = data.find(b'\r\n\r\n', start, end)
+    lf = data.find(b'\n\n', start, end)
+    if crlf != -1 and (lf == -1 or crlf < lf):
+        header_end, body_start = crlf + 2, crlf + 4
+    elif lf != -1:
+        header_end, body_start = lf + 1, lf + 2
+    else:
+        header_end = body_start = end
+    return HEADER_PARSER.parsebytes(data[start:header_end], headersonly=True), body_start
+
+
+def _iter_parts(data: bytes, start: int, end: int, boundary: str) -> Iterator[tuple[int, int]]:
+    """(start, end) of every part of the multipart body at data[start:end]"""
+    delimiter = b'--' + boundary.encode('ascii', 'replace')
+    position = data.find(delimiter, start, end)
+    while position != -1:
+        after = position + len(delimiter)
+        if data[after:after + 2] == b'--':
+            return
+        line_end = data.find(b'\n', after, end)
+        if line_end == -1:
+            return
+        next_delimiter = data.find(b'\n' + delimiter, line_end, end)
+        part_end = end if next_delimiter == -1 else next_delimiter
+        if part_end > line_end + 1 and data[part_end - 1:part_end] == b'\r':
+            part_end -= 1
+        yield line_end + 1, part_end
+        position = -1 if next_delimiter == -1 else next_delimiter + 1
+
+
+def _find_text_part(data: bytes, start: int, end: int, headers: EmailMessage,
+                    depth: int) -> tuple[EmailMessage, int, int] | None:
+    """First inline text/plain part, else the first text/html one, as (headers, body start, body end)"""
+    if headers.get_content_maintype() == 'multipart':
+        boundary = headers.get_boundary()
+        if not boundary or depth >= MAX_MIME_DEPTH:
+            return None
+        html = None
+        for part_start, part_end in _iter_parts(data, start, end, boundary):
+            part_headers, body_start = _parse_headers(data, part_start, part_end)
+            found = _find_text_part(data, body_start, part_end, part_headers, depth + 1)
+            if found is not None and found[0].get_content_type() == 'text/plain':
+                return found
+            if found is not None and html is None:
+                html = found
+        return html
+    if headers.get_content_type() in ('text/plain', 'text/html') and headers.get_content_disposition() != 'attachment':
+        return headers, start, end
+    return None
+
+
+def _decode_text(data: bytes, start: int, end: int, headers: EmailMessage, max_chars: int) -> str:
+    """Decode a text part, reading no more encoded bytes than max_chars characters can need"""
+    if max_chars:
+        end = min(end, start + max_chars * RAW_BYTES_PER_CHAR)
+    body = data[start:end]
+    encoding = str(headers.get('content-transfer-encoding', '7bit')).strip().lower()
+    if encoding == 'base64':
+        body = re.sub(rb'\s+', b'', body)
+        body = binascii.a2b_base64(body[:len(body) // 4 * 4])
+    elif encoding == 'quoted-printable':
+        body = quopri.decodestring(body)
+    try:
+        text = body.decode(headers.get_content_charset() or 'utf-8', errors='replace')
+    except LookupError:
+        text = body.decode('utf-8', errors='replace')
+    if headers.get_content_type() == 'text/html':
+        text = BeautifulSoup(text, 'html.parser').get_text(separator='\n')
+        text = re.sub(r'\n\s*\n+', '\n\n', text).strip()
+    return text
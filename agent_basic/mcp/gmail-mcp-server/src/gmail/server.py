@@ -1,4 +1,4 @@
-from typing import Any
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
 import argparse
 import os
 import asyncio
@@ -7,8 +7,12 @@ import base64
 from email.message import EmailMessage
 from email.header import decode_header
 from base64 import urlsafe_b64decode
-from email import message_from_bytes
+import json
+import threading
+import time
 import webbrowser
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from bs4 import BeautifulSoup
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
@@ -16,29 +20,93 @@ from email.mime.text import MIMEText
 from mcp.server.models import InitializationOptions
 import mcp.types as types
 from mcp.server import NotificationOptions, Server
+from mcp.server.lowlevel.helper_types import ReadResourceContents
 import mcp.server.stdio
 
 
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+import httplib2
+from pydantic import AnyUrl
 from googleapiclient.errors import HttpError
 
+if TYPE_CHECKING:
+    # google-auth, the OAuth flow and the discovery client are imported on connect()
+    from google.auth.transport.requests import AuthorizedSession
+    from google_auth_httplib2 import AuthorizedHttp
+
+try:
+    from .attachments import AttachmentStore, decode_data_stream, safe_filename
+    from .cache import MailCache
+    from .mime import parse_raw_message, shrink_body
+except ImportError:
+    # Run as a script (server.py) rather than as the gmail package
+    from attachments import AttachmentStore, decode_data_stream, safe_filename
+    from cache import MailCache
+    from mime import parse_raw_message, shrink_body
+
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Gmail API requests run on this many threads, off the MCP event loop
+GMAIL_MAX_WORKERS = int(os.getenv("GMAIL_MAX_WORKERS", "8"))
+# Sub-requests per HTTP batch (Gmail allows 100, recommends at most 50) and
+# message IDs per messages.batchModify call (API limit)
+GMAIL_BATCH_SIZE = 50
+GMAIL_MODIFY_BATCH_SIZE = 1000
+# messages.list page size (API maximum is 500)
+GMAIL_LIST_PAGE_SIZE = 100
+
+UNREAD_QUERY = 'in:inbox is:unread category:primary'
+# Fields an unread listing entry can be projected to, all but id and threadId
+# need a format=metadata fetch of the message
+LISTING_FIELDS = ['id', 'threadId', 'from', 'subject', 'date', 'snippet', 'labelIds']
+METADATA_HEADERS = ['From', 'Subject', 'Date']
+# Labels of the messages UNREAD_QUERY matches, for listing from the cache
+UNREAD_LABELS = ['INBOX', 'UNREAD', 'CATEGORY_PERSONAL']
+
+# Downloaded attachments, by default next to the token file, and the size of
+# the response chunks they are streamed to disk in
+GMAIL_ATTACHMENT_DIR = os.getenv("GMAIL_ATTACHMENT_DIR")
+ATTACHMENT_CHUNK_BYTES = 256 * 1024
+# Email bodies handed to the model are cut to this many characters (0 for no
+# limit), after dropping quoted replies unless GMAIL_STRIP_QUOTED_REPLIES=0
+GMAIL_MAX_BODY_CHARS = int(os.getenv("GMAIL_MAX_BODY_CHARS", "8000"))
+GMAIL_STRIP_QUOTED_REPLIES = os.getenv("GMAIL_STRIP_QUOTED_REPLIES", "1") != "0"
+# Refresh the OAuth token this many seconds before it expires
+GMAIL_TOKEN_REFRESH_MARGIN = float(os.getenv("GMAIL_TOKEN_REFRESH_MARGIN", "300"))
+# labels.get / labels.list answers are reused for this many seconds
+GMAIL_LABEL_COUNTS_TTL = float(os.getenv("GMAIL_LABEL_COUNTS_TTL", "30"))
+LABEL_COUNT_FIELDS = 'id,name,type,messagesTotal,messagesUnread,threadsTotal,threadsUnread'
+INBOX_STATS_URI = "gmail://inbox-stats"
+
+# Mailbox cache, by default next to the token file
+GMAIL_CACHE_PATH = os.getenv("GMAIL_CACHE_PATH")
+# Unread listing is served from the cache if it synced within this many seconds,
+# otherwise it is brought up to date through history.list first
+GMAIL_CACHE_MAX_AGE = float(os.getenv("GMAIL_CACHE_MAX_AGE", "60"))
+# A full sync caches all unread messages plus this many most recent ones
+GMAIL_SYNC_MAX_MESSAGES = int(os.getenv("GMAIL_SYNC_MAX_MESSAGES", "500"))
+# Messages a sync fetch answers with one of these statuses are fetched again,
+# after GMAIL_SYNC_RETRY_DELAY seconds doubled per attempt; those still failing
+# are left to the next sync
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+GMAIL_SYNC_RETRIES = int(os.getenv("GMAIL_SYNC_RETRIES", "3"))
+GMAIL_SYNC_RETRY_DELAY = 1.0
+
 EMAIL_ADMIN_PROMPTS = """You are an email administrator. 
 You can draft, edit, read, trash, open, and send emails.
 You've been given access to a specific gmail account. 
 You have the following tools available:
 - Send an email (send-email)
-- Retrieve unread emails (get-unread-emails)
+- Retrieve unread emails, optionally with sender, subject and date (get-unread-emails)
 - Read email content (read-email)
 - Trash email (tras-email)
 - Open email in browser (open-email)
+- Read, trash or mark as read many emails at once (read-emails, trash-emails, mark-emails-as-read)
+- Search emails by words in subject, sender, recipient or body (search-emails)
+- Count unread emails in the inbox or other labels (count-unread)
+- List and download email attachments (list-attachments, download-attachment)
 Never send an email draft or trash an email unless the user confirms first. 
 Always ask for approval if not already given.
 """
@@ -114,51 +182,297 @@ class GmailService:
         self.creds_file_path = creds_file_path
         self.token_path = token_path
         self.scopes = scopes
-        self.token = self._get_token()
-        logger.info("Token retrieved successfully")
-        self.service = self._get_service()
-        logger.info("Gmail service initialized")
-        self.user_email = self._get_user_email()
-        logger.info(f"User email retrieved: {self.user_email}")
+        # httplib2.Http is not thread-safe, every executor thread gets its own
+        self._executor = ThreadPoolExecutor(max_workers=GMAIL_MAX_WORKERS, thread_name_prefix="gmail-api")
+        self._local = threading.local()
+        self.cache = MailCache(GMAIL_CACHE_PATH or os.path.join(
+            os.path.dirname(os.path.abspath(token_path)), 'gmail_cache.sqlite3'))
+        self.attachments = AttachmentStore(GMAIL_ATTACHMENT_DIR or os.path.join(
+            os.path.dirname(os.path.abspath(token_path)), 'attachments'))
+        self._sync_lock = asyncio.Lock()
+        self._sync_task = None
+        # label ID -> (fetched at, labels.get response), and (fetched at, labels.list response)
+        self._label_counts = {}
+        self._labels = None
+        # Set by connect(), which main() starts as a warm-up and every tool call awaits
+        self.token = None
+        self.service = None
+        self.user_email = None
+        self.token_manager = None
+        self._connecting = None
+        self._refresh_task = None
 
-    def _get_token(self) -> Credentials:
-        """Get or refresh Google API token"""
+    async def connect(self) -> None:
+        """Authorize, build the Gmail service and look up the profile, once and off the event loop"""
+        if self._connecting is None:
+            loop = asyncio.get_running_loop()
+            self._connecting = loop.run_in_executor(self._executor, self._connect)
+        try:
+            await asyncio.shield(self._connecting)
+        except Exception:
+            # Let the next call try again, e.g. after the user completed the OAuth flow
+            self._connecting = None
+            raise
+        if self._refresh_task is None:
+            # Refreshes ahead of expiry, so no tool call waits for a token refresh
+            self._refresh_task = asyncio.ensure_future(self.token_manager.keep_fresh(self._executor))
 
-        token = None
-    
-        if os.path.exists(self.token_path):
-            logger.info('Loading token from file')
-            token = Credentials.from_authorized_user_file(self.token_path, self.scopes)
-
-        if not token or not token.valid:
-            if token and token.expired and token.refresh_token:
-                logger.info('Refreshing token')
-                token.refresh(Request())
-            else:
-                logger.info('Fetching new token')
-                flow = InstalledAppFlow.from_client_secrets_file(self.creds_file_path, self.scopes)
-                token = flow.run_local_server(port=0)
+    def close(self) -> None:
+        """Stop background token refresh and mailbox sync"""
+        for task in (self._refresh_task, self._sync_task):
+            if task is not None:
+                task.cancel()
 
-            with open(self.token_path, 'w') as token_file:
-                token_file.write(token.to_json())
-                logger.info(f'Token saved to {self.token_path}')
+    def _connect(self) -> None:
+        try:
+            from .token_manager import TokenManager
+        except ImportError:
+            from token_manager import TokenManager
 
-        return token
+        started = time.perf_counter()
+        self.token_manager = TokenManager(
+            self.creds_file_path, self.token_path, self.scopes, refresh_margin=GMAIL_TOKEN_REFRESH_MARGIN)
+        self.token = self.token_manager.load()
+        logger.info("Token retrieved successfully")
+        self.service = self._get_service()
+        logger.info("Gmail service initialized")
+        self.user_email = self._get_user_email()
+        logger.info(f"User email retrieved: {self.user_email} ({time.perf_counter() - started:.2f}s to connect)")
 
     def _get_service(self) -> Any:
         """Initialize Gmail API service"""
+        from googleapiclient.discovery import build
         try:
-            service = build('gmail', 'v1', credentials=self.token)
+            # The discovery document shipped with google-api-python-client, no fetch
+            service = build('gmail', 'v1', credentials=self.token, static_discovery=True, cache_discovery=False)
             return service
         except HttpError as error:
             logger.error(f'An error occurred building Gmail service: {error}')
             raise ValueError(f'An error occurred: {error}')
     
+    def _thread_http(self) -> "AuthorizedHttp":
+        """Authorized Http object owned by the current thread"""
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            from google_auth_httplib2 import AuthorizedHttp
+            http = AuthorizedHttp(self.token, http=httplib2.Http())
+            self._local.http = http
+        return http
+
+    def _thread_session(self) -> "AuthorizedSession":
+        """Authorized requests session owned by the current thread, for streamed responses"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            from google.auth.transport.requests import AuthorizedSession
+            session = AuthorizedSession(self.token)
+            self._local.session = session
+        return session
+
+    async def _execute(self, request: Any) -> Any:
+        """Execute a Gmail API request (or batch) on the bounded executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, lambda: request.execute(http=self._thread_http())
+        )
+
+    async def _execute_batch(self, requests: dict[str, Any]) -> dict[str, tuple[Any, Exception | None]]:
+        """
+        Execute many requests as Gmail HTTP batches of GMAIL_BATCH_SIZE.
+        Returns {request_id: (response, exception)} for every request.
+        """
+        results = {}
+
+        def callback(request_id, response, exception):
+            results[request_id] = (response, exception)
+
+        items = list(requests.items())
+        batches = []
+        for start in range(0, len(items), GMAIL_BATCH_SIZE):
+            batch = self.service.new_batch_http_request(callback=callback)
+            for request_id, request in items[start:start + GMAIL_BATCH_SIZE]:
+                batch.add(request, request_id=request_id)
+            batches.append(self._execute(batch))
+        await asyncio.gather(*batches)
+        return results
+
+    async def _batch_modify(self, email_ids: list[str], body: dict) -> None:
+        """Apply one label change to many messages, GMAIL_MODIFY_BATCH_SIZE IDs per call"""
+        await self._mailbox_changed()
+        await asyncio.gather(*[
+            self._execute(self.service.users().messages().batchModify(
+                userId="me", body={**body, 'ids': email_ids[start:start + GMAIL_MODIFY_BATCH_SIZE]}))
+            for start in range(0, len(email_ids), GMAIL_MODIFY_BATCH_SIZE)
+        ])
+
     def _get_user_email(self) -> str:
         """Get user email address"""
-        profile = self.service.users().getProfile(userId='me').execute()
+        profile = self.service.users().getProfile(userId='me').execute(http=self._thread_http())
         user_email = profile.get('emailAddress', '')
         return user_email
+
+    async def sync(self, max_age: float | None = None) -> None:
+        """
+        Bring the mailbox cache up to date. Incremental through history.list from the
+        cached historyId, a full sync on first use or when that history has expired.
+        Nothing is done if the cache synced within max_age seconds."""
+        async with self._sync_lock:
+            if max_age is not None and self.cache.is_fresh(max_age):
+                return
+            if self.cache.history_id is not None:
+                try:
+                    await self._incremental_sync(self.cache.history_id)
+                    return
+                except HttpError as error:
+                    # History records are kept for about a week
+                    if error.resp.status != 404:
+                        raise
+                    logger.info("Mail cache history expired, running a full sync")
+            await self._full_sync()
+
+    async def _full_sync(self) -> None:
+        """Cache all unread messages and the GMAIL_SYNC_MAX_MESSAGES most recent ones"""
+        started = time.perf_counter()
+        # Taken first so that changes made during the sync are replayed by the next one
+        profile = await self._execute(self.service.users().getProfile(userId='me', fields='historyId'))
+
+        message_ids = {}
+        page_token = None
+        while True:
+            response = await self._execute(self.service.users().messages().list(
+                userId='me', q=UNREAD_QUERY, pageToken=page_token, maxResults=500,
+                fields='messages(id),nextPageToken'))
+            message_ids.update(dict.fromkeys(message['id'] for message in response.get('messages', [])))
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                break
+        page_token = None
+        recent = 0
+        while recent < GMAIL_SYNC_MAX_MESSAGES:
+            response = await self._execute(self.service.users().messages().list(
+                userId='me', pageToken=page_token, maxResults=min(500, GMAIL_SYNC_MAX_MESSAGES - recent),
+                fields='messages(id),nextPageToken'))
+            page = response.get('messages', [])
+            recent += len(page)
+            message_ids.update(dict.fromkeys(message['id'] for message in page))
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                break
+
+        messages, _, skipped = await self._fetch_full(list(message_ids))
+        await self._write_cache(self.cache.replace_all, messages, profile['historyId'], skipped)
+        logger.info(f"Mail cache full sync: {len(messages)} messages in {time.perf_counter() - started:.1f}s"
+                    + (f", {len(skipped)} left for the next sync" if skipped else ""))
+
+    async def _incremental_sync(self, start_history_id: str) -> None:
+        """Apply the history records after start_history_id to the cache"""
+        added = {}
+        deleted = set()
+        labels = {}
+        history_id = start_history_id
+        page_token = None
+        while True:
+            response = await self._execute(self.service.users().history().list(
+                userId='me', startHistoryId=start_history_id, pageToken=page_token, maxResults=500,
+                fields='history(messagesAdded,messagesDeleted,labelsAdded,labelsRemoved),historyId,nextPageToken'))
+            for record in response.get('history', []):
+                for change in record.get('messagesAdded', []):
+                    added[change['message']['id']] = None
+                    deleted.discard(change['message']['id'])
+                for change in record.get('messagesDeleted', []):
+                    deleted.add(change['message']['id'])
+                    added.pop(change['message']['id'], None)
+                for change in record.get('labelsAdded', []) + record.get('labelsRemoved', []):
+                    # message.labelIds is the full label set after the change
+                    labels[change['message']['id']] = change['message'].get('labelIds', [])
+            history_id = response.get('historyId', history_id)
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                break
+
+        # A label change can bring an uncached message into view, e.g. marked unread again
+        cached = self.cache.cached_ids(labels)
+        added.update(dict.fromkeys(
+            message_id for message_id in labels if message_id not in cached and message_id not in deleted))
+        # Messages the previous sync could not fetch
+        added.update(dict.fromkeys(self.cache.pending_ids - deleted))
+        messages, missing, skipped = await self._fetch_full(list(added))
+        await self._write_cache(
+            self.cache.apply_changes, messages, deleted | missing,
+            {message_id: label_ids for message_id, label_ids in labels.items()
+             if message_id not in added and message_id not in deleted},
+            history_id, skipped)
+        logger.info(f"Mail cache synced to history {history_id}: "
+                    f"{len(messages)} fetched, {len(deleted | missing)} deleted, {len(labels)} relabeled"
+                    + (f", {len(skipped)} left for the next sync" if skipped else ""))
+
+    async def _fetch_full(self, message_ids: list[str]) -> tuple[list[dict[str, Any]], set[str], set[str]]:
+        """
+        Fetch and parse messages with format=full (attachments stay on the server).
+        Rate limited and server errors are retried with backoff. Returns the parsed
+        messages, the IDs that no longer exist and the IDs that could not be fetched or parsed."""
+        messages = []
+        missing = set()
+        skipped = set()
+        pending = message_ids
+        for attempt in range(GMAIL_SYNC_RETRIES + 1):
+            if attempt:
+                await asyncio.sleep(GMAIL_SYNC_RETRY_DELAY * 2 ** (attempt - 1))
+            responses = await self._execute_batch({
+                message_id: self.service.users().messages().get(userId='me', id=message_id, format='full')
+                for message_id in pending
+            })
+            pending = []
+            for message_id, (msg, error) in responses.items():
+                if error is None:
+                    try:
+                        messages.append(self._parse_full_message(msg))
+                    except Exception as parse_error:
+                        # A malformed message must not abort the sync, it stays pending
+                        logger.error(f"Mail cache sync could not parse {message_id}: {str(parse_error)}")
+                        skipped.add(message_id)
+                elif isinstance(error, HttpError) and error.resp.status == 404:
+                    missing.add(message_id)
+                elif self._is_retryable(error):
+                    pending.append(message_id)
+                else:
+                    logger.error(f"Mail cache sync could not fetch {message_id}: {str(error)}")
+                    skipped.add(message_id)
+            if not pending:
+                break
+            logger.warning(f"Mail cache sync: {len(pending)} messages rate limited or failed, "
+                           f"attempt {attempt + 1} of {GMAIL_SYNC_RETRIES + 1}")
+        skipped.update(pending)
+        return messages, missing, skipped
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        """Rate limit (429, or 403 with a rate limit reason) or a transient server error"""
+        if not isinstance(error, HttpError):
+            return False
+        if error.resp.status == 403:
+            return 'rateLimitExceeded' in str(error.content) or 'userRateLimitExceeded' in str(error.content)
+        return error.resp.status in RETRYABLE_STATUSES
+
+    async def _write_cache(self, write: Callable[..., None], *args: Any) -> None:
+        """Run a cache write on the executor, like API requests, so the event loop stays free"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, lambda: write(*args))
+
+    async def _mailbox_changed(self) -> None:
+        """Drop cached state after this server changed the mailbox"""
+        self._label_counts.clear()
+        await self._write_cache(self.cache.mark_stale)
+
+    def _schedule_sync(self) -> None:
+        """Start a background sync unless one is running"""
+        if self._sync_task is None or self._sync_task.done():
+            self._sync_task = asyncio.ensure_future(self._background_sync())
+
+    async def _background_sync(self) -> None:
+        try:
+            await self.sync()
+        except Exception as error:
+            logger.error(f"Mail cache sync failed: {str(error)}")
     
     async def send_email(self, recipient_id: str, subject: str, message: str,) -> dict:
         """Creates and sends an email message with HTML content"""
@@ -188,10 +502,11 @@ class GmailService:
             encoded_message = base64.urlsafe_b64encode(message_obj.as_bytes()).decode()
             create_message = {'raw': encoded_message}
             
-            send_message = await asyncio.to_thread(
-                self.service.users().messages().send(userId="me", body=create_message).execute
+            send_message = await self._execute(
+                self.service.users().messages().send(userId="me", body=create_message)
             )
             logger.info(f"Message sent: {send_message['id']}")
+            await self._mailbox_changed()
             return {"status": "success", "message_id": send_message["id"]}
         except Exception as error:
             logger.error(f"Error sending email: {str(error)}")
@@ -206,62 +521,154 @@ class GmailService:
         except HttpError as error:
             return f"An HttpError occurred: {str(error)}"
 
-    async def get_unread_emails(self) -> list[dict[str, str]]| str:
+    async def _cached_unread_emails(self, max_results: int | None) -> list[dict[str, Any]] | None:
+        """
+        Unread messages from the cache, synced first if older than GMAIL_CACHE_MAX_AGE.
+        None if the cache cannot answer, in which case a first full sync is started."""
+        if self.cache.history_id is None:
+            self._schedule_sync()
+            return None
+        try:
+            await self.sync(max_age=GMAIL_CACHE_MAX_AGE)
+        except HttpError as error:
+            logger.error(f"Mail cache sync failed, listing from the API: {str(error)}")
+            return None
+        return self.cache.list_by_labels(UNREAD_LABELS, max_results)
+
+    async def get_unread_emails(self,
+                                max_results: int | None = None,
+                                fields: list[str] | None = None,
+                                on_page: Callable[[list[dict[str, Any]], int], Awaitable[None]] | None = None
+                                ) -> list[dict[str, Any]] | str:
         """
-        Retrieves unread messages from mailbox.
-        Returns list of messsage IDs in key 'id'."""
+        Retrieves unread messages from mailbox, at most max_results of them.
+        Every message is projected to fields (default id and threadId), header fields
+        are fetched with format=metadata in HTTP batches. The next page is listed while
+        the current one is enriched, and on_page(page, listed_so_far) is awaited per page."""
+        fields = [field for field in (fields or ['id', 'threadId']) if field in LISTING_FIELDS] or ['id']
+        cached = await self._cached_unread_emails(max_results)
+        if cached is not None:
+            messages = [{field: message[field] for field in fields} for message in cached]
+            if on_page is not None:
+                await on_page(messages, len(messages))
+            return messages
+
+        enrich = any(field not in ('id', 'threadId') for field in fields)
+        messages = []
+        next_page = asyncio.ensure_future(self._list_unread_page(None, max_results))
         try:
-            user_id = 'me'
-            query = 'in:inbox is:unread category:primary'
-
-            response = self.service.users().messages().list(userId=user_id,
-                                                        q=query).execute()
-            messages = []
-            if 'messages' in response:
-                messages.extend(response['messages'])
-
-            while 'nextPageToken' in response:
-                page_token = response['nextPageToken']
-                response = self.service.users().messages().list(userId=user_id, q=query,
-                                                    pageToken=page_token).execute()
-                messages.extend(response['messages'])
+            while next_page is not None:
+                response = await next_page
+                page = response.get('messages', [])
+                if max_results is not None:
+                    page = page[:max_results - len(messages)]
+                listed = len(messages) + len(page)
+
+                next_page = None
+                if 'nextPageToken' in response and (max_results is None or listed < max_results):
+                    next_page = asyncio.ensure_future(self._list_unread_page(
+                        response['nextPageToken'], None if max_results is None else max_results - listed))
+
+                if enrich:
+                    page = await self._get_metadata(page, fields)
+                else:
+                    page = [{field: message[field] for field in fields if field in message} for message in page]
+                messages.extend(page)
+                if on_page is not None:
+                    await on_page(page, len(messages))
             return messages
 
         except HttpError as error:
+            if next_page is not None:
+                next_page.cancel()
             return f"An HttpError occurred: {str(error)}"
 
+    async def _list_unread_page(self, page_token: str | None, max_results: int | None) -> dict:
+        """One messages.list page of unread message IDs"""
+        return await self._execute(self.service.users().messages().list(
+            userId='me', q=UNREAD_QUERY, pageToken=page_token,
+            maxResults=min(max_results or GMAIL_LIST_PAGE_SIZE, GMAIL_LIST_PAGE_SIZE),
+            fields='messages(id,threadId),nextPageToken'))
+
+    async def _get_metadata(self, messages: list[dict], fields: list[str]) -> list[dict[str, Any]]:
+        """Fetch From/Subject/Date headers of a page of messages in one HTTP batch and project them"""
+        responses = await self._execute_batch({
+            message['id']: self.service.users().messages().get(
+                userId='me', id=message['id'], format='metadata', metadataHeaders=METADATA_HEADERS,
+                fields='id,threadId,snippet,labelIds,payload/headers')
+            for message in messages
+        })
+        page = []
+        for message in messages:
+            msg, error = responses[message['id']]
+            if error is not None:
+                page.append({'id': message['id'], 'error': f"An HttpError occurred: {str(error)}"})
+                continue
+            headers = {
+                header['name'].lower(): decode_mime_header(header['value'])
+                for header in msg.get('payload', {}).get('headers', [])
+            }
+            entry = {**msg, **headers}
+            page.append({field: entry.get(field, '') for field in fields})
+        return page
+
+    @staticmethod
+    def _parse_raw_message(msg: dict) -> dict[str, str]:
+        """Extract to, from, subject, date and the shrunk text body of a format=raw message"""
+        # Decode the base64URL encoded raw content
+        return parse_raw_message(urlsafe_b64decode(msg['raw']), GMAIL_MAX_BODY_CHARS, GMAIL_STRIP_QUOTED_REPLIES)
+
+    @staticmethod
+    def _parse_full_message(msg: dict) -> dict[str, Any]:
+        """Extract IDs, labels, headers, snippet and the first text/plain body of a format=full message"""
+        headers = {
+            header['name'].lower(): header['value']
+            for header in msg.get('payload', {}).get('headers', [])
+        }
+        body = None
+        parts = [msg.get('payload', {})]
+        while parts:
+            part = parts.pop(0)
+            if part.get('mimeType') == 'text/plain' and 'data' in part.get('body', {}):
+                charset = 'utf-8'
+                for header in part.get('headers', []):
+                    if header['name'].lower() == 'content-type' and 'charset=' in header['value']:
+                        charset = header['value'].split('charset=', 1)[1].split(';')[0].strip(' "\'')
+                data = part['body']['data']
+                data = urlsafe_b64decode(data + '=' * (-len(data) % 4))
+                try:
+                    body = data.decode(charset, errors='replace')
+                except LookupError:
+                    body = data.decode('utf-8', errors='replace')
+                break
+            parts = part.get('parts', []) + parts
+        return {
+            'id': msg['id'],
+            'threadId': msg.get('threadId'),
+            'labelIds': msg.get('labelIds', []),
+            'internalDate': msg.get('internalDate'),
+            'snippet': msg.get('snippet', ''),
+            'subject': decode_mime_header(headers.get('subject', '')),
+            'from': decode_mime_header(headers.get('from', '')),
+            'to': decode_mime_header(headers.get('to', '')),
+            'date': headers.get('date', ''),
+            'content': body,
+        }
+
+    def _get_cached_email(self, email_id: str) -> dict[str, str] | None:
+        """Cached message, with its body shrunk like a freshly parsed one"""
+        email = self.cache.get_email(email_id)
+        if email is not None:
+            email['content'] = shrink_body(email['content'], GMAIL_MAX_BODY_CHARS, GMAIL_STRIP_QUOTED_REPLIES)
+        return email
+
     async def read_email(self, email_id: str) -> dict[str, str]| str:
         """Retrieves email contents including to, from, subject, and contents."""
         try:
-            msg = self.service.users().messages().get(userId="me", id=email_id, format='raw').execute()
-            email_metadata = {}
-
-            # Decode the base64URL encoded raw content
-            raw_data = msg['raw']
-            decoded_data = urlsafe_b64decode(raw_data)
-
-            # Parse the RFC 2822 email
-            mime_message = message_from_bytes(decoded_data)
-
-            # Extract the email body
-            body = None
-            if mime_message.is_multipart():
-                for part in mime_message.walk():
-                    # Extract the text/plain part
-                    if part.get_content_type() == "text/plain":
-                        body = part.get_payload(decode=True).decode()
-                        break
-            else:
-                # For non-multipart messages
-                body = mime_message.get_payload(decode=True).decode()
-            email_metadata['content'] = body
-            
-            # Extract metadata
-            email_metadata['subject'] = decode_mime_header(mime_message.get('subject', ''))
-            email_metadata['from'] = mime_message.get('from','')
-            email_metadata['to'] = mime_message.get('to','')
-            email_metadata['date'] = mime_message.get('date','')
-            
+            email_metadata = self._get_cached_email(email_id)
+            if email_metadata is None:
+                msg = await self._execute(self.service.users().messages().get(userId="me", id=email_id, format='raw'))
+                email_metadata = self._parse_raw_message(msg)
             logger.info(f"Email read: {email_id}")
             
             # We want to mark email as read once we read it
@@ -274,7 +681,8 @@ class GmailService:
     async def trash_email(self, email_id: str) -> str:
         """Moves email to trash given ID."""
         try:
-            self.service.users().messages().trash(userId="me", id=email_id).execute()
+            await self._execute(self.service.users().messages().trash(userId="me", id=email_id))
+            await self._mailbox_changed()
             logger.info(f"Email moved to trash: {email_id}")
             return "Email moved to trash successfully."
         except HttpError as error:
@@ -283,11 +691,255 @@ class GmailService:
     async def mark_email_as_read(self, email_id: str) -> str:
         """Marks email as read given ID."""
         try:
-            self.service.users().messages().modify(userId="me", id=email_id, body={'removeLabelIds': ['UNREAD']}).execute()
+            await self._execute(self.service.users().messages().modify(userId="me", id=email_id, body={'removeLabelIds': ['UNREAD']}))
+            await self._mailbox_changed()
             logger.info(f"Email marked as read: {email_id}")
             return "Email marked as read."
         except HttpError as error:
             return f"An HttpError occurred: {str(error)}"
+
+    async def read_emails(self, email_ids: list[str]) -> dict[str, dict[str, str] | str]:
+        """Retrieves many emails, from the cache or in HTTP batches, and marks them read with one batchModify."""
+        emails = {email_id: self._get_cached_email(email_id) for email_id in email_ids}
+        responses = await self._execute_batch({
+            email_id: self.service.users().messages().get(userId="me", id=email_id, format='raw')
+            for email_id, email in emails.items() if email is None
+        })
+        for email_id, (msg, error) in responses.items():
+            if error is not None:
+                emails[email_id] = f"An HttpError occurred: {str(error)}"
+                continue
+            try:
+                emails[email_id] = self._parse_raw_message(msg)
+            except Exception as parse_error:
+                emails[email_id] = f"Failed to parse email: {str(parse_error)}"
+        read_ids = [email_id for email_id, email in emails.items() if isinstance(email, dict)]
+        logger.info(f"Emails read: {len(read_ids)} of {len(email_ids)}")
+        if read_ids:
+            try:
+                await self._batch_modify(read_ids, {'removeLabelIds': ['UNREAD']})
+            except HttpError as error:
+                logger.error(f"Failed to mark emails as read: {str(error)}")
+        return emails
+
+    async def trash_emails(self, email_ids: list[str]) -> dict[str, Any]:
+        """Moves many emails to trash in HTTP batches."""
+        # batchDelete would delete permanently and needs the full https://mail.google.com/
+        # scope, trash stays recoverable and works with gmail.modify
+        responses = await self._execute_batch({
+            email_id: self.service.users().messages().trash(userId="me", id=email_id)
+            for email_id in email_ids
+        })
+        trashed = [email_id for email_id in email_ids if responses[email_id][1] is None]
+        failed = {
+            email_id: str(error) for email_id, (_, error) in responses.items() if error is not None
+        }
+        logger.info(f"Emails moved to trash: {len(trashed)} of {len(email_ids)}")
+        await self._mailbox_changed()
+        return {"trashed": trashed, "failed": failed}
+
+    async def search_emails(self, query: str, max_results: int = 20) -> list[dict[str, Any]] | str:
+        """Full-text search over the mailbox cache, no API calls. A stale cache is synced in the background."""
+        if not self.cache.searchable:
+            return "Email search is not available: this SQLite build has no FTS5."
+        if self.cache.history_id is None:
+            self._schedule_sync()
+            return "The mailbox is still being indexed, try again shortly."
+        if not self.cache.is_fresh(GMAIL_CACHE_MAX_AGE):
+            self._schedule_sync()
+        started = time.perf_counter()
+        results = self.cache.search(query, max_results)
+        logger.info(f"Email search for {query!r}: {len(results)} results in {(time.perf_counter() - started) * 1000:.1f}ms")
+        return results
+
+    async def _list_labels(self) -> list[dict[str, Any]]:
+        """All labels (IDs, names, types) of the mailbox, cached for GMAIL_LABEL_COUNTS_TTL"""
+        if self._labels is None or time.monotonic() - self._labels[0] > GMAIL_LABEL_COUNTS_TTL:
+            response = await self._execute(self.service.users().labels().list(userId='me', fields='labels(id,name,type)'))
+            self._labels = (time.monotonic(), response.get('labels', []))
+        return self._labels[1]
+
+    async def get_label_counts(self, labels: list[str]) -> dict[str, dict[str, Any] | str]:
+        """
+        Message and thread counts (total and unread) per label via labels.get, one call or
+        one HTTP batch for all labels not fetched within GMAIL_LABEL_COUNTS_TTL.
+        Labels are label IDs (INBOX, CATEGORY_PERSONAL, Label_12) or user label names."""
+        try:
+            known = await self._list_labels()
+        except HttpError as error:
+            logger.error(f"Failed to list labels, treating {labels} as label IDs: {str(error)}")
+            known = []
+        # A user label may be named like a system label ID (WORK, TODO), only known IDs are IDs
+        known_ids = {label['id'] for label in known}
+        ids_by_name = {label['name'].lower(): label['id'] for label in known}
+        label_ids = {
+            label: label if label in known_ids else ids_by_name.get(label.lower(), label)
+            for label in labels
+        }
+
+        now = time.monotonic()
+        stale = list(dict.fromkeys(
+            label_id for label_id in label_ids.values()
+            if label_id not in self._label_counts or now - self._label_counts[label_id][0] > GMAIL_LABEL_COUNTS_TTL
+        ))
+        errors = {}
+        if len(stale) == 1:
+            try:
+                response = await self._execute(
+                    self.service.users().labels().get(userId='me', id=stale[0], fields=LABEL_COUNT_FIELDS))
+                self._label_counts[stale[0]] = (now, response)
+            except HttpError as error:
+                errors[stale[0]] = f"An HttpError occurred: {str(error)}"
+        elif stale:
+            responses = await self._execute_batch({
+                label_id: self.service.users().labels().get(userId='me', id=label_id, fields=LABEL_COUNT_FIELDS)
+                for label_id in stale
+            })
+            for label_id, (response, error) in responses.items():
+                if error is not None:
+                    errors[label_id] = f"An HttpError occurred: {str(error)}"
+                else:
+                    self._label_counts[label_id] = (now, response)
+
+        return {
+            label: errors[label_id] if label_id in errors else self._label_counts[label_id][1]
+            for label, label_id in label_ids.items()
+        }
+
+    async def count_unread(self, labels: list[str] | None = None) -> dict[str, dict[str, Any] | str]:
+        """Unread message and thread counts per label (default the inbox)"""
+        counts = await self.get_label_counts(labels or ['INBOX'])
+        return {
+            label: count if isinstance(count, str) else {
+                'name': count.get('name', label),
+                'messagesUnread': count.get('messagesUnread', 0),
+                'threadsUnread': count.get('threadsUnread', 0),
+            }
+            for label, count in counts.items()
+        }
+
+    async def get_inbox_stats(self) -> dict[str, Any]:
+        """Counts of every label of the mailbox, system labels first"""
+        try:
+            labels = await self._list_labels()
+        except HttpError as error:
+            return {"error": f"An HttpError occurred: {str(error)}"}
+        labels = sorted(labels, key=lambda label: (label.get('type') != 'system', label['name'].lower()))
+        counts = await self.get_label_counts([label['id'] for label in labels])
+        return {
+            "account": self.user_email,
+            "labels": [
+                {"id": label_id, "error": count} if isinstance(count, str) else {
+                    "id": label_id,
+                    "name": count.get('name'),
+                    "messagesTotal": count.get('messagesTotal', 0),
+                    "messagesUnread": count.get('messagesUnread', 0),
+                    "threadsTotal": count.get('threadsTotal', 0),
+                    "threadsUnread": count.get('threadsUnread', 0),
+                }
+                for label_id, count in counts.items()
+            ],
+        }
+
+    @staticmethod
+    def _attachment_parts(payload: dict) -> list[dict[str, Any]]:
+        """Parts of a format=full payload that carry a file, in message order"""
+        attachments = []
+        parts = [payload]
+        while parts:
+            part = parts.pop(0)
+            body = part.get('body', {})
+            if part.get('filename') and ('attachmentId' in body or 'data' in body):
+                attachments.append(part)
+            parts = part.get('parts', []) + parts
+        return attachments
+
+    async def _get_attachment_parts(self, email_id: str) -> list[dict[str, Any]]:
+        # format=full carries attachment IDs, only small inline attachments come with data
+        msg = await self._execute(self.service.users().messages().get(
+            userId="me", id=email_id, format='full', fields='payload'))
+        return self._attachment_parts(msg.get('payload', {}))
+
+    async def list_attachments(self, email_id: str) -> list[dict[str, Any]] | str:
+        """Lists the attachments of an email: part ID, filename, MIME type and size."""
+        try:
+            parts = await self._get_attachment_parts(email_id)
+        except HttpError as error:
+            return f"An HttpError occurred: {str(error)}"
+        return [
+            {
+                'part_id': part.get('partId'),
+                'filename': part.get('filename'),
+                'mimeType': part.get('mimeType'),
+                'size': part.get('body', {}).get('size', 0),
+            }
+            for part in parts
+        ]
+
+    async def download_attachment(self, email_id: str, part_id: str) -> dict[str, Any] | str:
+        """
+        Saves an attachment to disk and returns its path, file URI, size and sha256.
+        The data is streamed from attachments.get and decoded chunk by chunk; an
+        attachment with the same content as one downloaded before is not stored twice."""
+        downloaded = self.cache.get_attachment(email_id, part_id)
+        if downloaded is not None and os.path.exists(downloaded['path']):
+            return self._attachment_result(downloaded['path'], downloaded['size'], downloaded['sha256'], True)
+
+        try:
+            # Attachment IDs change between requests, look the part up fresh
+            parts = await self._get_attachment_parts(email_id)
+        except HttpError as error:
+            return f"An HttpError occurred: {str(error)}"
+        part = next((part for part in parts if part.get('partId') == part_id), None)
+        if part is None:
+            return f"Email {email_id} has no attachment with part ID {part_id}."
+        filename = safe_filename(part.get('filename'), f"attachment-{part_id}")
+        body = part.get('body', {})
+
+        if 'attachmentId' in body:
+            request = self.service.users().messages().attachments().get(
+                userId="me", messageId=email_id, id=body['attachmentId'], fields='data')
+            save = lambda: self._stream_attachment(request.uri, filename)
+        else:
+            # Small attachments come inline with the message
+            data = body['data'] + '=' * (-len(body['data']) % 4)
+            save = lambda: self.attachments.save([urlsafe_b64decode(data)], filename)
+        try:
+            loop = asyncio.get_running_loop()
+            saved = await loop.run_in_executor(self._executor, save)
+        except Exception as error:
+            logger.error(f"Attachment download failed: {str(error)}")
+            return f"Failed to download attachment: {str(error)}"
+
+        await self._write_cache(
+            self.cache.put_attachment, email_id, part_id, saved['sha256'], saved['size'], saved['path'])
+        return self._attachment_result(saved['path'], saved['size'], saved['sha256'], saved['deduplicated'])
+
+    def _stream_attachment(self, uri: str, filename: str) -> dict[str, Any]:
+        """Stream an attachments.get response into the attachment store, blocking"""
+        with self._thread_session().get(uri, stream=True, timeout=60) as response:
+            response.raise_for_status()
+            return self.attachments.save(
+                decode_data_stream(response.iter_content(ATTACHMENT_CHUNK_BYTES)), filename)
+
+    @staticmethod
+    def _attachment_result(path: str, size: int, sha256: str, deduplicated: bool) -> dict[str, Any]:
+        return {
+            'path': path,
+            'uri': Path(path).as_uri(),
+            'size': size,
+            'sha256': sha256,
+            'deduplicated': deduplicated,
+        }
+
+    async def mark_emails_as_read(self, email_ids: list[str]) -> str:
+        """Marks many emails as read with messages.batchModify."""
+        try:
+            await self._batch_modify(email_ids, {'removeLabelIds': ['UNREAD']})
+            logger.info(f"Emails marked as read: {len(email_ids)}")
+            return f"{len(email_ids)} emails marked as read."
+        except HttpError as error:
+            return f"An HttpError occurred: {str(error)}"
   
 async def main(creds_file_path: str,
                token_path: str):
@@ -364,6 +1016,25 @@ async def main(creds_file_path: str,
 
         raise ValueError("Prompt implementation not found")
 
+    @server.list_resources()
+    async def handle_list_resources() -> list[types.Resource]:
+        return [
+            types.Resource(
+                uri=INBOX_STATS_URI,
+                name="inbox-stats",
+                description="Total and unread message and thread counts of every mailbox label",
+                mimeType="application/json",
+            )
+        ]
+
+    @server.read_resource()
+    async def handle_read_resource(uri: AnyUrl) -> list[ReadResourceContents]:
+        if str(uri) != INBOX_STATS_URI:
+            raise ValueError(f"Resource not found: {uri}")
+        await gmail_service.connect()
+        stats = await gmail_service.get_inbox_stats()
+        return [ReadResourceContents(content=json.dumps(stats, indent=2), mime_type="application/json")]
+
     @server.list_tools()
     async def handle_list_tools() -> list[types.Tool]:
         return [
@@ -408,10 +1079,22 @@ async def main(creds_file_path: str,
             ),
             types.Tool(
                 name="get-unread-emails",
-                description="Retrieve unread emails",
+                description="""Retrieve unread emails. 
+                Pass fields like from, subject and date to get an inbox summary without reading each email.""",
                 inputSchema={
                     "type": "object",
-                    "properties": {},
+                    "properties": {
+                        "max_results": {
+                            "type": "integer",
+                            "minimum": 1,
+                            "description": "Maximum number of emails to return (default all)",
+                        },
+                        "fields": {
+                            "type": "array",
+                            "items": {"type": "string", "enum": LISTING_FIELDS},
+                            "description": "Fields to return per email (default id and threadId)",
+                        },
+                    },
                     "required": []
                 },
             ),
@@ -443,6 +1126,122 @@ async def main(creds_file_path: str,
                     "required": ["email_id"],
                 },
             ),
+            types.Tool(
+                name="read-emails",
+                description="Retrieves the content of many emails in one call and marks them as read",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "email_ids": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "Email IDs",
+                        },
+                    },
+                    "required": ["email_ids"],
+                },
+            ),
+            types.Tool(
+                name="trash-emails",
+                description="""Moves many emails to trash in one call. 
+                Confirm before moving emails to trash.""",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "email_ids": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "Email IDs",
+                        },
+                    },
+                    "required": ["email_ids"],
+                },
+            ),
+            types.Tool(
+                name="mark-emails-as-read",
+                description="Marks many emails as read in one call",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "email_ids": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "Email IDs",
+                        },
+                    },
+                    "required": ["email_ids"],
+                },
+            ),
+            types.Tool(
+                name="search-emails",
+                description="""Searches emails by words in subject, sender, recipient and body, best matches first. 
+                Quote phrases, end a word with * to match a prefix, and restrict a word to a field with 
+                subject:, from:, to: or body:, e.g. from:alice "quarterly report".""",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "query": {
+                            "type": "string",
+                            "description": "Search words",
+                        },
+                        "max_results": {
+                            "type": "integer",
+                            "minimum": 1,
+                            "description": "Maximum number of emails to return (default 20)",
+                        },
+                    },
+                    "required": ["query"],
+                },
+            ),
+            types.Tool(
+                name="count-unread",
+                description="""Counts unread emails and conversations without listing them. 
+                Use this to answer how many unread emails there are.""",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "labels": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "Label IDs (INBOX, CATEGORY_PERSONAL, ...) or label names to count (default INBOX)",
+                        },
+                    },
+                    "required": []
+                },
+            ),
+            types.Tool(
+                name="list-attachments",
+                description="Lists the attachments of an email with part ID, filename, type and size",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "email_id": {
+                            "type": "string",
+                            "description": "Email ID",
+                        },
+                    },
+                    "required": ["email_id"],
+                },
+            ),
+            types.Tool(
+                name="download-attachment",
+                description="""Saves an email attachment to disk. 
+                Returns the file path and URI, size and SHA-256 hash.""",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "email_id": {
+                            "type": "string",
+                            "description": "Email ID",
+                        },
+                        "part_id": {
+                            "type": "string",
+                            "description": "Attachment part ID from list-attachments",
+                        },
+                    },
+                    "required": ["email_id", "part_id"],
+                },
+            ),
             types.Tool(
                 name="open-email",
                 description="Open email in browser",
@@ -464,6 +1263,9 @@ async def main(creds_file_path: str,
         name: str, arguments: dict | None
     ) -> list[types.TextContent | types.ImageContent | types.EmbeddedResource]:
 
+        # Usually done by the warm-up by now
+        await gmail_service.connect()
+
         if name == "send-email":
             recipient = arguments.get("recipient_id")
             if not recipient:
@@ -492,8 +1294,18 @@ async def main(creds_file_path: str,
             return [types.TextContent(type="text", text=response_text)]
 
         if name == "get-unread-emails":
-                
-            unread_emails = await gmail_service.get_unread_emails()
+            arguments = arguments or {}
+            ctx = server.request_context
+            progress_token = ctx.meta.progressToken if ctx.meta else None
+
+            async def send_page(page: list[dict[str, Any]], listed: int) -> None:
+                # Stream every page to clients that asked for progress
+                if progress_token is not None:
+                    await ctx.session.send_progress_notification(
+                        progress_token, listed, total=arguments.get("max_results"), message=str(page))
+
+            unread_emails = await gmail_service.get_unread_emails(
+                arguments.get("max_results"), arguments.get("fields"), on_page=send_page)
             return [types.TextContent(type="text", text=str(unread_emails),artifact={"type": "json", "data": unread_emails} )]
         
         if name == "read-email":
@@ -524,10 +1336,61 @@ async def main(creds_file_path: str,
                 
             msg = await gmail_service.mark_email_as_read(email_id)
             return [types.TextContent(type="text", text=str(msg))]
+        if name == "search-emails":
+            query = arguments.get("query")
+            if not query:
+                raise ValueError("Missing query parameter")
+
+            search_results = await gmail_service.search_emails(query, arguments.get("max_results") or 20)
+            return [types.TextContent(type="text", text=str(search_results),artifact={"type": "json", "data": search_results} )]
+        if name == "list-attachments":
+            email_id = arguments.get("email_id")
+            if not email_id:
+                raise ValueError("Missing email ID parameter")
+
+            attachments = await gmail_service.list_attachments(email_id)
+            return [types.TextContent(type="text", text=str(attachments),artifact={"type": "json", "data": attachments} )]
+        if name == "download-attachment":
+            email_id = arguments.get("email_id")
+            if not email_id:
+                raise ValueError("Missing email ID parameter")
+            part_id = arguments.get("part_id")
+            if not part_id:
+                raise ValueError("Missing part ID parameter")
+
+            attachment = await gmail_service.download_attachment(email_id, part_id)
+            return [types.TextContent(type="text", text=str(attachment),artifact={"type": "dictionary", "data": attachment} )]
+        if name == "count-unread":
+            unread_counts = await gmail_service.count_unread((arguments or {}).get("labels"))
+            return [types.TextContent(type="text", text=str(unread_counts),artifact={"type": "dictionary", "data": unread_counts} )]
+        if name in ("read-emails", "trash-emails", "mark-emails-as-read"):
+            email_ids = arguments.get("email_ids")
+            if not email_ids:
+                raise ValueError("Missing email IDs parameter")
+            # Duplicates would collide as batch request IDs
+            email_ids = list(dict.fromkeys(email_ids))
+
+            if name == "read-emails":
+                retrieved_emails = await gmail_service.read_emails(email_ids)
+                return [types.TextContent(type="text", text=str(retrieved_emails),artifact={"type": "dictionary", "data": retrieved_emails} )]
+            if name == "trash-emails":
+                trash_result = await gmail_service.trash_emails(email_ids)
+                return [types.TextContent(type="text", text=str(trash_result),artifact={"type": "dictionary", "data": trash_result} )]
+            msg = await gmail_service.mark_emails_as_read(email_ids)
+            return [types.TextContent(type="text", text=str(msg))]
         else:
             logger.error(f"Unknown tool: {name}")
             raise ValueError(f"Unknown tool: {name}")
 
+    async def warm_up() -> None:
+        try:
+            await gmail_service.connect()
+        except Exception as error:
+            logger.error(f"Gmail warm-up failed, retrying on first tool call: {str(error)}")
+
+    # Auth, service build and profile lookup run while the client initializes and lists tools
+    warm_up_task = asyncio.create_task(warm_up())
+
     async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
         await server.run(
             read_stream,
@@ -541,6 +1404,8 @@ async def main(creds_file_path: str,
                 ),
             ),
         )
+    warm_up_task.cancel()
+    gmail_service.close()
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Gmail API MCP Server')
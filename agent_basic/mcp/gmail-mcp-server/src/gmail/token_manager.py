@@ -0,0 +1,137 @@
+"""
+OAuth token handling for the Gmail MCP server.
+
+TokenManager loads the user's token (running the OAuth flow if there is none),
+refreshes it in the background shortly before it expires so that tool calls never
+wait for a refresh, and persists every new token to token_path atomically.
+The credentials object is shared by all API worker threads; its refresh is
+serialized by a lock, including refreshes google-auth starts on its own.
+"""
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import threading
+from datetime import datetime, timezone
+from typing import Callable
+
+from google.auth.exceptions import RefreshError
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from google_auth_oauthlib.flow import InstalledAppFlow
+
+logger = logging.getLogger(__name__)
+
+# Wait before retrying a failed background refresh
+REFRESH_RETRY_SECONDS = 30.0
+
+
+class LockedCredentials(Credentials):
+    """Credentials whose refresh runs in one thread at a time"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._refresh_lock = threading.Lock()
+        self.on_refresh: Callable[["LockedCredentials"], None] | None = None
+
+    def refresh(self, request) -> None:
+        # Also called after a 401 for a token that is valid locally. Only skip the
+        # refresh if another thread replaced the token while this one waited
+        token = self.token
+        self.refresh_if(request, lambda: self.token == token)
+
+    def refresh_if(self, request, needed: Callable[[], bool]) -> bool:
+        """Refresh if needed() holds once the lock is held. True if this call refreshed"""
+        with self._refresh_lock:
+            if not needed():
+                return False
+            super().refresh(request)
+            if self.on_refresh is not None:
+                self.on_refresh(self)
+            return True
+
+
+class TokenManager:
+    def __init__(self, creds_file_path: str, token_path: str, scopes: list[str], refresh_margin: float = 300.0):
+        self.creds_file_path = creds_file_path
+        self.token_path = token_path
+        self.scopes = scopes
+        # Refresh this many seconds before expiry, more than google-auth's own
+        # threshold (3m45s) so that it never refreshes inside a request
+        self.refresh_margin = refresh_margin
+        self.credentials: LockedCredentials | None = None
+
+    def load(self) -> LockedCredentials:
+        """Get or refresh Google API token, blocking, running the OAuth flow if needed"""
+        token = None
+
+        if os.path.exists(self.token_path):
+            logger.info('Loading token from file')
+            token = LockedCredentials.from_authorized_user_file(self.token_path, self.scopes)
+
+        if not token or not token.valid:
+            if token and token.expired and token.refresh_token:
+                logger.info('Refreshing token')
+                token.refresh(Request())
+            else:
+                logger.info('Fetching new token')
+                flow = InstalledAppFlow.from_client_secrets_file(self.creds_file_path, self.scopes)
+                token = LockedCredentials.from_authorized_user_info(
+                    json.loads(flow.run_local_server(port=0).to_json()), self.scopes)
+            self.persist(token)
+
+        token.on_refresh = self.persist
+        self.credentials = token
+        return token
+
+    def persist(self, token: Credentials) -> None:
+        """Write the token to token_path atomically, readers never see a partial file"""
+        directory = os.path.dirname(os.path.abspath(self.token_path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.token-', suffix='.json')
+        try:
+            with os.fdopen(fd, 'w') as token_file:
+                token_file.write(token.to_json())
+                token_file.flush()
+                os.fsync(token_file.fileno())
+            os.replace(temp_path, self.token_path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        logger.info(f'Token saved to {self.token_path}')
+
+    def seconds_until_refresh(self) -> float | None:
+        """Time left before the token is due for a refresh, None if it cannot be refreshed"""
+        if self.credentials is None or not self.credentials.refresh_token or self.credentials.expiry is None:
+            return None
+        # google-auth keeps expiry as naive UTC
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        return (self.credentials.expiry - now).total_seconds() - self.refresh_margin
+
+    def refresh_if_due(self) -> bool:
+        """Refresh if within refresh_margin of expiry, blocking. True if this call refreshed"""
+        refreshed = self.credentials.refresh_if(
+            Request(), lambda: (self.seconds_until_refresh() or 0.0) <= 0.0)
+        if refreshed:
+            logger.info(f'Token refreshed ahead of expiry, valid until {self.credentials.expiry} UTC')
+        return refreshed
+
+    async def keep_fresh(self, executor) -> None:
+        """Refresh the token on executor shortly before every expiry, until cancelled"""
+        loop = asyncio.get_running_loop()
+        while True:
+            delay = self.seconds_until_refresh()
+            if delay is None:
+                logger.info('Token has no refresh token or expiry, background refresh disabled')
+                return
+            await asyncio.sleep(max(delay, 1.0))
+            try:
+                await loop.run_in_executor(executor, self.refresh_if_due)
+            except RefreshError as error:
+                # Revoked or expired refresh token, only the OAuth flow can help
+                logger.error(f'Token refresh failed, background refresh stopped: {str(error)}')
+                return
+            except Exception as error:
+                logger.error(f'Token refresh failed, retrying in {REFRESH_RETRY_SECONDS:.0f}s: {str(error)}')
+                await asyncio.sleep(REFRESH_RETRY_SECONDS)
+
@@ -0,0 +1,181 @@
+import base64
+import json
+import os
+import re
+import sys
+import threading
+from urllib.parse import parse_qs, urlparse
+
+import httplib2
+import pytest
+
+# The server modules import each other by name when server.py runs as a script
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'gmail'))
+
+import server  # noqa: E402
+
+
+def raw_message(subject: str, body: str, sender: str = "alice@example.com") -> str:
+    """base64url raw RFC 2822 message, as format=raw returns it"""
+    message = (f"From: {sender}\r\nTo: me@example.com\r\nSubject: {subject}\r\n"
+               f"Date: Mon, 1 Jan 2024 00:00:00 +0000\r\nContent-Type: text/plain\r\n\r\n{body}")
+    return base64.urlsafe_b64encode(message.encode()).decode()
+
+
+class FakeGmail:
+    """
+    In-memory mailbox behind a fake httplib2 transport, answering the Gmail API
+    requests GmailService makes, including HTTP batches.
+    """
+
+    def __init__(self):
+        self.messages = {}
+        self.history_id = 100
+        self.history = []
+        self.labels = {"INBOX": {"name": "INBOX", "type": "system"}, "UNREAD": {"name": "UNREAD", "type": "system"}}
+        # message ID -> list of statuses returned by the next messages.get calls
+        self.failures = {}
+        self.requests = []
+        # Sizes of the HTTP batches and bodies of the batchModify calls received
+        self.batch_sizes = []
+        self.modified = []
+        self.lock = threading.Lock()
+
+    def add_message(self, message_id: str, labels: list[str], internal_date: int = 0, subject: str = None):
+        self.messages[message_id] = {
+            "labels": labels, "internalDate": internal_date, "subject": subject or f"Subject {message_id}"}
+
+    def full_message(self, message_id: str) -> dict:
+        message = self.messages[message_id]
+        body = base64.urlsafe_b64encode(f"Body of {message_id}".encode()).decode()
+        return {
+            "id": message_id, "threadId": f"t{message_id}", "labelIds": message["labels"],
+            "internalDate": str(message["internalDate"]), "snippet": f"Snippet {message_id}",
+            "payload": message.get("payload") or {
+                "mimeType": "text/plain",
+                "headers": [{"name": "Subject", "value": message["subject"]},
+                            {"name": "From", "value": "alice@example.com"}, {"name": "To", "value": "me@example.com"}],
+                "body": {"data": body},
+            },
+        }
+
+    def handle(self, method: str, path: str, body: dict = None) -> tuple[int, dict]:
+        with self.lock:
+            self.requests.append((method, path))
+        url = urlparse(path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if url.path.endswith('/profile'):
+            return 200, {"emailAddress": "me@example.com", "historyId": str(self.history_id)}
+        if url.path.endswith('/labels'):
+            return 200, {"labels": [{"id": i, **label} for i, label in self.labels.items()]}
+        match = re.search(r'/labels/([^/?]+)$', url.path)
+        if match:
+            label_id = match.group(1)
+            if label_id not in self.labels:
+                return 404, {"error": {"code": 404, "message": "Requested entity was not found."}}
+            counted = [m for m in self.messages.values() if label_id in m["labels"]]
+            unread = [m for m in counted if "UNREAD" in m["labels"]]
+            return 200, {"id": label_id, **self.labels[label_id], "messagesTotal": len(counted),
+                         "messagesUnread": len(unread), "threadsTotal": len(counted), "threadsUnread": len(unread)}
+        if url.path.endswith('/history'):
+            return 200, {"history": self.history, "historyId": str(self.history_id)}
+        if url.path.endswith('/messages'):
+            ids = sorted(self.messages, key=lambda i: -self.messages[i]["internalDate"])
+            if 'q' in query:
+                ids = [i for i in ids if "UNREAD" in self.messages[i]["labels"]]
+            start = int(query.get("pageToken", 0))
+            end = start + int(query.get("maxResults", 100))
+            response = {"messages": [{"id": i, "threadId": f"t{i}"} for i in ids[start:end]]}
+            if end < len(ids):
+                response["nextPageToken"] = str(end)
+            return 200, response
+        if url.path.endswith('/messages/batchModify') and method == 'POST':
+            with self.lock:
+                self.modified.append(body)
+            for message_id in body["ids"]:
+                if message_id in self.messages:
+                    labels = self.messages[message_id]["labels"]
+                    labels[:] = [label for label in labels if label not in body.get("removeLabelIds", [])]
+                    labels.extend(body.get("addLabelIds", []))
+            return 204, {}
+        match = re.search(r'/messages/([^/?]+)/trash$', url.path)
+        if match and method == 'POST':
+            if match.group(1) not in self.messages:
+                return 404, {"error": {"code": 404, "message": "Not Found"}}
+            self.messages[match.group(1)]["labels"] = ["TRASH"]
+            return 200, {"id": match.group(1), "labelIds": ["TRASH"]}
+        match = re.search(r'/messages/([^/?]+)$', url.path)
+        if match and method == 'GET':
+            message_id = match.group(1)
+            with self.lock:
+                failures = self.failures.get(message_id)
+                status = failures.pop(0) if failures else None
+            if status is not None:
+                return status, {"error": {"code": status, "message": "fake failure"}}
+            if message_id not in self.messages:
+                return 404, {"error": {"code": 404, "message": "Not Found"}}
+            if query.get("format") == "raw":
+                message = self.messages[message_id]
+                return 200, {"id": message_id, "raw": raw_message(message["subject"], f"Body of {message_id}")}
+            return 200, self.full_message(message_id)
+        return 404, {"error": {"code": 404, "message": f"No fake route for {method} {path}"}}
+
+    def http(self, *args, **kwargs) -> "FakeHttp":
+        return FakeHttp(self)
+
+
+class FakeHttp:
+    def __init__(self, gmail: FakeGmail):
+        self.gmail = gmail
+        self.timeout = None
+        self.redirect_codes = set()
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        if uri.endswith('/batch') or '/batch/' in uri:
+            boundary = re.search(r'boundary="?([^";]+)', headers['content-type']).group(1)
+            body = body.decode() if isinstance(body, bytes) else body
+            parts = []
+            requests = body.split('--' + boundary)[1:-1]
+            with self.gmail.lock:
+                self.gmail.batch_sizes.append(len(requests))
+            for part in requests:
+                content_id = re.search(r'Content-ID: <([^>]+)>', part).group(1)
+                request_line = re.search(r'(GET|POST|PUT|DELETE|PATCH) (\S+) HTTP/1.1', part)
+                request_body = re.split(r'\r?\n\r?\n', part[request_line.end():], maxsplit=1)[-1].strip()
+                status, payload = self.gmail.handle(
+                    request_line.group(1), request_line.group(2), json.loads(request_body) if request_body else None)
+                parts.append(f"--BOUNDARY\r\nContent-Type: application/http\r\n"
+                             f"Content-ID: <response-{content_id}>\r\n\r\n"
+                             f"HTTP/1.1 {status} Status\r\nContent-Type: application/json\r\n\r\n"
+                             f"{json.dumps(payload)}\r\n")
+            data = ("".join(parts) + "--BOUNDARY--").encode()
+            return httplib2.Response({"status": 200, "content-type": "multipart/mixed; boundary=BOUNDARY"}), data
+        status, payload = self.gmail.handle(
+            method, uri.split('googleapis.com', 1)[-1], json.loads(body) if body else None)
+        return httplib2.Response({"status": status, "content-type": "application/json"}), json.dumps(payload).encode()
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def gmail(monkeypatch):
+    fake = FakeGmail()
+    monkeypatch.setattr(server.httplib2, "Http", fake.http)
+    monkeypatch.setattr(server, "GMAIL_SYNC_RETRY_DELAY", 0.0)
+    return fake
+
+
+@pytest.fixture
+def service(gmail, tmp_path):
+    from google.oauth2.credentials import Credentials
+    from googleapiclient.discovery import build
+
+    gmail_service = server.GmailService('creds.json', str(tmp_path / 'token.json'))
+    gmail_service.token = Credentials(token="token")
+    gmail_service.service = build('gmail', 'v1', credentials=gmail_service.token,
+                                  static_discovery=True, cache_discovery=False)
+    gmail_service.user_email = "me@example.com"
+    yield gmail_service
+    gmail_service.close()
+    gmail_service.cache.close()
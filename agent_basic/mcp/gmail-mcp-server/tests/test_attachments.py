@@ -0,0 +1,129 @@
+import asyncio
+import base64
+import hashlib
+import os
+import random
+
+import pytest
+
+from attachments import AttachmentStore, decode_data_stream, safe_filename
+
+DATA = os.urandom(300_000)
+
+
+def response_body(data: bytes, padded: bool = True) -> bytes:
+    encoded = base64.urlsafe_b64encode(data)
+    if not padded:
+        encoded = encoded.rstrip(b'=')
+    return b'{\n  "data": "' + encoded + b'"\n}\n'
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_decode_data_stream_any_chunking(seed):
+    rng = random.Random(seed)
+    data = DATA[:rng.randint(0, 5000)] if seed % 5 else DATA
+    body = response_body(data, padded=seed % 2 == 0)
+    cuts = sorted(rng.sample(range(1, len(body)), min(len(body) - 1, rng.randint(0, 20))))
+    chunks = [body[start:end] for start, end in zip([0] + cuts, cuts + [len(body)])]
+    assert b''.join(decode_data_stream(chunks)) == data
+
+
+def test_decode_data_stream_without_data():
+    with pytest.raises(ValueError):
+        list(decode_data_stream([b'{"error": {}}']))
+
+
+def test_safe_filename():
+    assert safe_filename("../../evil/report.pdf", "fallback") == "report.pdf"
+    assert safe_filename("", "attachment-1") == "attachment-1"
+    assert "/" not in safe_filename("a/b\\c:d", "x") and "\\" not in safe_filename("a/b\\c:d", "x")
+
+
+def test_store_deduplicates_by_content(tmp_path):
+    store = AttachmentStore(str(tmp_path))
+    first = store.save([b'hello ', b'world'], "a.txt")
+    second = store.save([b'hello world'], "b.txt")
+
+    assert first["deduplicated"] is False and second["deduplicated"] is True
+    assert second["path"] == first["path"]
+    assert first["sha256"] == hashlib.sha256(b'hello world').hexdigest() and first["size"] == 11
+    assert sorted(os.listdir(tmp_path)) == [first["sha256"]]
+
+
+def test_store_removes_partial_download(tmp_path):
+    def failing():
+        yield b'partial'
+        raise ConnectionError("reset")
+
+    with pytest.raises(ConnectionError):
+        AttachmentStore(str(tmp_path)).save(failing(), "a.txt")
+    assert os.listdir(tmp_path) == []
+
+
+class StreamedResponse:
+    def __init__(self, body: bytes):
+        self.body = body
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), chunk_size):
+            yield self.body[start:start + chunk_size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+class FakeSession:
+    def __init__(self):
+        self.urls = []
+
+    def get(self, url, stream=False, **kwargs):
+        assert stream
+        self.urls.append(url)
+        return StreamedResponse(response_body(DATA))
+
+
+def test_download_attachment(service, gmail, tmp_path, monkeypatch):
+    payload = {"partId": "", "mimeType": "multipart/mixed", "filename": "", "parts": [
+        {"partId": "0", "mimeType": "text/plain", "filename": "", "body": {"size": 5, "data": "aGVsbG8"}},
+        {"partId": "1", "mimeType": "application/pdf", "filename": "../../evil/report.pdf",
+         "body": {"size": len(DATA), "attachmentId": "ATT"}},
+        {"partId": "2", "mimeType": "text/plain", "filename": "note.txt", "body": {"size": 5, "data": "aGVsbG8"}},
+    ]}
+    for message_id in ("m1", "m2"):
+        gmail.add_message(message_id, ["INBOX"])
+        gmail.messages[message_id]["payload"] = payload
+    session = FakeSession()
+    monkeypatch.setattr(service, "_thread_session", lambda: session)
+
+    async def scenario():
+        listed = await service.list_attachments("m1")
+        assert [part["part_id"] for part in listed] == ["1", "2"]
+
+        saved = await service.download_attachment("m1", "1")
+        assert os.path.basename(saved["path"]) == "report.pdf"
+        with open(saved["path"], 'rb') as file:
+            assert file.read() == DATA
+        assert saved["sha256"] == hashlib.sha256(DATA).hexdigest() and not saved["deduplicated"]
+        assert len(session.urls) == 1 and "/attachments/ATT" in session.urls[0]
+
+        # Downloaded before, nothing is fetched
+        assert (await service.download_attachment("m1", "1"))["deduplicated"]
+        assert len(session.urls) == 1
+
+        # Same content in another email is stored once
+        other = await service.download_attachment("m2", "1")
+        assert other["deduplicated"] and other["path"] == saved["path"]
+
+        inline = await service.download_attachment("m1", "2")
+        with open(inline["path"], 'rb') as file:
+            assert file.read() == b'hello'
+
+        assert "no attachment with part ID 9" in await service.download_attachment("m1", "9")
+
+    asyncio.run(scenario())
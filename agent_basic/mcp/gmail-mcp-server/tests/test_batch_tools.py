@@ -0,0 +1,64 @@
+import asyncio
+
+import server
+
+
+def test_read_emails_reports_per_id_failures(service, gmail, monkeypatch):
+    gmail.add_message("m1", ["INBOX", "UNREAD"], subject="First")
+    gmail.add_message("m2", ["INBOX", "UNREAD"], subject="Second")
+    gmail.failures = {"m2": [500]}
+    service.cache.put_messages([{"id": "m3", "subject": "Cached", "content": "Cached body", "labelIds": ["UNREAD"]}])
+
+    emails = asyncio.run(service.read_emails(["m1", "m2", "m3", "missing"]))
+
+    assert emails["m1"]["subject"] == "First" and emails["m1"]["content"].strip() == "Body of m1"
+    assert emails["m3"]["content"] == "Cached body"
+    assert "HttpError" in emails["m2"] and "HttpError" in emails["missing"]
+    # The cached message is not fetched, the rest in one HTTP batch
+    assert gmail.batch_sizes == [3]
+    # Only the emails that were read are marked read, in one batchModify
+    assert gmail.modified == [{"ids": ["m1", "m3"], "removeLabelIds": ["UNREAD"]}]
+
+
+def test_trash_emails_reports_per_id_failures(service, gmail):
+    gmail.add_message("m1", ["INBOX"])
+    gmail.add_message("m2", ["INBOX"])
+
+    result = asyncio.run(service.trash_emails(["m1", "missing", "m2"]))
+
+    assert result["trashed"] == ["m1", "m2"]
+    assert list(result["failed"]) == ["missing"]
+    assert gmail.batch_sizes == [3]
+    assert gmail.messages["m1"]["labels"] == ["TRASH"]
+
+
+def test_batches_are_split_at_the_batch_size(service, gmail, monkeypatch):
+    monkeypatch.setattr(server, "GMAIL_BATCH_SIZE", 2)
+    for i in range(5):
+        gmail.add_message(f"m{i}", ["INBOX"])
+
+    result = asyncio.run(service.trash_emails([f"m{i}" for i in range(5)]))
+
+    assert len(result["trashed"]) == 5
+    assert sorted(gmail.batch_sizes) == [1, 2, 2]
+
+
+def test_mark_emails_as_read_uses_one_batch_modify(service, gmail):
+    for i in range(4):
+        gmail.add_message(f"m{i}", ["INBOX", "UNREAD"])
+
+    assert asyncio.run(service.mark_emails_as_read([f"m{i}" for i in range(4)])) == "4 emails marked as read."
+
+    assert gmail.modified == [{"ids": ["m0", "m1", "m2", "m3"], "removeLabelIds": ["UNREAD"]}]
+    assert all("UNREAD" not in message["labels"] for message in gmail.messages.values())
+    assert not any(path.split('?')[0].endswith('/modify') for method, path in gmail.requests)
+
+
+def test_batch_modify_is_split_at_its_id_limit(service, gmail, monkeypatch):
+    monkeypatch.setattr(server, "GMAIL_MODIFY_BATCH_SIZE", 3)
+    for i in range(4):
+        gmail.add_message(f"m{i}", ["INBOX", "UNREAD"])
+
+    asyncio.run(service.mark_emails_as_read([f"m{i}" for i in range(4)]))
+
+    assert sorted(len(body["ids"]) for body in gmail.modified) == [1, 3]
@@ -0,0 +1,67 @@
+import threading
+
+from cache import MailCache
+
+
+def message(message_id, subject="Report"):
+    return {"id": message_id, "threadId": "t", "internalDate": 1, "subject": subject, "from": "bob@example.com",
+            "to": "me@example.com", "content": f"Body of {message_id}", "labelIds": ["INBOX", "UNREAD"]}
+
+
+def ids(messages):
+    return {message["id"] for message in messages}
+
+
+def test_reads_do_not_wait_for_a_sync_write(tmp_path):
+    mail_cache = MailCache(str(tmp_path / 'cache.sqlite3'))
+    mail_cache.replace_all([message("old")], "1")
+    writing = threading.Event()
+    release = threading.Event()
+
+    def slow_messages():
+        yield message("new1")
+        writing.set()
+        assert release.wait(5)
+        yield message("new2")
+
+    writer = threading.Thread(target=mail_cache.replace_all, args=(slow_messages(), "2"))
+    writer.start()
+    try:
+        assert writing.wait(5)
+        # The full sync is half written, readers see the last committed state at once
+        assert mail_cache.history_id == "1"
+        assert mail_cache.is_fresh(60)
+        assert ids(mail_cache.list_by_labels(["UNREAD"])) == {"old"}
+        assert mail_cache.get_email("new1") is None
+        assert mail_cache.cached_ids(["old", "new1"]) == {"old"}
+        if mail_cache.searchable:
+            assert ids(mail_cache.search("report")) == {"old"}
+    finally:
+        release.set()
+        writer.join()
+
+    assert mail_cache.history_id == "2"
+    assert ids(mail_cache.list_by_labels(["UNREAD"])) == {"new1", "new2"}
+    assert mail_cache.get_email("new2")["content"] == "Body of new2"
+    mail_cache.close()
+
+
+def test_failed_write_is_rolled_back(tmp_path):
+    mail_cache = MailCache(str(tmp_path / 'cache.sqlite3'))
+    mail_cache.replace_all([message("old")], "1", pending=["p1"])
+
+    def broken_messages():
+        yield message("new1")
+        raise RuntimeError("parse error")
+
+    try:
+        mail_cache.apply_changes(broken_messages(), ["old"], {}, "2")
+    except RuntimeError:
+        pass
+    assert mail_cache.history_id == "1"
+    assert mail_cache.pending_ids == {"p1"}
+    assert ids(mail_cache.list_by_labels(["UNREAD"])) == {"old"}
+
+    mail_cache.mark_stale()
+    assert not mail_cache.is_fresh(60)
+    mail_cache.close()
@@ -0,0 +1,103 @@
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+
+import anyio
+import mcp.server.stdio
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build
+from mcp import ClientSession
+from mcp.shared.memory import create_client_server_memory_streams
+
+import server
+
+
+class IdleTokenManager:
+    def __init__(self):
+        self.started = 0
+
+    async def keep_fresh(self, executor):
+        self.started += 1
+
+
+def connect_as_fake_user(service):
+    """What GmailService._connect sets up, against the fake transport"""
+    service.token_manager = IdleTokenManager()
+    service.token = Credentials(token="token")
+    service.service = build('gmail', 'v1', credentials=service.token, static_discovery=True, cache_discovery=False)
+    service.user_email = "me@example.com"
+
+
+def test_connect_runs_once_and_retries_after_a_failure(gmail, tmp_path, monkeypatch):
+    calls = []
+
+    def fake_connect(self):
+        calls.append(threading.current_thread())
+        if len(calls) == 1:
+            raise RuntimeError("OAuth flow not completed")
+        connect_as_fake_user(self)
+
+    monkeypatch.setattr(server.GmailService, "_connect", fake_connect)
+    service = server.GmailService('creds.json', str(tmp_path / 'token.json'))
+
+    async def scenario():
+        results = await asyncio.gather(*[service.connect() for _ in range(3)], return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert len(calls) == 1
+
+        await asyncio.gather(*[service.connect() for _ in range(3)])
+        await service.connect()
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    assert len(calls) == 2
+    assert threading.main_thread() not in calls
+    assert service.token_manager.started == 1
+    service.close()
+    service.cache.close()
+
+
+def test_server_answers_before_connect_finishes(gmail, tmp_path, monkeypatch):
+    release = threading.Event()
+    connects = []
+
+    def slow_connect(self):
+        connects.append(self)
+        if len(connects) == 1:
+            # The warm-up, e.g. waiting for the user in the OAuth flow, then failing
+            assert release.wait(5)
+            raise RuntimeError("OAuth flow not completed")
+        connect_as_fake_user(self)
+
+    monkeypatch.setattr(server.GmailService, "_connect", slow_connect)
+
+    async def scenario():
+        async with create_client_server_memory_streams() as (client_streams, server_streams):
+            @asynccontextmanager
+            async def memory_stdio():
+                yield server_streams
+
+            monkeypatch.setattr(mcp.server.stdio, "stdio_server", memory_stdio)
+            async with anyio.create_task_group() as tasks:
+                tasks.start_soon(server.main, 'creds.json', str(tmp_path / 'token.json'))
+                async with ClientSession(*client_streams) as client:
+                    with anyio.fail_after(2):
+                        await client.initialize()
+                        tools = await client.list_tools()
+                    assert "count-unread" in [tool.name for tool in tools.tools]
+                    assert not release.is_set() and len(connects) == 1
+
+                    release.set()
+                    with anyio.fail_after(5):
+                        while connects[0]._connecting is not None:
+                            await anyio.sleep(0.01)
+                        result = await client.call_tool("count-unread", {})
+                    assert not result.isError
+                    assert "'messagesUnread': 1" in result.content[0].text
+                tasks.cancel_scope.cancel()
+
+    gmail.add_message("m1", ["INBOX", "UNREAD"])
+    asyncio.run(scenario())
+    assert len(connects) == 2
+    connects[0].close()
+    connects[0].cache.close()
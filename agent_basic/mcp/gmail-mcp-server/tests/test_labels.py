@@ -0,0 +1,24 @@
+import asyncio
+
+
+def test_label_counts_resolve_user_label_names(service, gmail):
+    gmail.labels["Label_1"] = {"name": "WORK", "type": "user"}
+    gmail.labels["Label_2"] = {"name": "Travel plans", "type": "user"}
+    gmail.add_message("m1", ["INBOX", "UNREAD", "Label_1"])
+    gmail.add_message("m2", ["INBOX", "Label_1", "Label_2"])
+
+    counts = asyncio.run(service.get_label_counts(["INBOX", "WORK", "travel plans", "Label_2", "MISSING"]))
+
+    assert counts["INBOX"]["messagesTotal"] == 2 and counts["INBOX"]["messagesUnread"] == 1
+    assert counts["WORK"]["id"] == "Label_1" and counts["WORK"]["messagesUnread"] == 1
+    assert counts["travel plans"]["id"] == "Label_2"
+    assert counts["Label_2"]["messagesTotal"] == 1
+    assert "HttpError" in counts["MISSING"]
+    label_gets = [path for method, path in gmail.requests if "/labels/" in path]
+    assert len([path for path in label_gets if "/labels/Label_2" in path]) == 1
+
+
+def test_label_counts_are_cached(service, gmail):
+    asyncio.run(service.get_label_counts(["INBOX"]))
+    asyncio.run(service.get_label_counts(["inbox"]))
+    assert len([path for method, path in gmail.requests if "/labels/INBOX" in path]) == 1
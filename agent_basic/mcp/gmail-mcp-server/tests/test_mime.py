@@ -0,0 +1,73 @@
+from email.message import EmailMessage
+
+from mime import parse_raw_message, shrink_body, strip_quoted_reply
+
+REPLY = "Thanks, see below.\n\nOn Mon, Jan 1, 2024 at 10:00 Bob <bob@example.com> wrote:\n> earlier\n> text\n"
+
+
+def multipart_message() -> bytes:
+    message = EmailMessage()
+    message['From'] = '=?utf-8?q?J=C3=B6rg?= <jorg@example.com>'
+    message['To'] = 'me@example.com'
+    message['Subject'] = '=?utf-8?b?R3LDvMOfZQ==?='
+    message['Date'] = 'Mon, 1 Jan 2024 00:00:00 +0000'
+    message.set_content("Ünïcode reply. " + REPLY)
+    message.add_alternative("<html><body><p>Ünïcode <b>reply</b></p></body></html>", subtype='html')
+    message.add_attachment(b'\0' * 100_000, maintype='application', subtype='octet-stream', filename='big.bin')
+    return message.as_bytes()
+
+
+def test_parse_multipart_message():
+    parsed = parse_raw_message(multipart_message())
+
+    assert parsed['subject'] == 'Grüße'
+    assert parsed['from'] == 'Jörg <jorg@example.com>'
+    assert parsed['to'] == 'me@example.com'
+    assert parsed['date'] == 'Mon, 01 Jan 2024 00:00:00 +0000'
+    assert parsed['content'].startswith("Ünïcode reply. Thanks, see below.")
+    assert "> earlier" in parsed['content']
+
+
+def test_parse_strips_quoted_reply():
+    parsed = parse_raw_message(multipart_message(), strip_quotes=True)
+    assert parsed['content'].strip() == "Ünïcode reply. Thanks, see below."
+
+
+def test_parse_html_only_message():
+    message = EmailMessage()
+    message['Subject'] = 'html'
+    message.set_content("<p>Hello</p><p>World</p>", subtype='html')
+    content = parse_raw_message(message.as_bytes())['content']
+    assert "Hello" in content and "World" in content and "<p>" not in content
+
+
+def test_parse_truncates_encoded_bodies():
+    message = EmailMessage()
+    message.set_content("é" * 50_000, cte='base64')
+    content = parse_raw_message(message.as_bytes(), 100)['content']
+    assert content.startswith("é" * 100) and len(content) < 200
+
+    message = EmailMessage()
+    message.set_content("line " * 20_000, cte='quoted-printable')
+    content = parse_raw_message(message.as_bytes(), 50)['content']
+    assert content.startswith("line line") and len(content) < 100
+
+
+def test_parse_multipart_part_without_headers():
+    raw = (b'Subject: s\r\nContent-Type: multipart/mixed; boundary="B"\r\n\r\npreamble\r\n'
+           b'--B\r\n\r\nno header part\r\n--B\r\nContent-Type: text/plain\r\n\r\nsecond\r\n--B--\r\n')
+    assert parse_raw_message(raw)['content'].strip() == "no header part"
+
+
+def test_strip_quoted_reply():
+    assert strip_quoted_reply(REPLY).strip() == "Thanks, see below."
+    assert strip_quoted_reply("---------- Original Message ----------\nFrom: x\nhello").strip() == ""
+    assert strip_quoted_reply("no quote here") == "no quote here"
+
+
+def test_shrink_body():
+    assert shrink_body(None, 10) is None
+    assert shrink_body("short", 10) == "short"
+    shrunk = shrink_body("x" * 100, 10)
+    assert shrunk.startswith("x" * 10) and len(shrunk) < 100
+    assert shrink_body(REPLY, 0, True).strip() == "Thanks, see below."
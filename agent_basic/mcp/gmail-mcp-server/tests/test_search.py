@@ -0,0 +1,79 @@
+import sqlite3
+
+import pytest
+
+import cache
+from cache import MailCache
+
+
+@pytest.fixture
+def mail_cache(tmp_path):
+    mail_cache = MailCache(str(tmp_path / 'cache.sqlite3'))
+    if not mail_cache.searchable:
+        pytest.skip("SQLite build without FTS5")
+    yield mail_cache
+    mail_cache.close()
+
+
+def message(message_id, subject, sender="Bob <bob@example.com>", content="", internal_date=0):
+    return {"id": message_id, "threadId": "t", "internalDate": internal_date, "subject": subject,
+            "from": sender, "to": "me@example.com", "content": content, "labelIds": ["INBOX"]}
+
+
+def ids(results):
+    return [result["id"] for result in results]
+
+
+def test_match_expression_quotes_every_term():
+    assert MailCache._match_expression('quarterly report') == '"quarterly" AND "report"'
+    assert MailCache._match_expression('"quarterly report"') == '"quarterly report"'
+    assert MailCache._match_expression('from:alice quart*') == 'from_addr : "alice" AND "quart"*'
+    assert MailCache._match_expression('10:30') == '"10:30"'
+    assert MailCache._match_expression('AND OR NOT (') == '"AND" AND "OR" AND "NOT" AND "("'
+    assert MailCache._match_expression(' "" ') == ''
+
+
+def test_search_ranks_and_filters_by_field(mail_cache):
+    mail_cache.put_messages([
+        message("m1", "Lunch", content="the quarterly report numbers are attached"),
+        message("m2", "Quarterly report", sender="Alice Müller <alice@example.com>"),
+        message("m3", "Lunch", content="nothing to see"),
+    ])
+
+    assert ids(mail_cache.search("quarterly report")) == ["m2", "m1"]
+    assert ids(mail_cache.search("subject:quarterly")) == ["m2"]
+    assert ids(mail_cache.search("from:alice quart*")) == ["m2"]
+    assert ids(mail_cache.search("mueller")) == []
+    assert ids(mail_cache.search("müller")) == ["m2"]
+    assert "[quarterly]" in mail_cache.search("body:quarterly")[0]["snippet"]
+    assert mail_cache.search('AND OR NOT (') == []
+
+
+def test_index_follows_updates_and_deletes(mail_cache):
+    mail_cache.put_messages([message("m1", "Quarterly report"), message("m2", "Quarterly numbers")])
+
+    mail_cache.put_messages([message("m1", "Renamed")])
+    assert ids(mail_cache.search("subject:renamed")) == ["m1"]
+    assert ids(mail_cache.search("subject:quarterly")) == ["m2"]
+
+    mail_cache.delete_messages(["m2"])
+    assert mail_cache.search("quarterly") == []
+
+    mail_cache.clear()
+    assert mail_cache.search("renamed") == []
+
+
+def test_existing_cache_is_indexed_on_open(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    conn = sqlite3.connect(path)
+    conn.executescript(cache.SCHEMA)
+    conn.execute("INSERT INTO messages (id, subject, from_addr, to_addr, body, internal_date) "
+                 "VALUES ('old', 'Invoice March', 'bob@example.com', 'me', 'pay the invoice please', 1)")
+    conn.commit()
+    conn.close()
+
+    mail_cache = MailCache(path)
+    if not mail_cache.searchable:
+        pytest.skip("SQLite build without FTS5")
+    assert ids(mail_cache.search("invoice")) == ["old"]
+    mail_cache.close()
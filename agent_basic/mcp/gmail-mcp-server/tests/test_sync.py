@@ -0,0 +1,98 @@
+import asyncio
+import threading
+
+import server
+
+
+def unread_ids(service):
+    return {message["id"] for message in service.cache.list_by_labels(server.UNREAD_LABELS)}
+
+
+def test_full_sync_caches_unread_and_recent_messages(service, gmail, monkeypatch):
+    monkeypatch.setattr(server, "GMAIL_SYNC_MAX_MESSAGES", 3)
+    for i in range(10):
+        labels = ["INBOX", "CATEGORY_PERSONAL"] + (["UNREAD"] if i % 4 == 0 else [])
+        gmail.add_message(f"m{i}", labels, internal_date=i)
+
+    asyncio.run(service.sync())
+
+    assert service.cache.history_id == "100"
+    assert unread_ids(service) == {"m0", "m4", "m8"}
+    assert service.cache.cached_ids(gmail.messages) == {"m0", "m4", "m7", "m8", "m9"}
+
+
+def test_rate_limited_messages_are_retried(service, gmail):
+    gmail.add_message("m1", ["INBOX", "UNREAD", "CATEGORY_PERSONAL"])
+    gmail.add_message("m2", ["INBOX", "UNREAD", "CATEGORY_PERSONAL"])
+    gmail.failures = {"m1": [429, 503]}
+
+    asyncio.run(service.sync())
+
+    assert unread_ids(service) == {"m1", "m2"}
+    assert service.cache.pending_ids == set()
+
+
+def test_failing_messages_are_left_for_the_next_sync(service, gmail):
+    gmail.add_message("m1", ["INBOX", "UNREAD", "CATEGORY_PERSONAL"])
+    gmail.add_message("m2", ["INBOX", "UNREAD", "CATEGORY_PERSONAL"])
+    gmail.failures = {"m1": [503] * (server.GMAIL_SYNC_RETRIES + 1), "m2": [400]}
+
+    asyncio.run(service.sync())
+    assert unread_ids(service) == set()
+    assert service.cache.pending_ids == {"m1", "m2"}
+
+    # Nothing changed in the mailbox, the incremental sync fetches them again
+    gmail.history_id = 101
+    asyncio.run(service.sync())
+    assert unread_ids(service) == {"m1", "m2"}
+    assert service.cache.pending_ids == set()
+
+
+def test_incremental_sync_applies_history(service, gmail):
+    gmail.add_message("m1", ["INBOX", "UNREAD", "CATEGORY_PERSONAL"])
+    gmail.add_message("m2", ["INBOX", "UNREAD", "CATEGORY_PERSONAL"])
+    asyncio.run(service.sync())
+
+    gmail.add_message("m3", ["INBOX", "UNREAD", "CATEGORY_PERSONAL"])
+    gmail.messages["m1"]["labels"] = ["INBOX", "CATEGORY_PERSONAL"]
+    del gmail.messages["m2"]
+    gmail.history_id = 110
+    gmail.history = [
+        {"messagesAdded": [{"message": {"id": "m3"}}]},
+        {"labelsRemoved": [{"message": {"id": "m1", "labelIds": ["INBOX", "CATEGORY_PERSONAL"]},
+                            "labelIds": ["UNREAD"]}]},
+        {"messagesDeleted": [{"message": {"id": "m2"}}]},
+    ]
+    asyncio.run(service.sync())
+
+    assert service.cache.history_id == "110"
+    assert unread_ids(service) == {"m3"}
+
+
+def test_cache_writes_run_off_the_event_loop(service, gmail, monkeypatch):
+    gmail.add_message("m1", ["INBOX", "UNREAD", "CATEGORY_PERSONAL"])
+    threads = []
+    replace_all = service.cache.replace_all
+
+    def recording_replace_all(*args):
+        threads.append(threading.current_thread())
+        return replace_all(*args)
+
+    monkeypatch.setattr(service.cache, "replace_all", recording_replace_all)
+    asyncio.run(service.sync())
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_malformed_message_does_not_abort_the_sync(service, gmail):
+    gmail.add_message("m1", ["INBOX", "UNREAD", "CATEGORY_PERSONAL"], subject="=?x-unknown?Q?hi?=")
+    gmail.add_message("m2", ["INBOX", "UNREAD", "CATEGORY_PERSONAL"])
+    # Unpadded base64url body
+    gmail.messages["m2"]["payload"] = {"mimeType": "text/plain", "headers": [{"name": "Subject", "value": "ok"}],
+                                       "body": {"data": "aGVsbG8"}}
+
+    asyncio.run(service.sync())
+
+    assert service.cache.history_id == "100"
+    assert unread_ids(service) == {"m2"}
+    assert service.cache.get_email("m2")["content"] == "hello"
+    assert service.cache.pending_ids == {"m1"}
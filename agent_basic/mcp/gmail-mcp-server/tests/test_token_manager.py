@@ -0,0 +1,183 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import httplib2
+import pytest
+from google_auth_httplib2 import AuthorizedHttp
+
+import token_manager
+from token_manager import LockedCredentials, TokenManager
+
+TOKEN_URI = "https://oauth2.googleapis.com/token"
+
+
+def utcnow():
+    # google-auth keeps expiry as naive UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class FakeTokenEndpoint:
+    """google.auth.transport.Request stand-in answering refresh grants with new access tokens"""
+
+    def __init__(self, delay: float = 0.0, status: int = 200):
+        self.delay = delay
+        self.status = status
+        self.refreshes = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, url=None, method="GET", body=None, headers=None, **kwargs):
+        assert url == TOKEN_URI and method == "POST"
+        time.sleep(self.delay)
+        if self.status != 200:
+            data = {"error": "invalid_grant", "error_description": "Token has been revoked."}
+        else:
+            with self.lock:
+                self.refreshes += 1
+                data = {"access_token": f"token-{self.refreshes}", "expires_in": 3600}
+        return SimpleNamespace(status=self.status, headers={}, data=json.dumps(data).encode())
+
+
+def credentials(expiry: datetime) -> LockedCredentials:
+    return LockedCredentials(
+        token="token-0", refresh_token="refresh", token_uri=TOKEN_URI,
+        client_id="client", client_secret="secret", expiry=expiry)
+
+
+def test_expired_token_is_refreshed_once_under_contention():
+    creds = credentials(utcnow() - timedelta(minutes=1))
+    endpoint = FakeTokenEndpoint(delay=0.05)
+    persisted = []
+    creds.on_refresh = lambda token: persisted.append(token.token)
+    barrier = threading.Barrier(8)
+
+    def request():
+        barrier.wait()
+        headers = {}
+        creds.before_request(endpoint, "GET", "https://gmail.googleapis.com/", headers)
+        return headers["authorization"]
+
+    with ThreadPoolExecutor(8) as executor:
+        authorizations = list(executor.map(lambda _: request(), range(8)))
+
+    assert endpoint.refreshes == 1
+    assert persisted == ["token-1"]
+    assert set(authorizations) == {"Bearer token-1"}
+
+
+class RejectingHttp:
+    """Gmail API accepting only the given access token, and the token endpoint"""
+
+    def __init__(self, endpoint: FakeTokenEndpoint, accepted: str):
+        self.endpoint = endpoint
+        self.accepted = accepted
+        self.authorizations = []
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        if uri == TOKEN_URI:
+            response = self.endpoint(url=uri, method=method, body=body, headers=headers)
+            return httplib2.Response({"status": response.status}), response.data
+        self.authorizations.append(headers["authorization"])
+        status = 200 if headers["authorization"] == f"Bearer {self.accepted}" else 401
+        return httplib2.Response({"status": status}), b"{}"
+
+
+def test_token_rejected_before_expiry_is_refreshed():
+    creds = credentials(utcnow() + timedelta(hours=1))
+    http = RejectingHttp(FakeTokenEndpoint(), accepted="token-1")
+
+    response, _ = AuthorizedHttp(creds, http=http).request("https://gmail.googleapis.com/gmail/v1/users/me/profile")
+
+    assert response.status == 200
+    assert http.authorizations == ["Bearer token-0", "Bearer token-1"]
+
+
+def test_refresh_after_401_is_skipped_if_another_thread_refreshed():
+    creds = credentials(utcnow() + timedelta(hours=1))
+    endpoint = FakeTokenEndpoint(delay=0.05)
+    barrier = threading.Barrier(4)
+
+    def refresh():
+        barrier.wait()
+        creds.refresh(endpoint)
+
+    threads = [threading.Thread(target=refresh) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert endpoint.refreshes == 1 and creds.token == "token-1"
+
+
+def test_persist_replaces_the_token_file_atomically(tmp_path, monkeypatch):
+    token_path = tmp_path / "token.json"
+    token_path.write_text("previous")
+    manager = TokenManager("creds.json", str(token_path), ["scope"])
+    creds = credentials(utcnow() + timedelta(hours=1))
+
+    manager.persist(creds)
+    assert json.loads(token_path.read_text())["token"] == "token-0"
+    assert os.listdir(tmp_path) == ["token.json"]
+
+    # A failed write leaves the previous file and no temp file behind
+    monkeypatch.setattr(creds, "to_json", lambda: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        manager.persist(creds)
+    assert json.loads(token_path.read_text())["token"] == "token-0"
+    assert os.listdir(tmp_path) == ["token.json"]
+
+
+def manager_with(tmp_path, monkeypatch, endpoint: FakeTokenEndpoint, expiry: datetime) -> TokenManager:
+    monkeypatch.setattr(token_manager, "Request", lambda: endpoint)
+    manager = TokenManager("creds.json", str(tmp_path / "token.json"), ["scope"], refresh_margin=300.0)
+    manager.credentials = credentials(expiry)
+    manager.credentials.on_refresh = manager.persist
+    return manager
+
+
+def test_refresh_if_due(tmp_path, monkeypatch):
+    endpoint = FakeTokenEndpoint()
+    manager = manager_with(tmp_path, monkeypatch, endpoint, utcnow() + timedelta(hours=1))
+    assert manager.refresh_if_due() is False
+
+    manager.credentials.expiry = utcnow() + timedelta(minutes=2)
+    assert manager.refresh_if_due() is True
+    assert endpoint.refreshes == 1
+    assert json.loads((tmp_path / "token.json").read_text())["token"] == "token-1"
+    assert manager.seconds_until_refresh() > 3000
+
+
+def test_keep_fresh_refreshes_ahead_of_expiry(tmp_path, monkeypatch):
+    endpoint = FakeTokenEndpoint()
+    manager = manager_with(tmp_path, monkeypatch, endpoint, utcnow() + timedelta(minutes=2))
+
+    async def scenario():
+        with ThreadPoolExecutor(1) as executor:
+            task = asyncio.ensure_future(manager.keep_fresh(executor))
+            while endpoint.refreshes == 0:
+                await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+    asyncio.run(asyncio.wait_for(scenario(), 5))
+    assert manager.credentials.token == "token-1"
+    assert json.loads((tmp_path / "token.json").read_text())["token"] == "token-1"
+
+
+def test_keep_fresh_stops_on_revoked_refresh_token(tmp_path, monkeypatch):
+    manager = manager_with(tmp_path, monkeypatch, FakeTokenEndpoint(status=400), utcnow() + timedelta(minutes=2))
+
+    async def scenario():
+        with ThreadPoolExecutor(1) as executor:
+            await manager.keep_fresh(executor)
+
+    asyncio.run(asyncio.wait_for(scenario(), 5))
+    assert manager.credentials.token == "token-0"
+    assert not (tmp_path / "token.json").exists()
@@ -0,0 +1,86 @@
+import asyncio
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+import server
+
+
+@pytest.fixture
+def unread(service, gmail, monkeypatch):
+    # List from the API, no cache sync in the background
+    monkeypatch.setattr(service, "_schedule_sync", lambda: None)
+    monkeypatch.setattr(server, "GMAIL_LIST_PAGE_SIZE", 2)
+    for i in range(5):
+        gmail.add_message(f"m{i}", ["INBOX", "UNREAD", "CATEGORY_PERSONAL"], internal_date=10 - i)
+    gmail.add_message("read", ["INBOX", "CATEGORY_PERSONAL"], internal_date=20)
+    return service
+
+
+def queries(gmail, pattern):
+    return [{key: values[0] for key, values in parse_qs(urlparse(path).query).items()}
+            for method, path in gmail.requests if urlparse(path).path.endswith(pattern)]
+
+
+def test_default_listing_needs_no_metadata(unread, gmail):
+    messages = asyncio.run(unread.get_unread_emails())
+
+    assert messages == [{"id": f"m{i}", "threadId": f"tm{i}"} for i in range(5)]
+    assert queries(gmail, "/messages") and all(q["fields"] == "messages(id,threadId),nextPageToken"
+                                               for q in queries(gmail, "/messages"))
+    assert gmail.batch_sizes == []
+
+
+def test_fields_are_projected_from_metadata(unread, gmail):
+    messages = asyncio.run(unread.get_unread_emails(2, ["id", "subject", "from", "password"]))
+
+    assert messages == [
+        {"id": "m0", "subject": "Subject m0", "from": "alice@example.com"},
+        {"id": "m1", "subject": "Subject m1", "from": "alice@example.com"},
+    ]
+    metadata = queries(gmail, "/messages/m0")
+    assert metadata[0]["format"] == "metadata"
+    assert metadata[0]["fields"] == "id,threadId,snippet,labelIds,payload/headers"
+
+
+def test_max_results_stops_listing_across_pages(unread, gmail):
+    pages = []
+
+    async def on_page(page, listed):
+        pages.append(([message["id"] for message in page], listed))
+
+    messages = asyncio.run(unread.get_unread_emails(3, ["id", "subject"], on_page=on_page))
+
+    assert [message["id"] for message in messages] == ["m0", "m1", "m2"]
+    assert pages == [(["m0", "m1"], 2), (["m2"], 3)]
+    # The second page asks for what is left, no third page is listed
+    assert [q.get("maxResults") for q in queries(gmail, "/messages")] == ["2", "1"]
+
+
+def test_unlimited_listing_follows_every_page(unread, gmail):
+    listed = []
+
+    async def on_page(page, count):
+        listed.append(count)
+
+    messages = asyncio.run(unread.get_unread_emails(fields=["id"], on_page=on_page))
+
+    assert [message["id"] for message in messages] == [f"m{i}" for i in range(5)]
+    assert listed == [2, 4, 5]
+
+
+def test_cached_listing_is_projected(service, gmail):
+    for i in range(3):
+        gmail.add_message(f"m{i}", ["INBOX", "UNREAD", "CATEGORY_PERSONAL"], internal_date=10 - i)
+    asyncio.run(service.sync())
+    gmail.requests.clear()
+    pages = []
+
+    async def on_page(page, listed):
+        pages.append(listed)
+
+    messages = asyncio.run(service.get_unread_emails(2, ["id", "subject"], on_page=on_page))
+
+    assert messages == [{"id": "m0", "subject": "Subject m0"}, {"id": "m1", "subject": "Subject m1"}]
+    assert pages == [2]
+    assert not any(urlparse(path).path.endswith("/messages") for method, path in gmail.requests)
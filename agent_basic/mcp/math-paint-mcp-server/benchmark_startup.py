@@ -0,0 +1,68 @@
+"""
+Measure startup time of the math/paint MCP server per toolset selection.
+
+Each sample is a fresh interpreter importing mcp_server (which mounts the
+toolsets listed in MCP_TOOLSETS) and then listing its tools, i.e. everything
+the server does before it can answer its first request. Reports the median
+and best of several runs along with the heavy modules that got loaded.
+
+Usage:
+    python benchmark_startup.py --runs 7
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROBE = """
+import asyncio, json, os, sys, time
+# config lives in agent_basic/, appended so that its local mcp package does not
+# shadow the installed SDK, whatever PYTHONPATH the caller has
+agent_dir = sys.argv[1]
+sys.path[:] = [p for p in sys.path if os.path.abspath(p or os.curdir) != agent_dir] + [agent_dir]
+started = time.perf_counter()
+import mcp_server
+imported = time.perf_counter()
+tools = asyncio.run(mcp_server.mcp.list_tools())
+listed = time.perf_counter()
+heavy = [name for name in ("numpy", "PIL", "pywinauto", "win32api") if name in sys.modules]
+print(json.dumps({"import": imported - started, "ready": listed - started, "tools": len(tools), "heavy": heavy}))
+"""
+
+CONFIGURATIONS = ["math", "paint", "math,paint"]
+
+
+def sample(toolsets: str) -> dict:
+    server_dir = os.path.dirname(os.path.abspath(__file__))
+    agent_dir = os.path.dirname(os.path.dirname(server_dir))
+    env = dict(os.environ, MCP_TOOLSETS=toolsets)
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE, agent_dir],
+        cwd=server_dir, env=env, capture_output=True, text=True, check=True
+    )
+    # The server logs to stdout, the probe result is the last line
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark math/paint MCP server startup per toolset")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreter runs per configuration")
+    parser.add_argument("--toolsets", action="append",
+                        help="Comma separated toolsets to measure, repeatable (default: math, paint, math,paint)")
+    args = parser.parse_args()
+
+    print(f"{'toolsets':<12}{'tools':>6}{'import median':>15}{'ready median':>14}{'ready best':>12}  heavy modules")
+    for toolsets in args.toolsets or CONFIGURATIONS:
+        samples = [sample(toolsets) for _ in range(args.runs)]
+        ready = [s["ready"] for s in samples]
+        print(f"{toolsets:<12}{samples[0]['tools']:>6}"
+              f"{statistics.median(s['import'] for s in samples) * 1000:>13.0f}ms"
+              f"{statistics.median(ready) * 1000:>12.0f}ms"
+              f"{min(ready) * 1000:>10.0f}ms"
+              f"  {', '.join(samples[0]['heavy']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
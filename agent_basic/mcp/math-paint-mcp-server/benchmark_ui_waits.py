@@ -0,0 +1,75 @@
+"""
+Benchmark wait strategies of the Paint UI layer against the simulated driver.
+
+Runs open_paint + a boundary/text drawing sequence through PaintSession on a
+FakeDriver for several simulated application speeds, and reports wall-clock
+time per strategy. Runs on any platform, no Paint required.
+
+Usage:
+    python benchmark_ui_waits.py --runs 5 --jitter 0.3
+"""
+import argparse
+import statistics
+import time
+
+from ui_driver import FakeDriver, PaintSession
+
+# name -> PaintSession options
+STRATEGIES = {
+    # The original tools: poll every 0.5s and pause 0.5s after each input step
+    "fixed-0.5s": {"settle": 0.5, "wait_options": {"initial_interval": 0.5, "max_interval": 0.5, "backoff": 1.0}},
+    "backoff": {"settle": 0.1, "wait_options": {}},
+    "backoff-fine": {"settle": 0.05, "wait_options": {"initial_interval": 0.01, "max_interval": 0.1}},
+}
+
+# name -> FakeDriver delays in seconds
+PROFILES = {
+    "fast-machine": {"window_delay": 0.4, "canvas_delay": 0.1, "focus_delay": 0.05, "maximize_delay": 0.05},
+    "typical": {"window_delay": 1.0, "canvas_delay": 0.3, "focus_delay": 0.1, "maximize_delay": 0.2},
+    "slow-vm": {"window_delay": 3.0, "canvas_delay": 0.8, "focus_delay": 0.4, "maximize_delay": 0.6},
+}
+
+
+def run_once(strategy: dict, profile: dict, jitter: float, seed: int) -> dict:
+    driver = FakeDriver(jitter=jitter, seed=seed, **profile)
+    session = PaintSession(driver, timeout=30.0, **strategy)
+
+    started = time.perf_counter()
+    session.open()
+    opened = time.perf_counter()
+
+    session.ensure_focus()
+    session.select_rectangle_tool(805, 130)
+    session.drag_rectangle(40, 40, 990, 592)
+    session.select_text_tool()
+    session.type_text_box("Result: 42", 400, 280, 200, 100)
+    session.select_selection_tool()
+    drawn = time.perf_counter()
+    return {"open": opened - started, "draw": drawn - opened, "total": drawn - started}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Paint UI wait strategies on a simulated driver")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per strategy and profile")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Relative random jitter of simulated delays")
+    parser.add_argument("--profile", choices=sorted(PROFILES), action="append",
+                        help="Simulated machine profile, repeatable (default: all)")
+    args = parser.parse_args()
+
+    print(f"{'profile':<14}{'strategy':<14}{'open mean':>11}{'draw mean':>11}{'total mean':>12}{'total max':>11}")
+    for profile_name in args.profile or PROFILES:
+        for strategy_name, strategy in STRATEGIES.items():
+            results = [
+                run_once(strategy, PROFILES[profile_name], args.jitter, seed)
+                for seed in range(args.runs)
+            ]
+            totals = [r["total"] for r in results]
+            print(f"{profile_name:<14}{strategy_name:<14}"
+                  f"{statistics.mean(r['open'] for r in results):>10.3f}s"
+                  f"{statistics.mean(r['draw'] for r in results):>10.3f}s"
+                  f"{statistics.mean(totals):>11.3f}s"
+                  f"{max(totals):>10.3f}s")
+
+
+if __name__ == "__main__":
+    main()
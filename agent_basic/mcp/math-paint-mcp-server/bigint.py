@@ -0,0 +1,172 @@
+"""
+Big integer kernels for the math tools.
+
+Results whose estimated decimal size exceeds Config.MAX_RESULT_DIGITS are
+summarized (digit count, leading and trailing digits) instead of computed and
+serialized as megabyte-long JSON numbers.
+
+Kept free of MCP/UI imports so worker processes of worker_pool can import it
+cheaply; every function here must stay picklable (module level).
+"""
+import math
+from typing import Union
+
+from config import Config
+
+LOG10_PHI = math.log10((1 + math.sqrt(5)) / 2)
+LOG10_SQRT5 = math.log10(math.sqrt(5))
+SUMMARY_TRAILING_DIGITS = 20
+
+def digits_from_log10(log10_value: float) -> int:
+    """Number of decimal digits of an integer given its log10"""
+    return int(math.floor(log10_value)) + 1
+
+def summarize_big_int(log10_value: float, trailing_digits: str = None, negative: bool = False, **extra) -> dict:
+    """Describe a huge integer from its log10 without materializing it"""
+    exponent = int(math.floor(log10_value))
+    # A float log10 of size 10^k only carries about 15-k significant mantissa digits
+    precision = max(1, 15 - len(str(exponent)))
+    mantissa = 10 ** (log10_value - exponent)
+    leading = f"{mantissa:.{precision}f}".replace('.', '')[:precision + 1]
+    summary = {
+        "summarized": True,
+        "digits": exponent + 1,
+        "sign": "-" if negative else "+",
+        "leading_digits": leading,
+        "scientific": f"{'-' if negative else ''}{mantissa:.{precision}f}e+{exponent}",
+    }
+    if trailing_digits is not None:
+        summary["trailing_digits"] = trailing_digits
+    summary.update(extra)
+    return summary
+
+def fib_pair(n: int, modulus: int = None) -> tuple[int, int]:
+    """Return (F(n), F(n+1)) with fast doubling in O(log n) big-int multiplications"""
+    a, b = 0, 1
+    for bit in bin(n)[2:]:
+        # F(2k) = F(k) * (2F(k+1) - F(k)),  F(2k+1) = F(k)^2 + F(k+1)^2
+        c = a * (2 * b - a)
+        d = a * a + b * b
+        if modulus:
+            c, d = c % modulus, d % modulus
+        if bit == '1':
+            a, b = d, c + d
+            if modulus:
+                b %= modulus
+        else:
+            a, b = c, d
+    return a, b
+
+def fib_log10(n: int) -> float:
+    """log10 of F(n) from Binet's formula, accurate for n >= 2"""
+    return n * LOG10_PHI - LOG10_SQRT5
+
+def fibonacci_value(n: int) -> Union[int, dict]:
+    """F(n), summarized when it would exceed the digit limit"""
+    if n < 0:
+        raise ValueError("n must be non-negative")
+    if n >= 2 and digits_from_log10(fib_log10(n)) > Config.MAX_RESULT_DIGITS:
+        trailing = fib_pair(n, 10 ** SUMMARY_TRAILING_DIGITS)[0]
+        return summarize_big_int(fib_log10(n), str(trailing).zfill(SUMMARY_TRAILING_DIGITS), n=n)
+    return fib_pair(n)[0]
+
+def factorial_value(a: int) -> Union[int, dict]:
+    """a!, summarized when it would exceed the digit limit"""
+    if a < 0:
+        raise ValueError("factorial() not defined for negative values")
+    log10_value = math.lgamma(a + 1) / math.log(10)
+    if a > 1 and digits_from_log10(log10_value) > Config.MAX_RESULT_DIGITS:
+        # Legendre's formula gives the trailing zero count without computing a!
+        trailing_zeros, divisor = 0, 5
+        while divisor <= a:
+            trailing_zeros += a // divisor
+            divisor *= 5
+        return summarize_big_int(log10_value, trailing_zeros=trailing_zeros)
+    # CPython's math.factorial uses a binary-splitting product internally
+    return math.factorial(a)
+
+def power_value(a: int, b: int) -> Union[int, float, dict]:
+    """a ** b, summarized when an integer result would exceed the digit limit"""
+    if b < 0 or abs(a) < 2:
+        return a ** b if b < 0 else int(a ** b)
+    log10_value = b * math.log10(abs(a))
+    if digits_from_log10(log10_value) > Config.MAX_RESULT_DIGITS:
+        trailing = pow(abs(a), b, 10 ** SUMMARY_TRAILING_DIGITS)
+        return summarize_big_int(log10_value, str(trailing).zfill(SUMMARY_TRAILING_DIGITS), negative=a < 0 and b % 2 == 1)
+    return a ** b
+
+def factorial_digits(a: int) -> int:
+    """Estimated decimal digits of a!"""
+    return digits_from_log10(math.lgamma(a + 1) / math.log(10)) if a > 1 else 1
+
+def power_digits(a: int, b: int) -> int:
+    """Estimated decimal digits of a ** b"""
+    return digits_from_log10(b * math.log10(abs(a))) if b > 0 and abs(a) > 1 else 1
+
+def fibonacci_digits(n: int) -> int:
+    """Estimated decimal digits of F(n)"""
+    return digits_from_log10(fib_log10(n)) if n >= 2 else 1
+
+# COST ESTIMATES
+# Rough CPU cost of the kernels above in digit operations, used to decide
+# whether a call is worth a round trip to the worker pool. Multiplying two
+# d-digit integers costs about d**1.585 (Karatsuba); summarized results only
+# do modular arithmetic on SUMMARY_TRAILING_DIGITS digits.
+
+def multiply_cost(digits: int) -> float:
+    """Cost of multiplying two integers of this many digits"""
+    return float(digits) ** 1.585
+
+def power_cost(a: int, b: int) -> float:
+    if b < 0 or abs(a) < 2:
+        return 1.0
+    digits = power_digits(a, b)
+    if digits > Config.MAX_RESULT_DIGITS:
+        return b.bit_length() * multiply_cost(SUMMARY_TRAILING_DIGITS)
+    # Repeated squaring, dominated by the last multiplications
+    return 2 * multiply_cost(digits)
+
+def factorial_cost(a: int) -> float:
+    digits = factorial_digits(max(a, 0))
+    if digits > Config.MAX_RESULT_DIGITS:
+        return math.log(max(a, 2), 5)
+    # Binary splitting, dominated by the final products
+    return 2 * multiply_cost(digits)
+
+def fibonacci_cost(n: int) -> float:
+    digits = fibonacci_digits(max(n, 0))
+    if digits > Config.MAX_RESULT_DIGITS:
+        return 3 * max(n, 1).bit_length() * multiply_cost(SUMMARY_TRAILING_DIGITS)
+    # Fast doubling, three multiplications per step, dominated by the last
+    return 3 * multiply_cost(digits)
+
+def fibonacci_chunk_cost(start: int, count: int, max_digits: int = None) -> float:
+    """Seeding F(start) plus about 12 digit operations per digit of the chunk"""
+    total_digits = min(count * fibonacci_digits(max(start + count, 0)), max_digits or Config.MAX_RESULT_DIGITS)
+    return fibonacci_cost(start) + 12 * total_digits
+
+def fibonacci_chunk(start: int, count: int, max_digits: int = None) -> dict:
+    """F(start) .. F(start+count-1), cut off once the chunk exceeds max_digits (default MAX_RESULT_DIGITS) in total"""
+    if start < 0 or count < 0:
+        raise ValueError("start and count must be non-negative")
+    if fibonacci_digits(start) > Config.MAX_RESULT_DIGITS:
+        raise ValueError(f"F({start}) alone exceeds {Config.MAX_RESULT_DIGITS} digits, use fibonacci_number for a summary")
+
+    # Seed the chunk with fast doubling instead of iterating from F(0)
+    a, b = fib_pair(start)
+    values = []
+    digits_budget = max_digits or Config.MAX_RESULT_DIGITS
+    while len(values) < count:
+        digits = fibonacci_digits(start + len(values))
+        if digits > digits_budget:
+            break
+        digits_budget -= digits
+        values.append(a)
+        a, b = b, a + b
+    next_start = start + len(values)
+    return {
+        "start": start,
+        "count": len(values),
+        "values": values,
+        "next_start": next_start if len(values) < count else None,
+    }
@@ -0,0 +1,192 @@
+"""
+Headless canvas backend for the paint tools.
+
+Draws onto an in-memory Pillow image instead of driving mspaint.exe, so the
+open_paint / draw_rectangle / add_text_in_paint tools work on any platform at
+millisecond latency. Coordinates are canvas-relative, like the Paint backend.
+"""
+import functools
+import io
+import textwrap
+from typing import List, NamedTuple, Tuple, Union
+
+from PIL import Image as PILImage, ImageDraw, ImageFont
+
+# Tried in order, Pillow's bundled font is the last resort
+FONT_CANDIDATES = ("arial.ttf", "DejaVuSans.ttf", "LiberationSans-Regular.ttf")
+
+
+@functools.lru_cache(maxsize=32)
+def load_font(size: int) -> ImageFont.ImageFont:
+    for name in FONT_CANDIDATES:
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size)
+
+
+# Scratch surface for text metrics, independent of any open canvas
+_MEASURE = ImageDraw.Draw(PILImage.new("RGB", (1, 1)))
+
+
+def text_bbox(text: str, font_size: int) -> Tuple[int, int, int, int]:
+    return _MEASURE.multiline_textbbox((0, 0), text, font=load_font(font_size), align="center")
+
+
+class PillowCanvas:
+    def __init__(self, width: int, height: int, background: str = "white"):
+        self.width = width
+        self.height = height
+        self.background = background
+        self.image = PILImage.new("RGB", (width, height), background)
+        self.draw = ImageDraw.Draw(self.image)
+
+    def draw_rectangle(self, x1: int, y1: int, x2: int, y2: int, outline: str = "black", line_width: int = 2):
+        # Paint accepts a drag in any direction, Pillow wants top-left first
+        box = (min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
+        self.draw.rectangle(box, outline=outline, width=line_width)
+
+    def add_text(self, text: str, x: int, y: int, font_size: int, fill: str = "black", align: str = "left"):
+        self.draw.multiline_text((x, y), text, font=load_font(font_size), fill=fill, align=align)
+
+    def text_size(self, text: str, font_size: int) -> Tuple[int, int]:
+        left, top, right, bottom = text_bbox(text, font_size)
+        return right - left, bottom - top
+
+    def to_png(self) -> bytes:
+        buffer = io.BytesIO()
+        # Canvases are mostly flat colour, fast compression is plenty
+        self.image.save(buffer, format="PNG", compress_level=1)
+        return buffer.getvalue()
+
+
+class RectangleOp(NamedTuple):
+    x1: int
+    y1: int
+    x2: int
+    y2: int
+
+
+class TextOp(NamedTuple):
+    text: str
+    x: int
+    y: int
+    width: int
+    height: int
+    # 0 renders with the canvas default font size
+    font_size: int = 0
+    align: str = "left"
+
+
+class Scene:
+    """
+    Display list of drawing operations rendered in one pass by commit_scene.
+
+    plan() drops duplicate and degenerate shapes and groups operations by
+    tool, rectangles first so text is never painted over, keeping the
+    insertion order inside each group. The mspaint backend then selects each
+    toolbar tool once per scene instead of once per shape.
+    """
+
+    def __init__(self, max_operations: int):
+        self.max_operations = max_operations
+        self.operations: List[Union[RectangleOp, TextOp]] = []
+
+    def _append(self, op: Union[RectangleOp, TextOp]) -> int:
+        if len(self.operations) >= self.max_operations:
+            raise ValueError(f"Scene is limited to {self.max_operations} operations")
+        self.operations.append(op)
+        return len(self.operations)
+
+    def add_rectangle(self, x1: int, y1: int, x2: int, y2: int) -> int:
+        # Normalized so the same box dragged in another direction is deduplicated
+        return self._append(RectangleOp(min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)))
+
+    def add_text(self, text: str, x: int, y: int, width: int, height: int,
+                 font_size: int = 0, align: str = "left") -> int:
+        return self._append(TextOp(text, x, y, width, height, font_size, align))
+
+    def plan(self) -> Tuple[List[RectangleOp], List[TextOp]]:
+        rectangles = [
+            op for op in dict.fromkeys(self.operations)
+            if isinstance(op, RectangleOp) and op.x1 != op.x2 and op.y1 != op.y2
+        ]
+        texts = [
+            op for op in dict.fromkeys(self.operations)
+            if isinstance(op, TextOp) and op.text
+        ]
+        return rectangles, texts
+
+    def render(self, canvas: PillowCanvas, font_size: int):
+        rectangles, texts = self.plan()
+        for op in rectangles:
+            canvas.draw_rectangle(op.x1, op.y1, op.x2, op.y2)
+        for op in texts:
+            canvas.add_text(op.text, op.x, op.y, op.font_size or font_size, align=op.align)
+
+
+class Layout(NamedTuple):
+    boundary: RectangleOp
+    text: TextOp
+
+
+def _wrap_to_width(text: str, font_size: int, max_width: int) -> str:
+    """Wrap text so that its widest line fits max_width at font_size"""
+    lines = text.splitlines() or [""]
+    width = max(text_bbox(line, font_size)[2] for line in lines)
+    if width <= max_width:
+        return text
+    # Start from the average glyph width and tighten until the measurement fits
+    chars = max(1, int(max(len(line) for line in lines) * max_width / width))
+    while True:
+        wrapped = "\n".join(
+            textwrap.fill(line, chars, break_long_words=True) if line else line
+            for line in lines
+        )
+        left, _, right, _ = text_bbox(wrapped, font_size)
+        if right - left <= max_width or chars == 1:
+            return wrapped
+        chars = max(1, int(chars * 0.9))
+
+
+def layout_centered_text(text: str, width: int, height: int, inset: int, padding: int,
+                         min_font_size: int, max_font_size: int) -> Layout:
+    """
+    Place text centered on a width x height canvas inside a boundary inset from
+    its edges. The font size is the largest in [min_font_size, max_font_size]
+    whose measured text fits inside the boundary minus padding, wrapping lines
+    that are too wide.
+    """
+    box_width = width - 2 * (inset + padding)
+    box_height = height - 2 * (inset + padding)
+    if box_width <= 0 or box_height <= 0:
+        raise ValueError(f"Inset {inset} and padding {padding} leave no room on a {width}x{height} canvas")
+
+    def fit(font_size: int):
+        wrapped = _wrap_to_width(text, font_size, box_width)
+        left, top, right, bottom = text_bbox(wrapped, font_size)
+        return wrapped, (left, top, right, bottom), right - left <= box_width and bottom - top <= box_height
+
+    # Binary search on font size, the fit shrinks monotonically as the font grows
+    low, high = min_font_size, max_font_size
+    best = fit(min_font_size) + (min_font_size,)
+    while low <= high:
+        size = (low + high) // 2
+        wrapped, bbox, fits = fit(size)
+        if fits:
+            best = (wrapped, bbox, fits, size)
+            low = size + 1
+        else:
+            high = size - 1
+    wrapped, bbox, _, font_size = best
+    left, top, right, bottom = (int(round(value)) for value in bbox)
+
+    text_width, text_height = right - left, bottom - top
+    # Offset by the bbox origin so the glyphs, not the pen position, are centered
+    x = (width - text_width) // 2 - left
+    y = (height - text_height) // 2 - top
+    return Layout(
+        boundary=RectangleOp(inset, inset, width - inset, height - inset),
+        text=TextOp(wrapped, x, y, text_width, text_height, font_size, "center"),
+    )
@@ -0,0 +1,630 @@
+"""
+Math tools of the Calculator server: arithmetic, big integers, arrays,
+expressions, datatype detection and the result:// store for large results.
+
+Free of UI and imaging imports, numpy is only loaded by the first array tool
+call, so a math-only server starts without the paint stack.
+"""
+import ast
+import copy
+import functools
+import itertools
+import json
+import math
+import re
+from collections import Counter
+from typing import TYPE_CHECKING, List, Dict, Union, Optional
+from config import Config
+import bigint
+from worker_pool import WorkerPool
+from result_store import ResultStore
+from toolset import Toolset
+
+if TYPE_CHECKING:
+    import numpy
+
+toolset = Toolset("math")
+register = toolset.register
+
+# CPU-heavy tools run here instead of on the event loop
+WORKERS = WorkerPool(max_workers=Config.WORKER_POOL_SIZE, cpu_seconds=Config.WORKER_CPU_SECONDS)
+
+async def run_cpu_bound(tool: str, fn, *args, cost: float = 0.0):
+    """
+    Run a bigint kernel inline when its estimated cost (see bigint.py) is below
+    WORKER_INLINE_COST, otherwise in the worker pool. Tools named in
+    WORKER_TOOLS always use the pool."""
+    if tool not in Config.WORKER_TOOLS and cost < Config.WORKER_INLINE_COST:
+        return fn(*args)
+    return await WORKERS.run(fn, *args)
+
+# Large results are kept server-side and returned as result://{id} handles
+RESULTS = ResultStore(max_bytes=Config.RESULT_STORE_MAX_BYTES,
+                      inline_bytes=Config.RESULT_INLINE_BYTES,
+                      page_bytes=Config.RESULT_PAGE_BYTES)
+
+# DATATYPE CLASSIFICATION
+# One regex pass classifies scalars (instead of trying int(), then float()),
+# containers go through json.loads first and only fall back to ast.literal_eval
+# for Python-only syntax. Containers are summarized with type histograms over a
+# bounded number of elements rather than per-element type lists.
+
+NUMBER_TOKEN = re.compile(r"""
+    \s*[+-]?(?:
+        (?P<int>\d+(?:_\d+)*)
+        |(?P<float>(?:\d+(?:_\d+)*)?\.\d+(?:_\d+)*(?:[eE][+-]?\d+)?
+            |\d+(?:_\d+)*\.?(?:[eE][+-]?\d+)?
+            |inf(?:inity)?|nan)
+    )\s*
+""", re.VERBOSE | re.IGNORECASE)
+
+def _type_histogram(values, limit: int) -> dict:
+    """Count type names of the first `limit` values"""
+    return dict(Counter(type(value).__name__ for value in itertools.islice(values, limit)))
+
+def _nesting_depth(value, max_depth: int) -> int:
+    """Depth of nested containers, inspecting at most Config.DATATYPE_MAX_ELEMENTS nodes"""
+    depth, budget = 0, Config.DATATYPE_MAX_ELEMENTS
+    level = [value]
+    while depth < max_depth and budget > 0:
+        containers = [item for item in level if isinstance(item, (dict, list, tuple, set))]
+        if not containers:
+            break
+        depth += 1
+        level = []
+        for item in containers:
+            children = item.values() if isinstance(item, dict) else item
+            level.extend(itertools.islice(children, budget - len(level)))
+            if len(level) >= budget:
+                break
+        budget -= len(level)
+    return depth
+
+def _parse_container(text: str):
+    """Parse a list/dict literal, JSON first then Python literal syntax"""
+    try:
+        return json.loads(text)
+    except (ValueError, RecursionError):
+        pass
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+        return None
+
+def _container_details(container) -> dict:
+    limit = Config.DATATYPE_MAX_ELEMENTS
+    details = {
+        "length": len(container),
+        "inspected": min(len(container), limit),
+        "depth": _nesting_depth(container, Config.DATATYPE_MAX_DEPTH),
+    }
+    if isinstance(container, dict):
+        details["key_type_counts"] = _type_histogram(container.keys(), limit)
+        details["value_type_counts"] = _type_histogram(container.values(), limit)
+    else:
+        details["element_type_counts"] = _type_histogram(container, limit)
+    return details
+
+def _classify_value(value: str) -> dict:
+    """Classify value, short inputs through the cache so large strings are not kept alive by it"""
+    if len(value) <= Config.DATATYPE_CACHE_MAX_LENGTH:
+        return _classify_cached(value)
+    return _classify_uncached(value)
+
+@functools.lru_cache(maxsize=64)
+def _classify_cached(value: str) -> dict:
+    return _classify_uncached(value)
+
+def _classify_uncached(value: str) -> dict:
+    type_info = {
+        "possible_types": [],
+        "details": {},
+        "primary_type": None
+    }
+
+    lowered = value.strip().lower()
+    if lowered in ('none', 'null'):
+        type_info["possible_types"].append("NoneType")
+        type_info["primary_type"] = "NoneType"
+        return type_info
+
+    if lowered in ('true', 'false'):
+        type_info["possible_types"].append("bool")
+        type_info["details"]["bool"] = lowered == 'true'
+        type_info["primary_type"] = "bool"
+        return type_info
+
+    number = NUMBER_TOKEN.fullmatch(value)
+    if number:
+        try:
+            int_val = int(value) if number.group("int") is not None else None
+        except ValueError:
+            # Past Python's int/str conversion digit limit, classified as float/str only
+            int_val = None
+        if int_val is not None:
+            type_info["possible_types"].append("int")
+            type_info["details"]["int"] = int_val
+        type_info["possible_types"].append("float")
+        type_info["details"]["float"] = float(value)
+
+    stripped = value.strip()
+    if stripped[:1] in ('[', '{') and stripped[-1:] == {'[': ']', '{': '}'}[stripped[:1]]:
+        if len(stripped) > Config.DATATYPE_MAX_PARSE_LENGTH:
+            type_info["details"]["container"] = f"not parsed, input longer than {Config.DATATYPE_MAX_PARSE_LENGTH} characters"
+        else:
+            container = _parse_container(stripped)
+            if isinstance(container, list):
+                type_info["possible_types"].append("list")
+                type_info["details"]["list"] = _container_details(container)
+            elif isinstance(container, dict):
+                type_info["possible_types"].append("dict")
+                type_info["details"]["dict"] = _container_details(container)
+
+    # Check for string (always possible since input is string)
+    type_info["possible_types"].append("str")
+    type_info["details"]["str"] = {
+        "length": len(value),
+        "is_numeric": value.isnumeric(),
+        "is_alpha": value.isalpha(),
+        "is_alphanumeric": value.isalnum()
+    }
+
+    for t in ["int", "float", "list", "dict", "str"]:
+        if t in type_info["possible_types"]:
+            type_info["primary_type"] = t
+            break
+
+    return type_info
+
+@toolset.tool()
+def determine_datatype(value: str) -> dict:
+    """
+    Determines the possible data type(s) of a given input string value.
+    Returns a dictionary with type information and validation results.
+    Lists and dicts are summarized with element type counts.
+    """
+    print("CALLED: determine_datatype(value: str) -> dict:")
+    # Results are cached, hand out a copy so callers cannot mutate the cache
+    return RESULTS.maybe_store(copy.deepcopy(_classify_value(value)))
+
+#addition tool
+@toolset.tool()
+def add(a: int, b: int) -> int:
+    """Add two numbers"""
+    print("CALLED: add(a: int, b: int) -> int:")
+    return int(a + b)
+
+@toolset.tool()
+def add_list(l: list) -> int:
+    """Add all numbers in a list"""
+    print("CALLED: add(l: list) -> int:")
+    return sum(l)
+
+# subtraction tool
+@toolset.tool()
+def subtract(a: int, b: int) -> int:
+    """Subtract two numbers"""
+    print("CALLED: subtract(a: int, b: int) -> int:")
+    return int(a - b)
+
+# multiplication tool
+@toolset.tool()
+def multiply(a: int, b: int) -> int:
+    """Multiply two numbers"""
+    print("CALLED: multiply(a: int, b: int) -> int:")
+    return int(a * b)
+
+#  division tool
+@toolset.tool() 
+def divide(a: int, b: int) -> float:
+    """Divide two numbers"""
+    print("CALLED: divide(a: int, b: int) -> float:")
+    return float(a / b)
+
+# power tool
+@toolset.tool()
+async def power(a: int, b: int) -> Union[int, float, dict]:
+    """Power of two numbers. Results with more than MAX_RESULT_DIGITS digits are returned as a summary (digit count, leading and trailing digits)"""
+    print("CALLED: power(a: int, b: int) -> int:")
+    return await run_cpu_bound("power", bigint.power_value, a, b, cost=bigint.power_cost(a, b))
+
+# square root tool
+@toolset.tool()
+def sqrt(a: int) -> float:
+    """Square root of a number"""
+    print("CALLED: sqrt(a: int) -> float:")
+    return float(a ** 0.5)
+
+# cube root tool
+@toolset.tool()
+def cbrt(a: int) -> float:
+    """Cube root of a number"""
+    print("CALLED: cbrt(a: int) -> float:")
+    return float(a ** (1/3))
+
+# factorial tool
+@toolset.tool()
+async def factorial(a: int) -> Union[int, dict]:
+    """factorial of a number. Results with more than MAX_RESULT_DIGITS digits are returned as a summary (digit count, leading digits, trailing zeros)"""
+    print("CALLED: factorial(a: int) -> int:")
+    return await run_cpu_bound("factorial", bigint.factorial_value, a, cost=bigint.factorial_cost(a))
+
+# log tool
+@toolset.tool()
+def log(a: int) -> float:
+    """log of a number"""
+    print("CALLED: log(a: int) -> float:")
+    return float(math.log(a))
+
+# remainder tool
+@toolset.tool()
+def remainder(a: int, b: int) -> int:
+    """remainder of two numbers divison"""
+    print("CALLED: remainder(a: int, b: int) -> int:")
+    return int(a % b)
+
+# sin tool
+@toolset.tool()
+def sin(a: int) -> float:
+    """sin of a number"""
+    print("CALLED: sin(a: int) -> float:")
+    return float(math.sin(a))
+
+# cos tool
+@toolset.tool()
+def cos(a: int) -> float:
+    """cos of a number"""
+    print("CALLED: cos(a: int) -> float:")
+    return float(math.cos(a))
+
+# tan tool
+@toolset.tool()
+def tan(a: int) -> float:
+    """tan of a number"""
+    print("CALLED: tan(a: int) -> float:")
+    return float(math.tan(a))
+
+# mine tool
+@toolset.tool()
+def mine(a: int, b: int) -> int:
+    """special mining tool"""
+    print("CALLED: mine(a: int, b: int) -> int:")
+    return int(a - b - b)
+
+@toolset.tool()
+def strings_to_chars_to_int(string: str) -> Union[list[int], dict]:
+    """Return the ASCII values of the characters in a word (a result:// handle with a summary for very long strings)"""
+    print("CALLED: strings_to_chars_to_int(string: str) -> list[int]:")
+    return RESULTS.maybe_store([int(ord(char)) for char in string])
+
+def _logsumexp(values) -> float:
+    """Numerically stable log(sum(exp(values)))"""
+    import numpy as np
+    arr = np.asarray(values, dtype=np.float64)
+    if arr.size == 0:
+        return float("-inf")
+    peak = np.max(arr)
+    if not np.isfinite(peak):
+        return float(peak)
+    return float(peak + np.log(np.sum(np.exp(arr - peak))))
+
+@toolset.tool()
+def int_list_to_exponential_sum(int_list: list, log_space: bool = False) -> float:
+    """Return sum of exponentials of numbers in a list. With log_space=True returns log of that sum (logsumexp), which does not overflow for values above ~709"""
+    print("CALLED: int_list_to_exponential_sum(int_list: list, log_space: bool) -> float:")
+    if log_space:
+        return _logsumexp(int_list)
+    return sum(math.exp(i) for i in int_list)
+
+# VECTORIZED ARRAY TOOLS
+# These evaluate a whole list in one call instead of one MCP round trip per value.
+
+@functools.lru_cache(maxsize=None)
+def _array_ops() -> dict:
+    """numpy-backed op tables, built on the first array call so numpy stays out of startup"""
+    import numpy as np
+    return {
+        "binary": {
+            "add": np.add,
+            "subtract": np.subtract,
+            "multiply": np.multiply,
+            "divide": np.true_divide,
+            "power": np.power,
+            "remainder": np.remainder,
+            "mine": lambda a, b: a - b - b,
+        },
+        "unary": {
+            "sin": np.sin,
+            "cos": np.cos,
+            "tan": np.tan,
+            "sqrt": np.sqrt,
+            "cbrt": np.cbrt,
+            "log": np.log,
+            "exp": np.exp,
+            "abs": np.abs,
+        },
+        "reduce": {
+            "sum": np.sum,
+            "prod": np.prod,
+            "min": np.min,
+            "max": np.max,
+            "mean": np.mean,
+            "std": np.std,
+            "exponential_sum": lambda arr: np.sum(np.exp(arr)),
+            "logsumexp": _logsumexp,
+        },
+    }
+
+def _to_float_array(values: Union[List[float], str, float]) -> "numpy.ndarray":
+    """Convert a list of numbers, a scalar or a range spec 'start:stop[:step]' to a float array"""
+    import numpy as np
+    if isinstance(values, str):
+        bounds = [float(part) for part in values.split(':')]
+        if len(bounds) not in (2, 3):
+            raise ValueError(f"Invalid range '{values}', expected 'start:stop' or 'start:stop:step'")
+        if len(bounds) == 3 and bounds[2] == 0:
+            raise ValueError(f"Invalid range '{values}', step must not be 0")
+        length = math.ceil((bounds[1] - bounds[0]) / (bounds[2] if len(bounds) == 3 else 1.0))
+        if length > Config.MAX_ARRAY_LENGTH:
+            raise ValueError(f"Range has {length} values, limit is {Config.MAX_ARRAY_LENGTH}")
+        return np.arange(*bounds, dtype=np.float64)
+    arr = np.asarray(values, dtype=np.float64)
+    if arr.size > Config.MAX_ARRAY_LENGTH:
+        raise ValueError(f"Array has {arr.size} values, limit is {Config.MAX_ARRAY_LENGTH}")
+    return arr
+
+def _from_float_array(arr: "numpy.ndarray") -> Union[list, float, None]:
+    """Convert a result array to JSON friendly values, non-finite values become None"""
+    import numpy as np
+    arr = np.asarray(arr)
+    if np.isfinite(arr).all():
+        return arr.tolist()
+    # An object array keeps the shape (and 0-d input stays a scalar)
+    return np.where(np.isfinite(arr), arr, None).tolist()
+
+@toolset.tool()
+def array_binary_op(op: str, a: Union[List[float], str], b: Union[List[float], str, float]) -> Union[list, dict]:
+    """Apply add/subtract/multiply/divide/power/remainder/mine elementwise to two arrays (or an array and a scalar). Arrays can be lists or ranges written as 'start:stop[:step]'"""
+    print("CALLED: array_binary_op(op: str, a: list, b: list) -> list:")
+    import numpy as np
+    ops = _array_ops()["binary"]
+    if op not in ops:
+        raise ValueError(f"Unknown op '{op}', expected one of {sorted(ops)}")
+    with np.errstate(all='ignore'):
+        result = _from_float_array(ops[op](_to_float_array(a), _to_float_array(b)))
+    return RESULTS.maybe_store(result)
+
+@toolset.tool()
+def array_unary_op(op: str, values: Union[List[float], str]) -> Union[list, dict]:
+    """Apply sin/cos/tan/sqrt/cbrt/log/exp/abs to every value of an array. Arrays can be lists or ranges written as 'start:stop[:step]'"""
+    print("CALLED: array_unary_op(op: str, values: list) -> list:")
+    import numpy as np
+    ops = _array_ops()["unary"]
+    if op not in ops:
+        raise ValueError(f"Unknown op '{op}', expected one of {sorted(ops)}")
+    with np.errstate(all='ignore'):
+        result = _from_float_array(ops[op](_to_float_array(values)))
+    return RESULTS.maybe_store(result)
+
+@toolset.tool()
+def array_reduce(op: str, values: Union[List[float], str]) -> Optional[float]:
+    """Reduce an array to one number with sum/prod/min/max/mean/std/exponential_sum/logsumexp. Arrays can be lists or ranges written as 'start:stop[:step]'"""
+    print("CALLED: array_reduce(op: str, values: list) -> float:")
+    import numpy as np
+    ops = _array_ops()["reduce"]
+    if op not in ops:
+        raise ValueError(f"Unknown op '{op}', expected one of {sorted(ops)}")
+    with np.errstate(all='ignore'):
+        result = float(ops[op](_to_float_array(values)))
+    return result if math.isfinite(result) else None
+
+@toolset.tool()
+async def fibonacci_numbers(n: int) -> Union[list, dict]:
+    """Return the first n Fibonacci Numbers (a result:// handle with a summary when the list is large). When n is too large for one list, returns the values that fit, a summary of F(n-1) and next_start for fibonacci_sequence_chunk"""
+    print("CALLED: fibonacci_numbers(n: int) -> list:")
+    if n <= 0:
+        return []
+    max_digits = Config.FIBONACCI_LIST_MAX_DIGITS
+    chunk = await run_cpu_bound("fibonacci_numbers", bigint.fibonacci_chunk, 0, n, max_digits,
+                                cost=bigint.fibonacci_chunk_cost(0, n, max_digits))
+    if chunk["next_start"] is None:
+        return RESULTS.maybe_store(chunk["values"])
+    return {
+        "n": n,
+        "count": chunk["count"],
+        "values": RESULTS.maybe_store(chunk["values"]),
+        "last": await run_cpu_bound("fibonacci_numbers", bigint.fibonacci_value, n - 1, cost=bigint.fibonacci_cost(n - 1)),
+        "next_start": chunk["next_start"],
+        "note": f"Only the first {chunk['count']} values fit in {max_digits} digits, call fibonacci_sequence_chunk(start={chunk['next_start']}, count=...) for the rest",
+    }
+
+@toolset.tool()
+async def fibonacci_number(n: int) -> Union[int, dict]:
+    """Return only the nth Fibonacci number F(n) (F(0)=0, F(1)=1) using fast doubling. Results with more than MAX_RESULT_DIGITS digits are returned as a summary"""
+    print("CALLED: fibonacci_number(n: int) -> int:")
+    return await run_cpu_bound("fibonacci_number", bigint.fibonacci_value, n, cost=bigint.fibonacci_cost(n))
+
+@toolset.tool()
+async def fibonacci_sequence_chunk(start: int, count: int) -> dict:
+    """Return Fibonacci numbers F(start) .. F(start+count-1). Stops early when the chunk would exceed MAX_RESULT_DIGITS digits in total; call again with next_start to continue"""
+    print("CALLED: fibonacci_sequence_chunk(start: int, count: int) -> dict:")
+    chunk = await run_cpu_bound("fibonacci_sequence_chunk", bigint.fibonacci_chunk, start, count,
+                                cost=bigint.fibonacci_chunk_cost(start, count))
+    chunk["values"] = RESULTS.maybe_store(chunk["values"])
+    return chunk
+
+# SAFE EXPRESSION EVALUATION
+# evaluate_expression compiles a restricted Python expression once (cached) into
+# a tree of closures over the operations above, so a whole chain of tool calls
+# collapses into a single MCP round trip.
+
+# Bits of the largest integer with MAX_RESULT_DIGITS decimal digits
+MAX_RESULT_BITS = math.ceil(Config.MAX_RESULT_DIGITS * math.log2(10))
+
+def _checked_big_int(value):
+    """Reject summarized or oversized integers, so no step works on or returns more than MAX_RESULT_DIGITS digits"""
+    if isinstance(value, dict):
+        raise ValueError(f"Intermediate result too large ({value['digits']} digits)")
+    if isinstance(value, int) and value.bit_length() > MAX_RESULT_BITS:
+        # bit_length is O(1), unlike counting decimal digits
+        digits = bigint.digits_from_log10(value.bit_length() * math.log10(2))
+        raise ValueError(f"Intermediate result too large (about {digits} digits, limit is {Config.MAX_RESULT_DIGITS})")
+    return value
+
+EXPRESSION_FUNCTIONS = {
+    "add": lambda a, b: a + b,
+    "subtract": lambda a, b: a - b,
+    "multiply": lambda a, b: a * b,
+    "divide": lambda a, b: a / b,
+    "power": lambda a, b: _checked_big_int(bigint.power_value(a, b)) if isinstance(a, int) and isinstance(b, int) else a ** b,
+    "remainder": lambda a, b: a % b,
+    "mine": lambda a, b: a - b - b,
+    "sqrt": math.sqrt,
+    "cbrt": lambda a: math.copysign(abs(a) ** (1 / 3), a),
+    "log": math.log,
+    "exp": math.exp,
+    "sin": math.sin,
+    "cos": math.cos,
+    "tan": math.tan,
+    "abs": abs,
+    "round": round,
+    "factorial": lambda a: _checked_big_int(bigint.factorial_value(int(a))),
+    "fibonacci": lambda n: _checked_big_int(bigint.fibonacci_value(int(n))),
+    "sum": sum,
+    "add_list": sum,
+    "min": min,
+    "max": max,
+    "len": len,
+    "ascii": lambda string: [ord(char) for char in string],
+    "exponential_sum": lambda values: sum(math.exp(v) for v in values),
+    "logsumexp": _logsumexp,
+}
+
+EXPRESSION_CONSTANTS = {"pi": math.pi, "e": math.e}
+
+EXPRESSION_BINARY_OPS = {
+    ast.Add: "add",
+    ast.Sub: "subtract",
+    ast.Mult: "multiply",
+    ast.Div: "divide",
+    ast.Pow: "power",
+    ast.Mod: "remainder",
+}
+
+EXPRESSION_ARITHMETIC = {"add", "subtract", "multiply", "divide", "power", "remainder", "mine"}
+
+MAX_EXPRESSION_LENGTH = 2000
+MAX_EXPRESSION_NODES = 500
+
+def _compile_node(node: ast.AST, variables: set):
+    """Compile one AST node into a closure (env, steps) -> value"""
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float, str)) and not isinstance(node.value, bool):
+        value = node.value
+        return lambda env, steps: value
+
+    if isinstance(node, ast.Name):
+        name = node.id
+        if name in EXPRESSION_CONSTANTS:
+            value = EXPRESSION_CONSTANTS[name]
+            return lambda env, steps: value
+        variables.add(name)
+        def load(env, steps):
+            if name not in env:
+                raise NameError(f"Variable '{name}' is not defined")
+            return env[name]
+        return load
+
+    if isinstance(node, (ast.List, ast.Tuple)):
+        items = [_compile_node(item, variables) for item in node.elts]
+        return lambda env, steps: [item(env, steps) for item in items]
+
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        operand = _compile_node(node.operand, variables)
+        sign = -1 if isinstance(node.op, ast.USub) else 1
+        def signed(env, steps):
+            value = operand(env, steps)
+            # sign * [1, 2] would be list repetition
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                raise TypeError(f"Unary {'-' if sign < 0 else '+'} only accepts numbers")
+            return sign * value
+        return signed
+
+    if isinstance(node, ast.BinOp) and type(node.op) in EXPRESSION_BINARY_OPS:
+        return _compile_call(EXPRESSION_BINARY_OPS[type(node.op)],
+                             [_compile_node(node.left, variables), _compile_node(node.right, variables)])
+
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+        if node.func.id not in EXPRESSION_FUNCTIONS:
+            raise ValueError(f"Unknown function '{node.func.id}', expected one of {sorted(EXPRESSION_FUNCTIONS)}")
+        return _compile_call(node.func.id, [_compile_node(arg, variables) for arg in node.args])
+
+    raise ValueError(f"Unsupported expression element: {ast.dump(node)[:80]}")
+
+def _compile_call(name: str, args: list):
+    """Compile an operation call that records itself in the step trace"""
+    func = EXPRESSION_FUNCTIONS[name]
+    arithmetic = name in EXPRESSION_ARITHMETIC
+    def call(env, steps):
+        values = [arg(env, steps) for arg in args]
+        # Keeps e.g. 'a' * 10**9 or [0] * 10**9 from allocating huge sequences
+        if arithmetic and not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+            raise TypeError(f"{name} only accepts numbers")
+        result = _checked_big_int(func(*values))
+        if steps is not None:
+            steps.append({"step": len(steps) + 1, "operation": name, "args": values, "result": result})
+        return result
+    return call
+
+@functools.lru_cache(maxsize=256)
+def _compile_expression(expression: str):
+    """Parse and compile an expression, cached by its source text"""
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise ValueError(f"Expression longer than {MAX_EXPRESSION_LENGTH} characters")
+    tree = ast.parse(expression.strip(), mode='eval')
+    if sum(1 for _ in ast.walk(tree)) > MAX_EXPRESSION_NODES:
+        raise ValueError(f"Expression has more than {MAX_EXPRESSION_NODES} elements")
+    variables = set()
+    compiled = _compile_node(tree.body, variables)
+    return compiled, frozenset(variables)
+
+@toolset.tool()
+def evaluate_expression(expression: str, variables: Optional[Dict[str, Union[float, List[float]]]] = None, include_steps: bool = True) -> dict:
+    """
+    Evaluate a math expression in one call, e.g. "5 + 3 * sqrt(2)" or "exponential_sum(ascii('INDIA'))".
+    Supports numbers, strings, lists, variables, + - * / ** %, constants pi and e, and the functions
+    add, subtract, multiply, divide, power, remainder, mine, sqrt, cbrt, log, exp, sin, cos, tan, abs, round,
+    factorial, fibonacci, sum, add_list, min, max, len, ascii, exponential_sum, logsumexp.
+    Returns the result and the trace of every operation performed.
+    """
+    print("CALLED: evaluate_expression(expression: str, variables: dict) -> dict:")
+    compiled, names = _compile_expression(expression)
+    env = dict(variables or {})
+    missing = sorted(names - env.keys())
+    if missing:
+        raise ValueError(f"Missing values for variables: {', '.join(missing)}")
+    steps = [] if include_steps else None
+    result = compiled(env, steps)
+    response = {"expression": expression, "result": result}
+    if include_steps:
+        response["steps"] = steps
+    return response
+
+# RESULT STORE
+
+@toolset.resource("result://{result_id}")
+def get_result(result_id: str) -> str:
+    """Full serialized value of a stored tool result"""
+    print("CALLED: get_result(result_id: str) -> str:")
+    return RESULTS.get(result_id)
+
+@toolset.resource("result://{result_id}/page/{page}")
+def get_result_page(result_id: str, page: str) -> str:
+    """One page (RESULT_PAGE_BYTES bytes) of a stored tool result"""
+    print("CALLED: get_result_page(result_id: str, page: str) -> str:")
+    return json.dumps(RESULTS.page(result_id, int(page)))
+
+@toolset.tool()
+def read_result(result_id: str, offset: int = 0, length: int = 0) -> dict:
+    """Read a byte range of a large result returned as a result:// handle. length=0 reads one page; continue from next_offset"""
+    print("CALLED: read_result(result_id: str, offset: int, length: int) -> dict:")
+    return RESULTS.read(result_id.removeprefix("result://"), offset, length or None)
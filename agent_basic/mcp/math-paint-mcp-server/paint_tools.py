@@ -0,0 +1,403 @@
+"""
+Canvas tools of the Calculator server: Microsoft Paint automation, the
+headless Pillow canvas, scenes, result layout and thumbnails.
+
+Pillow (canvas, thumbnails) and the Windows UI automation stack (ui_driver,
+pywinauto, pywin32) are imported on first use, not when the tools are mounted.
+"""
+import asyncio
+import functools
+import itertools
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+from mcp.server.fastmcp import Image
+from mcp.types import TextContent
+from config import Config
+from toolset import Toolset
+
+if TYPE_CHECKING:
+    from canvas import Scene
+    from ui_driver import PaintSession
+
+toolset = Toolset("paint")
+register = toolset.register
+
+# PAINT TOOLS
+# Config.PAINT_BACKEND selects between driving mspaint.exe ("mspaint") and the
+# headless in-memory canvas ("pillow"), which returns the rendered PNG.
+
+paint_session = None
+pillow_canvas = None
+# Blocking UI automation runs on one dedicated thread, off the event loop and
+# serialized, since concurrent tool calls must not interleave mouse input
+UI_THREAD = ThreadPoolExecutor(max_workers=1, thread_name_prefix="paint-ui")
+# Open display lists by scene id, oldest evicted past Config.MAX_OPEN_SCENES
+scenes = OrderedDict()
+scene_counter = itertools.count(1)
+
+async def run_ui(fn, *args):
+    """Run a blocking PaintSession call on the UI thread"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(UI_THREAD, functools.partial(fn, *args))
+
+def _make_paint_session() -> "PaintSession":
+    from ui_driver import FakeDriver, PaintSession, PywinautoDriver
+    # PAINT_UI_DRIVER=fake simulates Paint so the mspaint code path runs anywhere
+    driver = FakeDriver() if Config.UI_DRIVER == "fake" else PywinautoDriver()
+    return PaintSession(driver, timeout=Config.UI_WAIT_TIMEOUT, settle=Config.UI_SETTLE_SECONDS)
+
+def _rectangle_tool_coords() -> tuple:
+    if Config.LAPTOP_MONITOR == True:
+        return Config.LAPTOP_MONITOR_TOOLBAR_RECTANGLE_X_POS, Config.LAPTOP_MONITOR_TOOLBAR_RECTANGLE_Y_POS
+    return Config.DESKTOP_MONITOR_TOOLBAR_RECTANGLE_X_POS, Config.DESKTOP_MONITOR_TOOLBAR_RECTANGLE_Y_POS
+
+def _pillow_response(message: str) -> list:
+    """Text plus the current headless canvas rendered as PNG"""
+    return [
+        TextContent(type="text", text=message),
+        Image(data=pillow_canvas.to_png(), format="png"),
+    ]
+
+def _pillow_not_open() -> dict:
+    return {
+        "content": [
+            TextContent(
+                type="text",
+                text="Canvas is not open. Please call open_paint first."
+            )
+        ]
+    }
+
+@toolset.tool()
+async def open_paint():
+    """Open Microsoft Paint Canvas ready for drawing maximized on primary monitor with initialization verification"""
+    global paint_session, pillow_canvas
+    if Config.PAINT_BACKEND == "pillow":
+        from canvas import PillowCanvas
+        pillow_canvas = PillowCanvas(Config.PAINT_CANVAS_WIDTH, Config.PAINT_CANVAS_HEIGHT)
+        return [TextContent(
+            type="text",
+            text=f"Canvas of width={Config.PAINT_CANVAS_WIDTH} and height={Config.PAINT_CANVAS_HEIGHT} opened and ready for drawing."
+        )]
+    try:
+        session = _make_paint_session()
+        monitor_count = await run_ui(session.open)
+        paint_session = session
+        
+        return {
+            "content": [
+                TextContent(
+                    type="text",
+                    text=f"Microsoft Paint Canvas opened and ready for drawing. All UI elements accessible. Detected {monitor_count} monitor(s)."
+                )
+            ]
+        }
+    except Exception as e:
+        logging.error(f"Error in open_paint: {str(e)}")
+        return {
+            "content": [
+                TextContent(
+                    type="text",
+                    text=f"Error opening Paint: {str(e)}"
+                )
+            ]
+        }
+
+@toolset.tool()
+async def get_screen_canvas_dimensions() -> dict:
+    """Get the resolution of the screen and the dimensions of the Microsoft Paint Canvas with proper verification"""
+    if Config.PAINT_BACKEND == "pillow":
+        return {
+            "content": [
+                TextContent(
+                    type="text",
+                    text=f"Headless canvas available for drawing is a rectangle with width={Config.PAINT_CANVAS_WIDTH} and height={Config.PAINT_CANVAS_HEIGHT} positioned at (0, 0)"
+                )
+            ]
+        }
+    try:
+        import win32api
+        import win32con
+        # Get monitor information
+        monitor_count = win32api.GetSystemMetrics(win32con.SM_CMONITORS)
+        primary_width = win32api.GetSystemMetrics(win32con.SM_CXSCREEN)
+        primary_height = win32api.GetSystemMetrics(win32con.SM_CYSCREEN)
+
+        canvas_width = Config.PAINT_CANVAS_WIDTH
+        canvas_height = Config.PAINT_CANVAS_HEIGHT
+
+        if Config.LAPTOP_MONITOR == True:
+            canvas_x = Config.LAPTOP_MONITOR_CANVAS_X_POS
+            canvas_y = Config.LAPTOP_MONITOR_CANVAS_Y_POS
+        else:
+            canvas_x = Config.DESKTOP_MONITOR_CANVAS_X_POS
+            canvas_y = Config.DESKTOP_MONITOR_CANVAS_Y_POS
+        
+        logging.info(f"\n{'='*20} Display Configuration {'='*20}")
+        logging.info(f"Total number of monitors: {monitor_count}")
+        logging.info(f"Primary Monitor Resolution: {primary_width}x{primary_height}")
+        
+        return {
+            "content": [
+                TextContent(
+                    type="text",
+                    text=f"Screen resolution: Width={primary_width}, Height={primary_height}, Microsoft Paint Canvas available for drawing is a rectangle with width={canvas_width} and height={canvas_height} positioned at {canvas_x, canvas_y}"
+                )
+            ]
+        }
+    except Exception as e:
+        logging.error(f"Error getting canvas resolution: {str(e)}")
+        return {
+            "content": [
+                TextContent(
+                    type="text",
+                    text=f"Error getting canvas resolution: {str(e)}"
+                )
+            ]
+        }   
+
+@toolset.tool()
+async def draw_rectangle(x1: int, y1: int, x2: int, y2: int):
+    """Draw a black rectangle in Microsoft Paint Canvas from (x1,y1) to (x2,y2)"""
+    if Config.PAINT_BACKEND == "pillow":
+        if not pillow_canvas:
+            return _pillow_not_open()
+        pillow_canvas.draw_rectangle(x1, y1, x2, y2)
+        return _pillow_response(f"Black Rectangle drawn on canvas from ({x1},{y1}) to ({x2},{y2})")
+    try:
+        if not paint_session:
+            return {
+                "content": [
+                    TextContent(
+                        type="text",
+                        text="Paint is not open. Please call open_paint first."
+                    )
+                ]
+            }
+        
+        logging.info(f"Starting rectangle drawing operation from ({x1},{y1}) to ({x2},{y2})")
+        
+        def draw():
+            paint_session.ensure_focus()
+            paint_session.select_rectangle_tool(*_rectangle_tool_coords())
+            paint_session.drag_rectangle(x1, y1, x2, y2)
+        await run_ui(draw)
+        
+        return {
+            "content": [
+                TextContent(
+                    type="text",
+                    text=f"Black Rectangle drawn on Microsoft Paint Canvas from ({x1},{y1}) to ({x2},{y2})"
+                )
+            ]
+        }
+    except Exception as e:
+        logging.error(f"Error in draw_rectangle: {str(e)}")
+        return {
+            "content": [
+                TextContent(
+                    type="text",
+                    text=f"Error drawing black rectangle on Microsoft Paint Canvas: {str(e)}"
+                )
+            ]
+        }
+
+@toolset.tool()
+async def add_text_in_paint(text: str, x: int, y: int, width: int = 200, height: int = 100):
+    """
+    Draw text in Microsoft Paint Canvas at specified coordinates starting from (x,y) within the box of size (width, height)
+    
+    """
+    if Config.PAINT_BACKEND == "pillow":
+        if not pillow_canvas:
+            return _pillow_not_open()
+        pillow_canvas.add_text(text, x, y, Config.CANVAS_FONT_SIZE)
+        return _pillow_response(f"Text '{text}' added successfully at ({x}, {y}) on canvas")
+    try:
+        if not paint_session:
+            return {
+                "content": [
+                    TextContent(
+                        type="text",
+                        text="Paint is not open. Please call open_paint first."
+                    )
+                ]
+            }
+        
+        logging.info(f"Expected: Starting text addition operation: '{text}' at ({x}, {y}) with box size ({width}, {height})")
+
+
+        #temp_x = x
+        #temp_y = y
+        #temp_width = width
+        #temp_height = height
+
+        #x = 780
+        #y = 380
+        #width = 200
+        #height = 100
+
+        logging.info(f"Actual: Starting text addition operation: '{text}' at ({x}, {y}) with box size ({width}, {height})")
+  
+        def add_text():
+            paint_session.ensure_focus()
+            paint_session.select_text_tool()
+            paint_session.type_text_box(text, x, y, width, height)
+            # Switch back to selection tool
+            paint_session.select_selection_tool()
+        await run_ui(add_text)
+        
+        logging.info("Text addition completed")
+
+        #x = temp_x
+        #y = temp_y
+        #width = temp_width
+        #height = temp_height
+        
+        return {
+            "content": [
+                TextContent(
+                    type="text",
+                    text=f"Text '{text}' added successfully at ({x}, {y}) on Microsoft Paint Canvas"
+                )
+            ]
+        }
+    except Exception as e:
+        logging.error(f"Error adding text: {str(e)}")
+        return {
+            "content": [
+                TextContent(
+                    type="text",
+                    text=f"Error adding text: {str(e)} on Microsoft Paint Canvas"
+                )
+            ]
+        }
+
+# SCENE TOOLS
+# Display list API: begin_scene, add shapes, then commit_scene draws them all in
+# one pass so the canvas is focused and each toolbar tool selected only once.
+
+def _text_response(text: str) -> dict:
+    return {"content": [TextContent(type="text", text=text)]}
+
+def _get_scene(scene_id: str) -> "Scene":
+    if scene_id not in scenes:
+        raise ValueError(f"Unknown scene: {scene_id}. Please call begin_scene first.")
+    return scenes[scene_id]
+
+@toolset.tool()
+def begin_scene() -> dict:
+    """Start a new drawing scene on the canvas and return its scene_id. Add shapes with scene_add_rectangle / scene_add_text, then draw them all at once with commit_scene"""
+    print("CALLED: begin_scene() -> dict:")
+    from canvas import Scene
+    scene_id = f"scene-{next(scene_counter)}"
+    scenes[scene_id] = Scene(Config.MAX_SCENE_OPERATIONS)
+    while len(scenes) > Config.MAX_OPEN_SCENES:
+        evicted, _ = scenes.popitem(last=False)
+        logging.info(f"Discarding uncommitted scene {evicted}")
+    return _text_response(f"Scene {scene_id} started. Use scene_id={scene_id} to add shapes and commit.")
+
+@toolset.tool()
+def scene_add_rectangle(scene_id: str, x1: int, y1: int, x2: int, y2: int) -> dict:
+    """Add a black rectangle from (x1,y1) to (x2,y2) to a scene, drawn on commit_scene"""
+    print("CALLED: scene_add_rectangle(scene_id: str, x1: int, y1: int, x2: int, y2: int) -> dict:")
+    count = _get_scene(scene_id).add_rectangle(x1, y1, x2, y2)
+    return _text_response(f"Rectangle from ({x1},{y1}) to ({x2},{y2}) added to {scene_id} ({count} operations)")
+
+@toolset.tool()
+def scene_add_text(scene_id: str, text: str, x: int, y: int, width: int = 200, height: int = 100) -> dict:
+    """Add text at (x,y) within the box of size (width, height) to a scene, drawn on commit_scene"""
+    print("CALLED: scene_add_text(scene_id: str, text: str, x: int, y: int, width: int = 200, height: int = 100) -> dict:")
+    count = _get_scene(scene_id).add_text(text, x, y, width, height)
+    return _text_response(f"Text '{text}' at ({x}, {y}) added to {scene_id} ({count} operations)")
+
+def _render_scene_in_paint(scene: "Scene"):
+    """Replay a scene in mspaint, grouped by tool so each is selected once"""
+    rectangles, texts = scene.plan()
+    paint_session.ensure_focus()
+    if rectangles:
+        paint_session.select_rectangle_tool(*_rectangle_tool_coords())
+        for op in rectangles:
+            paint_session.drag_rectangle(op.x1, op.y1, op.x2, op.y2)
+    if texts:
+        paint_session.select_text_tool()
+        # Committing a text box leaves the text tool active for the next one
+        for op in texts:
+            paint_session.type_text_box(op.text, op.x, op.y, op.width, op.height, op.font_size)
+        paint_session.select_selection_tool()
+
+async def _draw_scene(scene: "Scene", summary: str):
+    """Render a scene with the configured backend, returning (drawn, response)"""
+    if Config.PAINT_BACKEND == "pillow":
+        if not pillow_canvas:
+            return False, _pillow_not_open()
+        scene.render(pillow_canvas, Config.CANVAS_FONT_SIZE)
+        return True, _pillow_response(summary)
+    if not paint_session:
+        return False, _text_response("Paint is not open. Please call open_paint first.")
+    try:
+        await run_ui(_render_scene_in_paint, scene)
+        return True, _text_response(summary + " on Microsoft Paint Canvas")
+    except Exception as e:
+        logging.error(f"Error drawing scene: {str(e)}")
+        return False, _text_response(f"Error drawing on Microsoft Paint Canvas: {str(e)}")
+
+@toolset.tool()
+async def commit_scene(scene_id: str):
+    """Draw all shapes of a scene on the canvas in one pass and close the scene"""
+    print("CALLED: commit_scene(scene_id: str):")
+    scene = _get_scene(scene_id)
+    rectangles, texts = scene.plan()
+    logging.info(f"Committing {scene_id}: {len(rectangles)} rectangle(s), {len(texts)} text(s)")
+    drawn, response = await _draw_scene(
+        scene,
+        f"Scene {scene_id} drawn: {len(rectangles)} rectangle(s) and {len(texts)} text(s) "
+        f"from {len(scene.operations)} operation(s)"
+    )
+    if drawn:
+        # A begin_scene during the draw may have evicted it already
+        scenes.pop(scene_id, None)
+    return response
+
+# LAYOUT TOOLS
+
+@toolset.tool()
+async def render_result(text: str, style: str = "default"):
+    """Display a result centered on the canvas inside a boundary in one call. Font size, text position and boundary are computed server-side from font metrics. style is one of: default, large, compact"""
+    print("CALLED: render_result(text: str, style: str = \"default\"):")
+    from canvas import Scene, layout_centered_text
+    if style not in Config.RENDER_STYLES:
+        raise ValueError(f"Unknown style '{style}', expected one of {sorted(Config.RENDER_STYLES)}")
+    layout = layout_centered_text(
+        text, Config.PAINT_CANVAS_WIDTH, Config.PAINT_CANVAS_HEIGHT, **Config.RENDER_STYLES[style]
+    )
+    boundary, placed = layout.boundary, layout.text
+    logging.info(f"render_result layout: boundary={boundary}, text at ({placed.x}, {placed.y}) font_size={placed.font_size}")
+    scene = Scene(max_operations=2)
+    scene.add_rectangle(*boundary)
+    scene.add_text(*placed)
+    _, response = await _draw_scene(
+        scene,
+        f"Result '{text}' rendered at font size {placed.font_size}, centered at ({placed.x}, {placed.y}) "
+        f"inside boundary ({boundary.x1},{boundary.y1}) to ({boundary.x2},{boundary.y2})"
+    )
+    return response
+
+# THUMBNAIL TOOLS
+
+@toolset.tool()
+async def create_thumbnail(image_path: str, size: int = 100, format: str = "png") -> Image:
+    """Create a thumbnail (PNG or WebP, at most size x size pixels) from an image"""
+    print("CALLED: create_thumbnail(image_path: str) -> Image:")
+    import thumbnails
+    data, _ = await asyncio.to_thread(thumbnails.make_thumbnail, image_path, size, format)
+    return Image(data=data, format=format.lower())
+
+@toolset.tool()
+async def create_thumbnails(image_paths: list[str], size: int = 100, format: str = "png") -> list:
+    """Create thumbnails for many images in one call. Returns the cached thumbnail file path and size for each image"""
+    print("CALLED: create_thumbnails(image_paths: list[str]) -> list:")
+    import thumbnails
+    return await asyncio.to_thread(thumbnails.make_thumbnails, image_paths, size, format)
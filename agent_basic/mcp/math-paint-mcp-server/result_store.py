@@ -0,0 +1,103 @@
+"""
+Server-side store for large tool results.
+
+Tools whose serialized result exceeds Config.RESULT_INLINE_BYTES keep the full
+value here and return a small handle (result://{id}) with a summary instead;
+clients read it back by byte range or page through the result:// resources or
+the read_result tool. The store is an LRU bounded by total size.
+"""
+import json
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+
+def summarize_value(value: Any, preview: int = 10) -> Dict[str, Any]:
+    """Small description of a large value: type, size and a few elements"""
+    if isinstance(value, (list, tuple)):
+        return {
+            "type": "list",
+            "length": len(value),
+            "head": list(value[:preview]),
+            "tail": list(value[-3:]) if len(value) > preview else [],
+        }
+    if isinstance(value, dict):
+        return {
+            "type": "dict",
+            "length": len(value),
+            "keys": list(value.keys())[:preview * 2],
+        }
+    text = str(value)
+    return {"type": type(value).__name__, "length": len(text), "head": text[:200]}
+
+
+class ResultStore:
+    def __init__(self, max_bytes: int, inline_bytes: int, page_bytes: int):
+        self.max_bytes = max_bytes
+        self.inline_bytes = inline_bytes
+        self.page_bytes = page_bytes
+        self._results = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def put(self, data: str) -> str:
+        """Store serialized (ASCII JSON) data and return its id"""
+        result_id = uuid.uuid4().hex[:16]
+        with self._lock:
+            self._results[result_id] = data
+            self._total_bytes += len(data)
+            # Evict least recently used results, always keep the newest one
+            while self._total_bytes > self.max_bytes and len(self._results) > 1:
+                _, evicted = self._results.popitem(last=False)
+                self._total_bytes -= len(evicted)
+        return result_id
+
+    def get(self, result_id: str) -> str:
+        with self._lock:
+            if result_id not in self._results:
+                raise KeyError(f"Unknown or expired result: {result_id}")
+            self._results.move_to_end(result_id)
+            return self._results[result_id]
+
+    def read(self, result_id: str, offset: int = 0, length: Optional[int] = None) -> Dict[str, Any]:
+        """Read a byte range of a stored result"""
+        data = self.get(result_id)
+        length = length or self.page_bytes
+        if offset < 0 or length < 0:
+            raise ValueError("offset and length must be non-negative")
+        chunk = data[offset:offset + length]
+        end = offset + len(chunk)
+        return {
+            "result_id": result_id,
+            "offset": offset,
+            "length": len(chunk),
+            "total_bytes": len(data),
+            "next_offset": end if end < len(data) else None,
+            "data": chunk,
+        }
+
+    def page(self, result_id: str, page: int) -> Dict[str, Any]:
+        """Read page number `page` (0-based) of page_bytes bytes"""
+        return self.read(result_id, page * self.page_bytes, self.page_bytes)
+
+    def load(self, value: Any) -> Any:
+        """Full value behind a handle returned by maybe_store, any other value unchanged"""
+        if isinstance(value, dict) and str(value.get("result_handle", "")).startswith("result://"):
+            return json.loads(self.get(value["result_id"]))
+        return value
+
+    def maybe_store(self, value: Any, summarize: Callable[[Any], Dict[str, Any]] = summarize_value) -> Any:
+        """Return value itself when small, otherwise store it and return a handle"""
+        data = json.dumps(value, default=str, separators=(',', ':'))
+        if len(data) <= self.inline_bytes:
+            return value
+        result_id = self.put(data)
+        return {
+            "result_handle": f"result://{result_id}",
+            "result_id": result_id,
+            "total_bytes": len(data),
+            "page_bytes": self.page_bytes,
+            "pages": -(-len(data) // self.page_bytes),
+            "summary": summarize(value),
+        }
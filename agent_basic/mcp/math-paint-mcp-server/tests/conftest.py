@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Server modules import each other by name and read `config` from agent_basic/,
+# appended so that its local mcp package does not shadow the installed SDK
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+sys.path.append(os.path.dirname(os.path.dirname(SERVER_DIR)))
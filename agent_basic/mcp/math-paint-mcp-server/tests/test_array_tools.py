@@ -0,0 +1,35 @@
+import math
+
+import numpy as np
+import pytest
+
+import math_tools
+
+
+def test_range_with_zero_step_is_rejected():
+    with pytest.raises(ValueError, match="step must not be 0"):
+        math_tools._to_float_array("0:5:0")
+
+
+def test_range_spec():
+    assert math_tools._to_float_array("0:2:0.5").tolist() == [0.0, 0.5, 1.0, 1.5]
+
+
+def test_non_finite_values_keep_the_shape():
+    values = np.array([[1.0, np.inf], [np.nan, 4.0]])
+    assert math_tools._from_float_array(values) == [[1.0, None], [None, 4.0]]
+
+
+def test_zero_dimensional_results_stay_scalar():
+    assert math_tools._from_float_array(np.float64(2.5)) == 2.5
+    assert math_tools._from_float_array(np.float64(np.nan)) is None
+
+
+def test_array_binary_op_broadcasts_scalar():
+    assert math_tools.array_binary_op("divide", [1, 0, -1], 0) == [None, None, None]
+    assert math_tools.array_binary_op("add", "0:3", 1) == [1.0, 2.0, 3.0]
+
+
+def test_array_reduce_range():
+    assert math_tools.array_reduce("sum", "1:101") == 5050.0
+    assert math.isclose(math_tools.array_reduce("logsumexp", [1000, 1000]), 1000 + math.log(2))
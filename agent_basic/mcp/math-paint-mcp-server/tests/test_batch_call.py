@@ -0,0 +1,45 @@
+import asyncio
+
+import bigint
+import mcp_server
+
+
+def batch(*calls):
+    return asyncio.run(mcp_server.batch_call(list(calls)))
+
+
+def test_batch_passes_results_by_reference():
+    results = batch(
+        {"tool": "add", "args": {"a": 2, "b": 3}},
+        {"tool": "multiply", "args": {"a": {"$ref": 0}, "b": 4}},
+        {"tool": "determine_datatype", "args": {"value": "12"}},
+        {"tool": "add", "args": {"a": {"$ref": 2, "path": ["details", "int"]}, "b": 1}},
+    )
+    assert [entry["ok"] for entry in results] == [True] * 4
+    assert results[1]["result"] == 20
+    assert results[3]["result"] == 13
+
+
+def test_batch_reports_failures_per_item():
+    results = batch(
+        {"tool": "divide", "args": {"a": 1, "b": 0}},
+        {"tool": "add", "args": {"a": {"$ref": 0}, "b": 1}},
+        {"tool": "add", "args": {"a": "x", "b": 1}},
+        {"tool": "batch_call", "args": {"calls": []}},
+    )
+    assert [entry["ok"] for entry in results] == [False] * 4
+    assert "Referenced item 0 failed" in results[1]["error"]
+    assert "cannot be nested" in results[3]["error"]
+
+
+def test_references_resolve_result_handles():
+    string = "abc" * 1000
+    results = batch(
+        {"tool": "strings_to_chars_to_int", "args": {"string": string}},
+        {"tool": "add_list", "args": {"l": {"$ref": 0}}},
+        {"tool": "fibonacci_numbers", "args": {"n": 300}},
+        {"tool": "add_list", "args": {"l": {"$ref": 2}}},
+    )
+    assert results[0]["result"]["result_handle"].startswith("result://")
+    assert results[1] == {"index": 1, "tool": "add_list", "ok": True, "result": sum(map(ord, string))}
+    assert results[3]["result"] == bigint.fib_pair(301)[0] - 1
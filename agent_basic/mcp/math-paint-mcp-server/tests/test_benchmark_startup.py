@@ -0,0 +1,13 @@
+import os
+
+import benchmark_startup
+
+AGENT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(benchmark_startup.__file__))))
+
+
+def test_probe_finds_config_and_the_mcp_sdk(monkeypatch):
+    # agent_basic first on PYTHONPATH would let its mcp package shadow the SDK
+    monkeypatch.setenv("PYTHONPATH", AGENT_DIR)
+    result = benchmark_startup.sample("math")
+    assert result["tools"] > 0
+    assert result["heavy"] == []
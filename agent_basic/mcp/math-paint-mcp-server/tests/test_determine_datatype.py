@@ -0,0 +1,32 @@
+import math
+
+import math_tools
+from config import Config
+
+
+def test_integer_past_the_conversion_limit_falls_back_to_float():
+    result = math_tools.determine_datatype("1" * 5000)
+    assert "int" not in result["possible_types"]
+    assert result["primary_type"] == "float"
+    assert math.isinf(result["details"]["float"])
+
+
+def test_scalars_and_containers():
+    assert math_tools.determine_datatype("42")["details"]["int"] == 42
+    assert math_tools.determine_datatype("null")["primary_type"] == "NoneType"
+    listed = math_tools.determine_datatype("[1, 2.5, 'a']")
+    assert listed["primary_type"] == "list"
+    assert listed["details"]["list"]["element_type_counts"] == {"int": 1, "float": 1, "str": 1}
+
+
+def test_only_short_inputs_are_cached():
+    math_tools._classify_cached.cache_clear()
+    math_tools.determine_datatype("7")
+    math_tools.determine_datatype("x" * (Config.DATATYPE_CACHE_MAX_LENGTH + 1))
+    assert math_tools._classify_cached.cache_info().currsize == 1
+
+
+def test_cached_results_are_not_shared():
+    first = math_tools.determine_datatype("[1]")
+    first["details"]["list"]["length"] = 99
+    assert math_tools.determine_datatype("[1]")["details"]["list"]["length"] == 1
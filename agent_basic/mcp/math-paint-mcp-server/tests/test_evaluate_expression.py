@@ -0,0 +1,32 @@
+import pytest
+
+import math_tools
+
+
+def evaluate(expression, **variables):
+    return math_tools.evaluate_expression(expression, variables or None)
+
+
+def test_expression_with_steps():
+    result = evaluate("add(2, 3) * x", x=4)
+    assert result["result"] == 20
+    assert [step["operation"] for step in result["steps"]] == ["add", "multiply"]
+
+
+def test_every_intermediate_result_is_bounded():
+    with pytest.raises(ValueError, match="too large"):
+        evaluate("10**3999 * 10**3999")
+    with pytest.raises(ValueError, match="too large"):
+        evaluate("factorial(1000) * factorial(1000) - 1")
+
+
+def test_summarized_power_is_rejected():
+    with pytest.raises(ValueError, match="too large"):
+        evaluate("2**100000 + 1")
+
+
+def test_unary_minus_rejects_lists():
+    with pytest.raises(TypeError, match="only accepts numbers"):
+        evaluate("-[1, 2]")
+    assert evaluate("-(2 + 3)")["result"] == -5
+    assert evaluate("-x", x=1.5)["result"] == -1.5
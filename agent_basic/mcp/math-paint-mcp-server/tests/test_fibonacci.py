@@ -0,0 +1,37 @@
+import asyncio
+
+import bigint
+import math_tools
+from config import Config
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_fibonacci_numbers_200_goes_to_the_result_store():
+    result = run(math_tools.fibonacci_numbers(200))
+    assert result["result_handle"].startswith("result://")
+    assert result["summary"]["length"] == 200
+    values = math_tools.RESULTS.get(result["result_id"])
+    assert values.startswith("[0,1,1,2,3,5,8")
+    assert values.endswith(f",{bigint.fib_pair(199)[0]}]")
+
+
+def test_fibonacci_numbers_small_list_is_inline():
+    assert run(math_tools.fibonacci_numbers(10)) == [0, 1, 1, 2, 3, 5, 8, 13, 21, 34]
+
+
+def test_fibonacci_numbers_past_the_budget_is_summarized(monkeypatch):
+    monkeypatch.setattr(Config, "FIBONACCI_LIST_MAX_DIGITS", 100)
+    result = run(math_tools.fibonacci_numbers(50_000))
+    assert result["n"] == 50_000
+    assert result["next_start"] == result["count"]
+    assert result["values"] == [bigint.fib_pair(k)[0] for k in range(result["count"])]
+    assert result["last"]["summarized"] and result["last"]["n"] == 49_999
+
+
+def test_fibonacci_sequence_chunk_continues_from_next_start():
+    chunk = run(math_tools.fibonacci_sequence_chunk(100, 5))
+    assert chunk["values"] == [bigint.fib_pair(k)[0] for k in range(100, 105)]
+    assert chunk["next_start"] is None
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+import paint_tools
+from config import Config
+from ui_driver import FakeDriver, PaintSession
+
+
+@pytest.fixture
+def driver(monkeypatch):
+    fake = FakeDriver(window_delay=0, canvas_delay=0, focus_delay=0, maximize_delay=0)
+    fake.start()
+    monkeypatch.setattr(Config, "PAINT_BACKEND", "mspaint")
+    monkeypatch.setattr(paint_tools, "paint_session", PaintSession(fake, timeout=1.0, settle=0))
+    return fake
+
+
+def test_text_box_sets_the_font_size_before_typing():
+    driver = FakeDriver()
+    PaintSession(driver, settle=0).type_text_box("42", 10, 20, 100, 50, font_size=48)
+    font_box = ("click_window",) + PaintSession.FONT_SIZE_BOX
+    assert driver.actions.index(font_box) < driver.actions.index(("type_text", "42"))
+    assert ("type_keys", "36{ENTER}") in driver.actions
+
+
+def test_text_box_without_font_size_keeps_paint_default():
+    driver = FakeDriver()
+    PaintSession(driver, settle=0).type_text_box("42", 10, 20, 100, 50)
+    assert ("click_window",) + PaintSession.FONT_SIZE_BOX not in driver.actions
+
+
+def test_render_result_applies_the_layout_font_size_in_paint(driver):
+    response = asyncio.run(paint_tools.render_result("12345", "large"))
+    text = response["content"][0].text
+    font_size = int(text.split("font size ")[1].split(",")[0])
+    points = round(font_size / PaintSession.PIXELS_PER_POINT)
+    assert ("type_keys", f"{points}{{ENTER}}") in driver.actions
+    assert ("type_text", "12345") in driver.actions
+
+
+def test_drivers_must_implement_every_primitive():
+    from ui_driver import UiDriver
+
+    class PartialDriver(UiDriver):
+        def start(self):
+            pass
+
+    with pytest.raises(TypeError, match="abstract"):
+        PartialDriver()
+
+
+def test_commit_scene_evicted_while_drawing(driver, monkeypatch):
+    from collections import OrderedDict
+
+    monkeypatch.setattr(paint_tools, "scenes", OrderedDict())
+    monkeypatch.setattr(Config, "MAX_OPEN_SCENES", 1)
+    text = paint_tools.begin_scene()["content"][0].text
+    scene_id = text.split("scene_id=")[1].split(" ")[0]
+    paint_tools.scene_add_rectangle(scene_id, 10, 10, 50, 50)
+    run_ui = paint_tools.run_ui
+
+    async def run_ui_while_another_scene_begins(fn, *args):
+        # Another request opens a scene while this one is drawn, evicting it
+        paint_tools.begin_scene()
+        return await run_ui(fn, *args)
+
+    monkeypatch.setattr(paint_tools, "run_ui", run_ui_while_another_scene_begins)
+    response = asyncio.run(paint_tools.commit_scene(scene_id))
+    assert f"Scene {scene_id} drawn" in response["content"][0].text
+    assert scene_id not in paint_tools.scenes
@@ -0,0 +1,40 @@
+import os
+
+import pytest
+from PIL import Image as PILImage
+
+import thumbnails
+from config import Config
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    directory = tmp_path / "cache"
+    monkeypatch.setattr(Config, "THUMBNAIL_CACHE_DIR", str(directory))
+    return directory
+
+
+@pytest.fixture
+def image_path(tmp_path):
+    path = tmp_path / "photo.jpg"
+    PILImage.new("RGB", (400, 200), "red").save(path)
+    return str(path)
+
+
+def test_cache_hits_report_dimensions(cache_dir, image_path):
+    _, fresh = thumbnails.make_thumbnail(image_path, 100, "webp")
+    _, cached = thumbnails.make_thumbnail(image_path, 100, "webp")
+    assert not fresh["cached"] and cached["cached"]
+    assert (cached["width"], cached["height"]) == (fresh["width"], fresh["height"]) == (100, 50)
+
+
+def test_concurrent_thumbnails_of_one_image(cache_dir, image_path, monkeypatch):
+    monkeypatch.setattr(Config, "THUMBNAIL_WORKERS", 8)
+    results = thumbnails.make_thumbnails([image_path] * 16, 64, "png")
+    assert all(result["ok"] for result in results), results
+    assert os.listdir(cache_dir) == [os.path.basename(results[0]["thumbnail_path"])]
+
+
+def test_errors_are_reported_per_image(cache_dir, image_path):
+    results = thumbnails.make_thumbnails([image_path, image_path + ".missing"], 64)
+    assert [result["ok"] for result in results] == [True, False]
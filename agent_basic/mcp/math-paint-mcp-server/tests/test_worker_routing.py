@@ -0,0 +1,101 @@
+import asyncio
+import time
+
+import pytest
+
+import bigint
+import math_tools
+from config import Config
+from worker_pool import CpuLimitExceeded, WorkerPool
+
+
+def spin(seconds, marker=None):
+    if marker is not None:
+        with open(marker, "a") as file:
+            file.write("started\n")
+    end = time.process_time() + seconds
+    while time.process_time() < end:
+        pass
+    return seconds
+
+
+def nap(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+class RecordingPool:
+    def __init__(self):
+        self.calls = []
+
+    async def run(self, fn, *args):
+        self.calls.append(fn.__name__)
+        return fn(*args)
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    recording = RecordingPool()
+    monkeypatch.setattr(math_tools, "WORKERS", recording)
+    return recording
+
+
+def test_cheap_calls_stay_inline(pool):
+    assert asyncio.run(math_tools.factorial(1000)) == bigint.factorial_value(1000)
+    assert asyncio.run(math_tools.power(3, 10 ** 9))["summarized"]
+    assert asyncio.run(math_tools.fibonacci_number(10 ** 9))["summarized"]
+    assert pool.calls == []
+
+
+def test_expensive_calls_use_the_pool(pool):
+    asyncio.run(math_tools.fibonacci_numbers(3000))
+    assert pool.calls == ["fibonacci_chunk"]
+
+
+def test_tools_can_opt_in_to_the_pool(pool, monkeypatch):
+    monkeypatch.setattr(Config, "WORKER_TOOLS", {"factorial"})
+    asyncio.run(math_tools.factorial(10))
+    asyncio.run(math_tools.power(2, 10))
+    assert pool.calls == ["factorial_value"]
+
+
+def test_summaries_are_cheaper_than_computed_results():
+    assert bigint.power_cost(7, 10 ** 12) < bigint.power_cost(7, 4000)
+    assert bigint.factorial_cost(10 ** 9) < bigint.factorial_cost(1000)
+
+
+def test_overrunning_call_retires_the_pool():
+    workers = WorkerPool(max_workers=1, cpu_seconds=0.2)
+    try:
+        with pytest.raises(CpuLimitExceeded):
+            asyncio.run(workers.run(spin, 30))
+        assert asyncio.run(workers.run(spin, 0.01)) == 0.01
+    finally:
+        workers.shutdown()
+
+
+def test_call_over_its_limit_is_not_retried(tmp_path):
+    marker = str(tmp_path / "starts")
+    workers = WorkerPool(max_workers=1, cpu_seconds=0.2)
+    try:
+        with pytest.raises(CpuLimitExceeded):
+            asyncio.run(workers.run(spin, 30, marker))
+    finally:
+        workers.shutdown()
+    with open(marker) as file:
+        assert file.read().count("started") == 1
+
+
+def test_calls_sharing_a_broken_pool_are_retried():
+    workers = WorkerPool(max_workers=2, cpu_seconds=0.2)
+
+    async def both():
+        return await asyncio.gather(
+            workers.run(spin, 30), workers.run(nap, 1.5, cpu_seconds=10), return_exceptions=True)
+
+    try:
+        overrun, napped = asyncio.run(both())
+    finally:
+        workers.shutdown()
+    assert isinstance(overrun, CpuLimitExceeded)
+    assert napped == 1.5
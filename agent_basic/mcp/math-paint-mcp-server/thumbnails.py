@@ -0,0 +1,104 @@
+"""
+Thumbnail pipeline for the create_thumbnail tools.
+
+JPEG sources are decoded at reduced scale with Image.draft() (DCT scaling),
+the result is encoded as a real PNG or WebP, and encoded thumbnails are cached
+on disk under a key of (absolute path, mtime, file size, parameters) so a
+repeated request only costs a stat() and a file read.
+"""
+import hashlib
+import io
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+from PIL import Image as PILImage
+
+from config import Config
+
+THUMBNAIL_FORMATS = {"png": "PNG", "webp": "WEBP"}
+
+
+def cache_key(image_path: str, size: int, fmt: str) -> str:
+    """Content-addressed key, changes whenever the source file changes"""
+    stat = os.stat(image_path)
+    raw = f"{os.path.abspath(image_path)}|{stat.st_mtime_ns}|{stat.st_size}|{size}|{fmt}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def _encode_thumbnail(image_path: str, size: int, fmt: str) -> Tuple[bytes, Tuple[int, int]]:
+    with PILImage.open(image_path) as img:
+        # Lets the JPEG decoder scale by 1/2, 1/4 or 1/8 while decoding, a no-op for other formats
+        img.draft(img.mode, (size, size))
+        img.thumbnail((size, size), reducing_gap=2.0)
+        if fmt == "webp" and img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if "A" in img.getbands() or "transparency" in img.info else "RGB")
+        elif fmt == "png" and img.mode in ("CMYK", "YCbCr", "I;16"):
+            img = img.convert("RGB")
+        buffer = io.BytesIO()
+        if fmt == "webp":
+            img.save(buffer, format="WEBP", quality=Config.THUMBNAIL_WEBP_QUALITY, method=4)
+        else:
+            img.save(buffer, format="PNG", optimize=False, compress_level=6)
+        return buffer.getvalue(), img.size
+
+
+def make_thumbnail(image_path: str, size: int = 100, fmt: str = "png") -> Tuple[bytes, Dict[str, Any]]:
+    """Return encoded thumbnail bytes and metadata, served from the disk cache when possible"""
+    fmt = fmt.lower()
+    if fmt not in THUMBNAIL_FORMATS:
+        raise ValueError(f"Unsupported thumbnail format '{fmt}', expected one of {sorted(THUMBNAIL_FORMATS)}")
+    if size <= 0:
+        raise ValueError("size must be positive")
+
+    key = cache_key(image_path, size, fmt)
+    cache_path = os.path.join(Config.THUMBNAIL_CACHE_DIR, f"{key}.{fmt}")
+    if os.path.exists(cache_path):
+        with open(cache_path, 'rb') as cached:
+            data = cached.read()
+        # Opening only parses the header, the pixels are not decoded
+        with PILImage.open(io.BytesIO(data)) as cached_image:
+            width, height = cached_image.size
+        return data, {
+            "path": image_path,
+            "thumbnail_path": cache_path,
+            "bytes": len(data),
+            "width": width,
+            "height": height,
+            "cached": True,
+        }
+
+    data, (width, height) = _encode_thumbnail(image_path, size, fmt)
+    os.makedirs(Config.THUMBNAIL_CACHE_DIR, exist_ok=True)
+    # Write then rename so concurrent readers never see a partial file, the
+    # temporary name is unique per call since threads share the process id
+    fd, tmp_path = tempfile.mkstemp(dir=Config.THUMBNAIL_CACHE_DIR, prefix=f"{key}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as tmp_file:
+            tmp_file.write(data)
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return data, {
+        "path": image_path,
+        "thumbnail_path": cache_path,
+        "bytes": len(data),
+        "width": width,
+        "height": height,
+        "cached": False,
+    }
+
+
+def make_thumbnails(image_paths: List[str], size: int = 100, fmt: str = "png") -> List[Dict[str, Any]]:
+    """Thumbnail many images on a thread pool (Pillow releases the GIL while decoding and resizing)"""
+    def one(image_path: str) -> Dict[str, Any]:
+        try:
+            _, meta = make_thumbnail(image_path, size, fmt)
+            return {"ok": True, **meta}
+        except Exception as e:
+            return {"ok": False, "path": image_path, "error": str(e)}
+
+    with ThreadPoolExecutor(max_workers=Config.THUMBNAIL_WORKERS) as executor:
+        return list(executor.map(one, image_paths))
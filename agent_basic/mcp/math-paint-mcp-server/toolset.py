@@ -0,0 +1,35 @@
+"""
+Mountable groups of MCP tools and resources.
+
+A tool module declares its tools with @toolset.tool() / @toolset.resource(uri)
+instead of binding them to a server at import time, and mcp_server mounts the
+groups it is configured with (Config.MCP_TOOLSETS) via toolset.register(mcp).
+"""
+from typing import Callable, List, Tuple
+
+
+class Toolset:
+    def __init__(self, name: str):
+        self.name = name
+        self.tools: List[Callable] = []
+        self.resources: List[Tuple[str, Callable]] = []
+
+    def tool(self):
+        """Same shape as FastMCP.tool(), the function is returned unchanged"""
+        def decorator(fn: Callable) -> Callable:
+            self.tools.append(fn)
+            return fn
+        return decorator
+
+    def resource(self, uri: str):
+        def decorator(fn: Callable) -> Callable:
+            self.resources.append((uri, fn))
+            return fn
+        return decorator
+
+    def register(self, mcp) -> None:
+        """Add all tools and resources of this group to a FastMCP server"""
+        for fn in self.tools:
+            mcp.tool()(fn)
+        for uri, fn in self.resources:
+            mcp.resource(uri)(fn)
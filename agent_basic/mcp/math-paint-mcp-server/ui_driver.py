@@ -0,0 +1,458 @@
+"""
+UI automation layer of the Microsoft Paint backend.
+
+PaintSession holds the Paint workflows (open, select a tool, drag a shape,
+type into a text box) on top of a UiDriver:
+- PywinautoDriver drives the real mspaint.exe on Windows
+- FakeDriver simulates Paint with configurable delays, so the wait strategy
+  can be exercised and benchmarked on any platform
+
+Instead of fixed sleeps, observable states (window shown, canvas ready,
+focus, maximized) are awaited with wait_until, which polls with exponential
+backoff and returns as soon as the state is reached. Everything here is
+blocking, the server runs it on a dedicated thread off the event loop.
+"""
+import logging
+import random
+import re
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, List, Optional, Tuple
+
+
+class UiTimeoutError(TimeoutError):
+    """Raised when a UI state is not reached within the wait timeout"""
+
+
+def wait_until(condition: Callable[[], bool], timeout: float, description: str,
+               initial_interval: float = 0.02, max_interval: float = 0.5, backoff: float = 2.0) -> float:
+    """
+    Poll condition until it returns a truthy value and return the seconds waited.
+    Exceptions raised by condition count as "not yet", the UI element may not exist.
+    """
+    started = time.monotonic()
+    interval = initial_interval
+    last_error = None
+    while True:
+        try:
+            if condition():
+                return time.monotonic() - started
+        except Exception as e:
+            last_error = e
+        remaining = timeout - (time.monotonic() - started)
+        if remaining <= 0:
+            detail = f" (last error: {last_error})" if last_error else ""
+            raise UiTimeoutError(f"Timed out after {timeout}s waiting for {description}{detail}")
+        time.sleep(min(interval, remaining))
+        interval = min(interval * backoff, max_interval)
+
+
+class UiDriver(ABC):
+    """Primitive window operations the Paint workflows are built from"""
+
+    @abstractmethod
+    def start(self):
+        ...
+
+    @abstractmethod
+    def window_ready(self) -> bool:
+        ...
+
+    @abstractmethod
+    def canvas_ready(self) -> bool:
+        ...
+
+    @abstractmethod
+    def has_focus(self) -> bool:
+        ...
+
+    @abstractmethod
+    def set_focus(self):
+        ...
+
+    @abstractmethod
+    def monitor_count(self) -> int:
+        ...
+
+    @abstractmethod
+    def screen_size(self) -> Tuple[int, int]:
+        ...
+
+    @abstractmethod
+    def move_window(self, x: int, y: int):
+        ...
+
+    @abstractmethod
+    def maximize(self):
+        ...
+
+    @abstractmethod
+    def is_maximized(self) -> bool:
+        ...
+
+    @abstractmethod
+    def window_rect(self) -> Tuple[int, int, int, int]:
+        ...
+
+    @abstractmethod
+    def click_window(self, x: int, y: int):
+        ...
+
+    @abstractmethod
+    def click_canvas(self, x: int, y: int):
+        ...
+
+    @abstractmethod
+    def press_canvas(self, x: int, y: int):
+        ...
+
+    @abstractmethod
+    def move_canvas(self, x: int, y: int):
+        ...
+
+    @abstractmethod
+    def release_canvas(self, x: int, y: int):
+        ...
+
+    @abstractmethod
+    def type_keys(self, keys: str):
+        ...
+
+    @abstractmethod
+    def type_text(self, text: str):
+        ...
+
+
+class PywinautoDriver(UiDriver):
+    """mspaint.exe driven through pywinauto and pywin32 (Windows only)"""
+
+    # Characters with a special meaning in pywinauto key sequences
+    SPECIAL_KEYS = re.compile(r"([{}+^%~()])")
+
+    def __init__(self, typing_pause: float = 0.02):
+        from pywinauto.application import Application
+        import win32api
+        import win32con
+        import win32gui
+        self._application_class = Application
+        self._win32api = win32api
+        self._win32con = win32con
+        self._win32gui = win32gui
+        self.typing_pause = typing_pause
+        self.app = None
+
+    @property
+    def window(self):
+        return self.app.window(class_name='MSPaintApp')
+
+    @property
+    def canvas(self):
+        return self.window.child_window(class_name='MSPaintView')
+
+    def start(self):
+        self.app = self._application_class().start('mspaint.exe')
+
+    def window_ready(self) -> bool:
+        window = self.window
+        return window.exists() and window.is_visible()
+
+    def canvas_ready(self) -> bool:
+        canvas = self.canvas
+        if canvas.exists() and canvas.is_visible():
+            logging.info(f"Canvas dimensions: {canvas.rectangle()}")
+            return True
+        return False
+
+    def has_focus(self) -> bool:
+        return self.window.has_focus()
+
+    def set_focus(self):
+        self.window.set_focus()
+
+    def monitor_count(self) -> int:
+        return self._win32api.GetSystemMetrics(self._win32con.SM_CMONITORS)
+
+    def screen_size(self) -> Tuple[int, int]:
+        return (self._win32api.GetSystemMetrics(self._win32con.SM_CXSCREEN),
+                self._win32api.GetSystemMetrics(self._win32con.SM_CYSCREEN))
+
+    def move_window(self, x: int, y: int):
+        self._win32gui.SetWindowPos(
+            self.window.handle,
+            self._win32con.HWND_TOP,
+            x, y,
+            0, 0,
+            self._win32con.SWP_NOSIZE
+        )
+
+    def maximize(self):
+        self._win32gui.ShowWindow(self.window.handle, self._win32con.SW_MAXIMIZE)
+
+    def is_maximized(self) -> bool:
+        placement = self._win32gui.GetWindowPlacement(self.window.handle)
+        return placement[1] == self._win32con.SW_SHOWMAXIMIZED
+
+    def window_rect(self) -> Tuple[int, int, int, int]:
+        return self._win32gui.GetWindowRect(self.window.handle)
+
+    def click_window(self, x: int, y: int):
+        self.window.click_input(coords=(x, y))
+
+    def click_canvas(self, x: int, y: int):
+        self.canvas.click_input(coords=(x, y))
+
+    def press_canvas(self, x: int, y: int):
+        self.canvas.press_mouse_input(coords=(x, y))
+
+    def move_canvas(self, x: int, y: int):
+        self.canvas.move_mouse_input(coords=(x, y))
+
+    def release_canvas(self, x: int, y: int):
+        self.canvas.release_mouse_input(coords=(x, y))
+
+    def type_keys(self, keys: str):
+        self.window.type_keys(keys)
+
+    def type_text(self, text: str):
+        # One escaped key sequence instead of a type_keys call per character
+        self.window.type_keys(
+            self.SPECIAL_KEYS.sub(r"{\1}", text),
+            with_spaces=True,
+            with_newlines=True,
+            pause=self.typing_pause
+        )
+
+
+class FakeDriver(UiDriver):
+    """
+    Simulated Paint window for Linux and benchmarks.
+
+    Each state change becomes observable only after its configured delay
+    (scaled by a random jitter), like a real application starting up. Input
+    calls block for input_delay and are recorded in `actions`.
+    """
+
+    def __init__(self, window_delay: float = 1.0, canvas_delay: float = 0.3, focus_delay: float = 0.1,
+                 maximize_delay: float = 0.2, input_delay: float = 0.0, jitter: float = 0.0,
+                 monitors: int = 1, screen: Tuple[int, int] = (1920, 1080), seed: Optional[int] = None):
+        self.window_delay = window_delay
+        self.canvas_delay = canvas_delay
+        self.focus_delay = focus_delay
+        self.maximize_delay = maximize_delay
+        self.input_delay = input_delay
+        self.jitter = jitter
+        self.monitors = monitors
+        self.screen = screen
+        self.actions: List[tuple] = []
+        self._random = random.Random(seed)
+        self._window_at = self._canvas_at = self._focus_at = self._maximized_at = None
+        self._position = (0, 0)
+
+    def _after(self, delay: float) -> float:
+        return time.monotonic() + delay * (1 + self._random.uniform(-self.jitter, self.jitter))
+
+    @staticmethod
+    def _reached(at: Optional[float]) -> bool:
+        return at is not None and time.monotonic() >= at
+
+    def _input(self, *action):
+        self.actions.append(action)
+        if self.input_delay:
+            time.sleep(self.input_delay)
+
+    def start(self):
+        self.actions.append(("start",))
+        self._window_at = self._after(self.window_delay)
+        self._canvas_at = self._window_at + self.canvas_delay
+        # A freshly started application gets the focus once its window shows
+        self._focus_at = self._window_at
+
+    def window_ready(self) -> bool:
+        return self._reached(self._window_at)
+
+    def canvas_ready(self) -> bool:
+        return self._reached(self._canvas_at)
+
+    def has_focus(self) -> bool:
+        return self._reached(self._focus_at)
+
+    def set_focus(self):
+        self.actions.append(("set_focus",))
+        self._focus_at = self._after(self.focus_delay)
+
+    def monitor_count(self) -> int:
+        return self.monitors
+
+    def screen_size(self) -> Tuple[int, int]:
+        return self.screen
+
+    def move_window(self, x: int, y: int):
+        self.actions.append(("move_window", x, y))
+        self._position = (x, y)
+
+    def maximize(self):
+        self.actions.append(("maximize",))
+        self._maximized_at = self._after(self.maximize_delay)
+
+    def is_maximized(self) -> bool:
+        return self._reached(self._maximized_at)
+
+    def window_rect(self) -> Tuple[int, int, int, int]:
+        x, y = self._position
+        return (x, y, x + self.screen[0], y + self.screen[1])
+
+    def click_window(self, x: int, y: int):
+        self._input("click_window", x, y)
+
+    def click_canvas(self, x: int, y: int):
+        self._input("click_canvas", x, y)
+
+    def press_canvas(self, x: int, y: int):
+        self._input("press_canvas", x, y)
+
+    def move_canvas(self, x: int, y: int):
+        self._input("move_canvas", x, y)
+
+    def release_canvas(self, x: int, y: int):
+        self._input("release_canvas", x, y)
+
+    def type_keys(self, keys: str):
+        self._input("type_keys", keys)
+
+    def type_text(self, text: str):
+        self._input("type_text", text)
+
+
+class PaintSession:
+    """
+    Paint workflows on top of a UiDriver.
+
+    Observable states are awaited with wait_until. Tool selection and mouse
+    input have no state to observe, so they are followed by a short settle
+    pause for Paint to process the input.
+    """
+
+    # Window-relative positions in the Paint ribbon
+    TEXT_TOOL = (650, 82)
+    SHAPES_GALLERY = (532, 82)
+    # Font size box of the Text tab, shown while a text box is active
+    FONT_SIZE_BOX = (265, 70)
+    # Click used to commit a text box
+    TEXT_COMMIT_POINT = (500, 500)
+    # Layouts are computed in canvas pixels, Paint takes font sizes in points (96 DPI)
+    PIXELS_PER_POINT = 96 / 72
+
+    def __init__(self, driver: UiDriver, timeout: float = 10.0, settle: float = 0.1,
+                 wait_options: Optional[dict] = None):
+        self.driver = driver
+        self.timeout = timeout
+        self.settle = settle
+        self.wait_options = wait_options or {}
+
+    def _wait(self, condition: Callable[[], bool], description: str) -> float:
+        waited = wait_until(condition, self.timeout, description, **self.wait_options)
+        logging.info(f"{description} reached after {waited:.3f}s")
+        return waited
+
+    def _pause(self):
+        if self.settle:
+            time.sleep(self.settle)
+
+    def open(self) -> int:
+        """Start Paint, place it maximized and verify the UI; returns the monitor count"""
+        driver = self.driver
+        driver.start()
+        self._wait(driver.window_ready, "Paint window")
+        self.ensure_focus()
+        self._wait(driver.canvas_ready, "Paint canvas")
+
+        monitor_count = driver.monitor_count()
+        logging.info(f"Total number of monitors: {monitor_count}")
+        if monitor_count > 1:
+            primary_width, _ = driver.screen_size()
+            target_x, target_y = primary_width + 100, 100
+            logging.info(f"Positioning Paint window at: x={target_x}, y={target_y}")
+            driver.move_window(target_x, target_y)
+
+        driver.maximize()
+        try:
+            self._wait(driver.is_maximized, "maximized Paint window")
+        except UiTimeoutError as e:
+            # Drawing still works on a restored window, only the coordinates may shift
+            logging.warning(str(e))
+
+        # Final verification - the ribbon and the canvas accept input
+        driver.click_window(*self.SHAPES_GALLERY)
+        self._pause()
+        driver.click_canvas(100, 100)
+        logging.info("Paint initialization complete and verified")
+        return monitor_count
+
+    def ensure_focus(self):
+        if not self.driver.has_focus():
+            logging.info("Setting Paint window focus")
+            self.driver.set_focus()
+            self._wait(self.driver.has_focus, "Paint window focus")
+        logging.info(f"Paint window rectangle: {self.driver.window_rect()}")
+
+    def select_rectangle_tool(self, toolbar_x: int, toolbar_y: int):
+        logging.info(f"Clicking rectangle tool at ({toolbar_x}, {toolbar_y})")
+        self.driver.click_window(toolbar_x, toolbar_y)
+        self._pause()
+
+    def drag_rectangle(self, x1: int, y1: int, x2: int, y2: int):
+        """Draw one rectangle with the rectangle tool already selected"""
+        driver = self.driver
+        driver.click_canvas(x1, y1)
+        driver.press_canvas(x1, y1)
+        driver.move_canvas(x2, y2)
+        driver.release_canvas(x2, y2)
+        self._pause()
+        logging.info("Rectangle drawing completed")
+
+    def select_text_tool(self):
+        # Reset to the selection tool first so no other mode is active
+        logging.info("Selecting Text tool")
+        self.driver.type_keys('s')
+        self.driver.click_window(*self.TEXT_TOOL)
+        self.driver.type_keys('t')
+        self._pause()
+
+    def set_font_size(self, font_size: int):
+        """Set the font size (canvas pixels) in the Text tab while a text box is active"""
+        points = max(1, round(font_size / self.PIXELS_PER_POINT))
+        logging.info(f"Setting font size to {points}pt ({font_size}px)")
+        self.driver.click_window(*self.FONT_SIZE_BOX)
+        self.driver.type_keys('^a')
+        self.driver.type_keys(f'{points}{{ENTER}}')
+        self._pause()
+
+    def type_text_box(self, text: str, x: int, y: int, width: int, height: int, font_size: int = 0):
+        """
+        Create a text box and type into it, with the text tool already selected.
+        font_size is in canvas pixels, 0 keeps Paint's current font size."""
+        driver = self.driver
+        logging.info("Creating text box")
+        driver.press_canvas(x, y)
+        driver.move_canvas(x + width, y + height)
+        driver.release_canvas(x + width, y + height)
+        self._pause()
+
+        if font_size:
+            self.set_font_size(font_size)
+
+        # Click inside the text box to ensure it's selected, then clear it
+        driver.click_canvas(x + width // 2, y + height // 2)
+        driver.type_keys('^a')
+        driver.type_keys('{BACKSPACE}')
+
+        logging.info(f"Typing text: {text}")
+        driver.type_text(text)
+
+        # Finalize the text by clicking outside
+        driver.click_canvas(*self.TEXT_COMMIT_POINT)
+        self._pause()
+
+    def select_selection_tool(self):
+        self.driver.type_keys('s')
+        self._pause()
@@ -0,0 +1,109 @@
+"""
+Process pool for CPU-heavy math tools.
+
+Big integer work runs in worker processes so a long factorial or Fibonacci call
+cannot block the FastMCP event loop (and with it every paint, email or other
+math call of every connected session). Each call gets a CPU-time limit:
+enforced with RLIMIT_CPU inside the worker where the resource module exists,
+and with a wall-clock timeout in the server everywhere. A call that overruns
+or is cancelled retires its pool (killing the workers on Python 3.14+) and the
+next call gets a fresh one. Calls that lose their worker to another call's
+limit are retried once on the fresh pool, never the call that hit the limit.
+"""
+import asyncio
+import logging
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Wall-clock allowance on top of the CPU limit (queueing, process start-up)
+WALL_TIMEOUT_FACTOR = 2.0
+WALL_TIMEOUT_SLACK = 5.0
+
+
+class CpuLimitExceeded(RuntimeError):
+    """Raised when a worker call runs past its CPU-time limit"""
+
+
+def _limited_call(fn: Callable, args: tuple, cpu_seconds: float) -> Any:
+    """Run fn(*args) inside a worker with a soft RLIMIT_CPU of cpu_seconds"""
+    if resource is None or not cpu_seconds:
+        return fn(*args)
+    previous_soft, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    # RLIMIT_CPU counts the whole lifetime of the worker, add this call's budget
+    soft = math.ceil(time.process_time() + cpu_seconds)
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+    try:
+        return fn(*args)
+    finally:
+        resource.setrlimit(resource.RLIMIT_CPU, (previous_soft, hard))
+
+
+class WorkerPool:
+    def __init__(self, max_workers: int, cpu_seconds: float):
+        self.max_workers = max_workers
+        self.cpu_seconds = cpu_seconds
+        self._pool = None
+        self.logger = logging.getLogger(__name__)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self.logger.info(f"Starting worker pool with {self.max_workers} processes")
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._pool
+
+    def _discard(self, pool: ProcessPoolExecutor):
+        """Retire a pool still running an abandoned call, the next call starts a fresh one"""
+        if self._pool is pool:
+            self._pool = None
+        if hasattr(pool, "kill_workers"):
+            # Python 3.14+
+            pool.kill_workers()
+        else:
+            # The abandoned call stops at its RLIMIT_CPU, its worker then exits with the pool
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    async def run(self, fn: Callable, *args: Any, cpu_seconds: float = None) -> Any:
+        """Run a picklable module-level function in a worker process"""
+        cpu_seconds = cpu_seconds or self.cpu_seconds
+        for attempt in range(2):
+            pool = self._get_pool()
+            submitted = time.monotonic()
+            future = pool.submit(_limited_call, fn, args, cpu_seconds)
+            try:
+                return await asyncio.wait_for(
+                    asyncio.wrap_future(future),
+                    timeout=cpu_seconds * WALL_TIMEOUT_FACTOR + WALL_TIMEOUT_SLACK
+                )
+            except asyncio.TimeoutError:
+                self._discard(pool)
+                raise CpuLimitExceeded(f"{fn.__name__} exceeded its {cpu_seconds}s time limit")
+            except asyncio.CancelledError:
+                if not future.cancel():
+                    self._discard(pool)
+                raise
+            except BrokenProcessPool:
+                self._discard(pool)
+                # A single-threaded call uses at most as much CPU as wall time. One
+                # that ran for less than its budget cannot have hit its RLIMIT_CPU,
+                # another call took the pool down, so it is retried once. Any other
+                # may be the call that hit its limit and would only hit it again
+                if time.monotonic() - submitted >= cpu_seconds:
+                    raise CpuLimitExceeded(f"{fn.__name__} exceeded its {cpu_seconds}s CPU limit")
+                if attempt:
+                    raise
+                self.logger.warning(f"Worker pool broke while running {fn.__name__}, retrying")
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
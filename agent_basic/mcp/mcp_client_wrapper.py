@@ -10,16 +10,8 @@ from mcp.client import ClientSession, StdioServerParameters, stdio_client
 from dotenv import load_dotenv
 # In mcp_client_wrapper.py
 from config import Config
-import traceback  # Add this for better error reporting
-
-
-class ExecutionHistory:
-    def __init__(self):
-        self.plan = None
-        self.steps = []
-        self.final_answer = None
-        self.user_query = None
-        self.tools_description = None
+from mcp.agent_engine import AgentEngine, ExecutionHistory
+from mcp.trace import TraceRecorder
 
 class MCPClientWrapper:
     def __init__(self):
@@ -28,7 +20,8 @@ class MCPClientWrapper:
         self.tools = []
         self.logger = logging.getLogger(__name__)
         self.model = None
-        self.execution_history = ExecutionHistory()
+        self.engine = None
+        self.recorder = None
         
         # Configure logging
         logging.basicConfig(
@@ -59,27 +52,6 @@ class MCPClientWrapper:
             self.logger.error(f"Error configuring Gemini API: {str(e)}")
             raise
             
-    async def generate_with_timeout(self, prompt, timeout=Config.TIMEOUT_SECONDS):
-        """Generate content with timeout using LLM"""
-        self.logger.info("Starting LLM generation...")
-        try:
-            loop = asyncio.get_event_loop()
-            response = await asyncio.wait_for(
-                loop.run_in_executor(
-                    None,
-                    lambda: self.model.generate_content(contents=prompt)
-                ),
-                timeout=timeout
-            )
-            self.logger.info("LLM generation completed")
-            return response
-        except asyncio.TimeoutError:
-            self.logger.error("LLM generation timed out!")
-            raise
-        except Exception as e:
-            self.logger.error(f"Error in LLM generation: {e}")
-            raise
-
     async def initialize(self):
         """Initialize MCP servers and tools"""
         try:
@@ -146,6 +118,12 @@ class MCPClientWrapper:
             # Combine tools
             self.tools = math_tools + gmail_tools
             self.logger.debug(f"Combined tools: {self.tools}")
+
+            if Config.TRACE_PATH:
+                self.logger.info(f"Recording agent trace to {Config.TRACE_PATH}")
+                self.recorder = TraceRecorder(Config.TRACE_PATH)
+                self.model = self.recorder.wrap_model(self.model)
+                self.tools = self.recorder.wrap_tools(self.tools)
             
             # Create tools description for LLM
             await self._create_tools_description()
@@ -158,97 +136,50 @@ class MCPClientWrapper:
             return False
             
     async def _create_tools_description(self):
-        """Create description of available tools for LLM"""
+        """Create the agent engine, which describes the available tools for the LLM"""
         try:
-            tools_description = []
-            for i, tool in enumerate(self.tools):
-                try:
-                    params = tool.inputSchema
-                    desc = getattr(tool, 'description', 'No description available')
-                    name = getattr(tool, 'name', f'tool_{i}')
-                    
-                    if 'properties' in params:
-                        param_details = []
-                        for param_name, param_info in params['properties'].items():
-                            param_type = param_info.get('type', 'unknown')
-                            param_details.append(f"{param_name}: {param_type}")
-                        params_str = ', '.join(param_details)
-                    else:
-                        params_str = 'no parameters'
-                        
-                    tool_desc = f"{i+1}. {name}({params_str}) - {desc}"
-                    tools_description.append(tool_desc)
-                except Exception as e:
-                    self.logger.error(f"Error processing tool {i}: {e}")
-                    tools_description.append(f"{i+1}. Error processing tool")
-                    
-            self.execution_history.tools_description = "\n".join(tools_description)
-            
+            self.engine = AgentEngine(self.model, self.tools, logger=self.logger)
         except Exception as e:
             self.logger.error(f"Error creating tools description: {e}")
-            self.execution_history.tools_description = "Error loading tools"
             
-    async def process_query(self, query: str) -> str:
-        """Process a query using LLM and available tools"""
+    async def process_query(self, query: str) -> tuple[str, ExecutionHistory]:
+        """
+        Process a query using LLM and available tools.
+        Returns the result text and the history of this run; concurrent queries
+        each get their own history."""
         try:
-            # Update execution history
-            self.execution_history.user_query = query
-            
-            # Create system prompt
-            system_prompt = Config.SYSTEM_PROMPT.format(
-                tools_description=self.execution_history.tools_description,
-                execution_history=self.execution_history
-            )
-            
-            # Generate plan
-            self.logger.info("Generating plan...")
-            plan_prompt = f"{system_prompt}"
-            plan_response = await self.generate_with_timeout(plan_prompt)
-            self.execution_history.plan = plan_response.text
-            
-            # Execute plan
-            self.logger.info("Executing plan...")
-            execution_prompt = f"{system_prompt}\n\nPlan: {self.execution_history.plan}\n\nExecute the plan:"
-            execution_response = await self.generate_with_timeout(execution_prompt)
-            
-            # Parse and execute tool calls
-            tool_calls = self._parse_tool_calls(execution_response.text)
-            for tool_call in tool_calls:
-                result = await self.execute_command(tool_call['name'], tool_call['params'])
-                self.execution_history.steps.append({
-                    'tool': tool_call['name'],
-                    'params': tool_call['params'],
-                    'result': result
-                })
-                
-            # Generate final answer
-            final_prompt = f"{system_prompt}\n\nResults: {self.execution_history.steps}\n\nProvide final answer:"
-            final_response = await self.generate_with_timeout(final_prompt)
-            self.execution_history.final_answer = final_response.text
-            
-            return self.execution_history.final_answer
+            if not self.engine:
+                self.engine = AgentEngine(self.model, self.tools, logger=self.logger)
+
+            if self.recorder:
+                self.recorder.record_run(query)
+
+            history = await self.engine.run(query)
+            if self.recorder:
+                self.recorder.flush()
+
+            if history.final_answer is None:
+                return f"Error processing query: {history.error}", history
+            return str(history.final_answer.get('result')), history
             
         except Exception as e:
             self.logger.error(f"Error processing query: {str(e)}")
-            return f"Error processing query: {str(e)}"
-            
-    def _parse_tool_calls(self, llm_response: str) -> list:
-        """Parse tool calls from LLM response"""
-        # Implement parsing logic based on your LLM's output format
-        # This is a placeholder implementation
-        tool_calls = []
-        # Add parsing logic here
-        return tool_calls
+            return f"Error processing query: {str(e)}", ExecutionHistory(user_query=query)
             
+    async def cleanup(self):
+        """Close the trace recorder, writing out the end of the trace"""
+        if self.recorder:
+            self.recorder.close()
+            self.recorder = None
+
     async def execute_command(self, command_name: str, params: dict = None) -> Any:
         """Execute a specific command with parameters"""
         try:
-            tool = next((t for t in self.tools if t.name == command_name), None)
-            if not tool:
-                raise ValueError(f"Tool {command_name} not found")
-                
+            if not self.engine:
+                raise ValueError("MCP client is not initialized")
+
             self.logger.info(f"Executing {command_name} with params: {params}")
-            result = await tool.execute(params or {})
+            result = await self.engine.call_tool(command_name, params or {})
             self.logger.info(f"Command result: {result}")
             return result
             
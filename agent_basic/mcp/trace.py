@@ -0,0 +1,377 @@
+"""
+Record/replay of agent runs.
+
+A trace is a JSONL file (optionally zstd compressed when the path ends with
+.zst) holding one event per line:
+
+    {"kind": "tools", "tools": [...]}                       tool list of the run
+    {"kind": "run", "t": ..., "query": ...}                  start of an agent run
+    {"kind": "llm", "t": ..., "elapsed": ..., "key": ..., "prompt": ..., "text": ...}
+    {"kind": "mcp", "t": ..., "elapsed": ..., "key": ..., "tool": ..., "arguments": ..., "result": ...}
+
+TraceRecorder wraps the Gemini model and the MCP sessions of a live run.
+TraceReplayer feeds the recorded responses back without touching Gemini,
+Gmail or Paint, either at the original pace or accelerated.
+
+Usage (offline benchmark of the engine code path):
+    python -m mcp.trace replay run.jsonl.zst --speed 0
+"""
+import argparse
+import asyncio
+import copy
+import hashlib
+import io
+import json
+import logging
+import threading
+import time
+from collections import deque
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TraceMismatchError(RuntimeError):
+    """Raised by a strict replay when a request has no matching recorded event"""
+
+
+def _open_trace(path: str, mode: str):
+    """Open a trace file for text reading/writing, using zstd for *.zst paths"""
+    if not path.endswith('.zst'):
+        return open(path, mode + 't', encoding='utf-8')
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError("zstandard is required for .zst traces (pip install zstandard)") from e
+    raw = open(path, mode + 'b')
+    if mode == 'w':
+        stream = zstandard.ZstdCompressor(level=10).stream_writer(raw, closefd=True)
+    else:
+        stream = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+    return io.TextIOWrapper(stream, encoding='utf-8')
+
+
+def read_trace(path: str) -> List[Dict[str, Any]]:
+    """Load all events of a trace file"""
+    with _open_trace(path, 'r') as trace_file:
+        return [json.loads(line) for line in trace_file if line.strip()]
+
+
+def prompt_key(prompt: Any) -> str:
+    """Stable key identifying an LLM prompt"""
+    return hashlib.sha1(str(prompt).encode('utf-8')).hexdigest()
+
+
+def tool_call_key(name: str, arguments: Optional[Dict[str, Any]]) -> str:
+    """Stable key identifying an MCP tool call"""
+    return f"{name}:{json.dumps(arguments or {}, sort_keys=True, default=str)}"
+
+
+def _dump_content(item: Any) -> Dict[str, Any]:
+    """Serialize one content item with its type and data"""
+    if hasattr(item, 'model_dump'):
+        data = item.model_dump(mode='json', exclude_none=True)
+    elif hasattr(item, 'text'):
+        data = {"type": getattr(item, 'type', 'text'), "text": item.text}
+    elif hasattr(item, '__dict__'):
+        data = {key: value for key, value in vars(item).items() if not key.startswith('_')}
+    else:
+        data = {"type": "text", "text": str(item)}
+    if 'text' not in data:
+        # Non-text items reach the prompt through str(), keep it so replayed prompts hash alike
+        data["str"] = str(item)
+    return data
+
+
+def _dump_result(result: Any) -> Dict[str, Any]:
+    """Serialize a CallToolResult (or anything else) to plain JSON"""
+    if isinstance(getattr(result, 'content', None), list):
+        data = {"content": [_dump_content(item) for item in result.content]}
+        if getattr(result, 'isError', False):
+            data["isError"] = True
+        return data
+    if hasattr(result, 'model_dump'):
+        return result.model_dump(mode='json', exclude_none=True)
+    return {"content": [{"type": "text", "text": str(result)}]}
+
+
+class ReplayContent(SimpleNamespace):
+    """Recorded content item, with the type, fields and str() of the original"""
+
+    def __str__(self) -> str:
+        recorded = self.__dict__.get('str')
+        return recorded if recorded is not None else super().__str__()
+
+
+def _load_result(data: Dict[str, Any]) -> SimpleNamespace:
+    """Rebuild an object exposing the CallToolResult attributes used by the client"""
+    content = []
+    for item in data.get('content', []):
+        item = dict(item)
+        item.setdefault('type', 'text' if 'text' in item else None)
+        content.append(ReplayContent(**item))
+    return SimpleNamespace(content=content, isError=data.get('isError', False))
+
+
+class TraceRecorder:
+    """Capture every LLM prompt/response and MCP request/response of a run"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = _open_trace(path, 'w')
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+
+    def _write(self, event: Dict[str, Any]):
+        line = json.dumps(event, default=str, separators=(',', ':'))
+        # LLM calls are recorded from executor threads, MCP calls from the loop
+        with self._lock:
+            self._file.write(line + '\n')
+
+    def record_tools(self, tools: list):
+        self._write({
+            "kind": "tools",
+            "tools": [
+                {
+                    "name": tool.name,
+                    "description": getattr(tool, 'description', None),
+                    "inputSchema": tool.inputSchema,
+                }
+                for tool in tools
+            ],
+        })
+
+    def record_run(self, query: str):
+        self._write({"kind": "run", "t": time.monotonic() - self._start, "query": query})
+        self.flush()
+
+    def flush(self):
+        """Push buffered events to disk, for zstd traces this ends a readable frame block"""
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+
+    def wrap_model(self, model: Any) -> "RecordingModel":
+        return RecordingModel(model, self)
+
+    def wrap_tools(self, tools: list) -> list:
+        """Record the tool list and route every tool's session through the recorder"""
+        self.record_tools(tools)
+        sessions = {}
+        wrapped = []
+        for tool in tools:
+            tool = copy.copy(tool)
+            session = getattr(tool, 'server_session', None)
+            if session is not None:
+                if id(session) not in sessions:
+                    sessions[id(session)] = RecordingSession(session, self)
+                tool.server_session = sessions[id(session)]
+            wrapped.append(tool)
+        return wrapped
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class RecordingModel:
+    """Proxy around a GenerativeModel that records generate_content calls"""
+
+    def __init__(self, model: Any, recorder: TraceRecorder):
+        self._model = model
+        self._recorder = recorder
+
+    def generate_content(self, contents: Any, **kwargs) -> Any:
+        started = time.monotonic()
+        event = {
+            "kind": "llm",
+            "t": started - self._recorder._start,
+            "key": prompt_key(contents),
+            "prompt": contents,
+        }
+        try:
+            response = self._model.generate_content(contents=contents, **kwargs)
+            event["text"] = response.text
+            return response
+        except Exception as e:
+            event["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            event["elapsed"] = time.monotonic() - started
+            self._recorder._write(event)
+
+
+class RecordingSession:
+    """Proxy around an MCP ClientSession that records call_tool requests"""
+
+    def __init__(self, session: Any, recorder: TraceRecorder):
+        self._session = session
+        self._recorder = recorder
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._session, name)
+
+    async def call_tool(self, name: str, arguments: Optional[Dict[str, Any]] = None) -> Any:
+        started = time.monotonic()
+        event = {
+            "kind": "mcp",
+            "t": started - self._recorder._start,
+            "key": tool_call_key(name, arguments),
+            "tool": name,
+            "arguments": arguments,
+        }
+        try:
+            result = await self._session.call_tool(name, arguments=arguments)
+            event["result"] = _dump_result(result)
+            return result
+        except Exception as e:
+            event["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            event["elapsed"] = time.monotonic() - started
+            self._recorder._write(event)
+
+
+class TraceReplayer:
+    """
+    Serve recorded responses back deterministically.
+
+    Responses are matched by request key so interleaved concurrent runs replay
+    correctly. speed=1 reproduces the recorded latencies, speed=10 replays ten
+    times faster and speed=0 removes all delays. With strict=False an
+    unmatched request consumes the next recorded event of the same kind.
+    """
+
+    def __init__(self, path_or_events: Any, speed: float = 1.0, strict: bool = True):
+        events = read_trace(path_or_events) if isinstance(path_or_events, str) else path_or_events
+        self.speed = speed
+        self.strict = strict
+        self.tool_specs = []
+        self.queries = []
+        self._pending = {"llm": deque(), "mcp": deque()}
+        self._lock = threading.Lock()
+        for event in events:
+            if event["kind"] == "tools":
+                self.tool_specs = event["tools"]
+            elif event["kind"] == "run":
+                self.queries.append(event["query"])
+            elif event["kind"] in self._pending:
+                self._pending[event["kind"]].append(event)
+
+    def _delay(self, event: Dict[str, Any]) -> float:
+        if not self.speed:
+            return 0.0
+        return event.get("elapsed", 0.0) / self.speed
+
+    def _take(self, kind: str, key: str) -> Dict[str, Any]:
+        with self._lock:
+            pending = self._pending[kind]
+            for index, event in enumerate(pending):
+                if event["key"] == key:
+                    del pending[index]
+                    return event
+            if pending and not self.strict:
+                return pending.popleft()
+        raise TraceMismatchError(f"No recorded {kind} event for request {key[:80]}")
+
+    def remaining(self) -> int:
+        return sum(len(pending) for pending in self._pending.values())
+
+    def model(self) -> "ReplayModel":
+        return ReplayModel(self)
+
+    def session(self) -> "ReplaySession":
+        return ReplaySession(self)
+
+    def tools(self) -> list:
+        """Rebuild the recorded tool list, bound to a replay session"""
+        session = self.session()
+        return [
+            SimpleNamespace(server_session=session, **spec)
+            for spec in self.tool_specs
+        ]
+
+
+class ReplayModel:
+    """Stand-in for GenerativeModel returning recorded responses"""
+
+    def __init__(self, replayer: TraceReplayer):
+        self._replayer = replayer
+
+    def generate_content(self, contents: Any, **kwargs) -> SimpleNamespace:
+        event = self._replayer._take("llm", prompt_key(contents))
+        # Called from an executor thread by the engine, a blocking sleep is fine
+        time.sleep(self._replayer._delay(event))
+        if "error" in event:
+            raise RuntimeError(event["error"])
+        return SimpleNamespace(text=event["text"])
+
+
+class ReplaySession:
+    """Stand-in for ClientSession returning recorded tool results"""
+
+    def __init__(self, replayer: TraceReplayer):
+        self._replayer = replayer
+
+    async def call_tool(self, name: str, arguments: Optional[Dict[str, Any]] = None) -> SimpleNamespace:
+        event = self._replayer._take("mcp", tool_call_key(name, arguments))
+        await asyncio.sleep(self._replayer._delay(event))
+        if "error" in event:
+            raise RuntimeError(event["error"])
+        return _load_result(event["result"])
+
+
+async def replay_run(path: str, query: str = None, speed: float = 0.0, runs: int = 1) -> dict:
+    """Replay a trace through AgentEngine and report wall-clock timings"""
+    from mcp.agent_engine import AgentEngine
+
+    events = read_trace(path)
+    if query is None:
+        query = next((e["query"] for e in events if e["kind"] == "run"), None)
+    if query is None:
+        raise ValueError("Trace has no recorded run, pass the query explicitly")
+
+    timings = []
+    for _ in range(runs):
+        replayer = TraceReplayer(events, speed=speed)
+        engine = AgentEngine(replayer.model(), replayer.tools())
+        started = time.perf_counter()
+        history = await engine.run(query)
+        timings.append(time.perf_counter() - started)
+    return {
+        "query": query,
+        "runs": runs,
+        "iterations": history.iterations,
+        "final_answer": history.final_answer,
+        "error": history.error,
+        "unconsumed_events": replayer.remaining(),
+        "best_seconds": min(timings),
+        "mean_seconds": sum(timings) / len(timings),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay a recorded agent trace')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    replay = subparsers.add_parser('replay', help='Replay a trace through AgentEngine')
+    replay.add_argument('trace', help='Trace file (.jsonl or .jsonl.zst)')
+    replay.add_argument('--speed', type=float, default=0.0,
+                        help='Replay speed factor, 1 = original pace, 0 = no delays')
+    replay.add_argument('--runs', type=int, default=1, help='Number of replays to time')
+    replay.add_argument('--query', default=None, help='Override the recorded user query')
+    args = parser.parse_args()
+
+    report = asyncio.run(replay_run(args.trace, args.query, args.speed, args.runs))
+    print(json.dumps(report, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The agent imports `config` and the local `mcp` package from agent_basic/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
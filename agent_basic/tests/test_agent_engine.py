@@ -0,0 +1,118 @@
+import asyncio
+import base64
+import threading
+from types import SimpleNamespace
+
+from mcp.agent_engine import AgentEngine
+
+
+def make_engine(*tools):
+    return AgentEngine(model=None, tools=list(tools))
+
+
+def make_tool(name, properties):
+    return SimpleNamespace(name=name, description=name,
+                           inputSchema={'properties': properties, 'required': list(properties)})
+
+
+def test_array_string_items_follow_declared_type():
+    engine = make_engine()
+    assert engine._convert_value({'type': 'array', 'items': {'type': 'integer'}}, '[1, 2, 3]') == [1, 2, 3]
+    assert engine._convert_value({'type': 'array', 'items': {'type': 'number'}}, '[1.5, 2]') == [1.5, 2.0]
+    assert engine._convert_value({'type': 'array', 'items': {'type': 'string'}}, '["a", b]') == ['a', 'b']
+
+
+def test_convert_arguments_fills_positionally():
+    tool = make_tool('add', {'a': {'type': 'integer'}, 'b': {'type': 'number'}})
+    engine = make_engine(tool)
+    assert engine.convert_arguments(tool, {'x': '2', 'y': '0.5'}) == {'a': 2, 'b': 0.5}
+
+
+def test_binary_content_is_summarized():
+    image = SimpleNamespace(type='image', data=base64.b64encode(b'\x89PNG' * 250).decode(), mimeType='image/png')
+    blob = SimpleNamespace(type='resource', resource=SimpleNamespace(uri='file:///a.bin', mimeType=None, blob='AAAA'))
+    text = SimpleNamespace(type='text', text='done')
+    result = SimpleNamespace(content=[text, image, blob])
+    assert AgentEngine.result_to_text(result) == [
+        'done',
+        '[image content: image/png, 1000 bytes]',
+        '[resource file:///a.bin content: unknown type, 3 bytes]',
+    ]
+
+
+class LoopingModel:
+    """Always asks for another tool call"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate_content(self, contents):
+        self.calls += 1
+        return SimpleNamespace(text='{"response_type": "function_call", '
+                                    '"function": {"name": "add_list", "parameters": {"numbers": "[1, 2]"}}}')
+
+
+class QueryScriptedModel:
+    """Answers each query from its own script, picked by the query in the prompt"""
+
+    def __init__(self, scripts):
+        self.scripts = {query: list(responses) for query, responses in scripts.items()}
+        self.prompts = {query: [] for query in scripts}
+        self.lock = threading.Lock()
+
+    def generate_content(self, contents):
+        query = next(query for query in self.scripts if query in contents)
+        with self.lock:
+            self.prompts[query].append(contents)
+            return SimpleNamespace(text=self.scripts[query].pop(0))
+
+
+class SlowSession:
+    async def call_tool(self, name, arguments=None):
+        # Yield to the other run between request and response
+        await asyncio.sleep(0.01)
+        return SimpleNamespace(content=[SimpleNamespace(type='text', text=str(sum(arguments['numbers'])))],
+                               isError=False)
+
+
+def add_list_tool(session):
+    return SimpleNamespace(name='add_list', description='Add numbers', server_session=session,
+                           inputSchema={'properties': {'numbers': {'type': 'array', 'items': {'type': 'integer'}}},
+                                        'required': ['numbers']})
+
+
+def test_every_run_gets_max_iterations():
+    model = LoopingModel()
+    engine = AgentEngine(model, [add_list_tool(SlowSession())], max_iterations=3)
+
+    for _ in range(2):
+        history = asyncio.run(engine.run('loop'))
+        assert history.iterations == 3 and len(history.steps) == 3
+        assert history.final_answer is None and 'MAX_ITERATIONS (3)' in history.error
+    assert model.calls == 6
+
+
+def test_concurrent_runs_keep_separate_histories():
+    def script(numbers, total):
+        return [
+            '{"response_type": "function_call", "function": {"name": "add_list", '
+            f'"parameters": {{"numbers": "{numbers}"}}}}}}',
+            '{"response_type": "function_call", "function": {"name": "add_list", '
+            f'"parameters": {{"numbers": "{numbers}"}}}}}}',
+            f'{{"response_type": "final_answer", "result": {total}}}',
+        ]
+
+    model = QueryScriptedModel({'query-alpha': script('[1, 2]', 3), 'query-beta': script('[10, 20]', 30)})
+    engine = AgentEngine(model, [add_list_tool(SlowSession())])
+
+    async def both():
+        return await asyncio.gather(engine.run('query-alpha'), engine.run('query-beta'))
+
+    alpha, beta = asyncio.run(both())
+
+    assert alpha.user_query == 'query-alpha' and alpha.final_answer['result'] == 3
+    assert beta.user_query == 'query-beta' and beta.final_answer['result'] == 30
+    assert [step['result'] for step in alpha.steps] == [['3'], ['3']]
+    assert [step['result'] for step in beta.steps] == [['30'], ['30']]
+    assert [step['step_number'] for step in alpha.steps] == [1, 2]
+    assert not any("'30'" in prompt for prompt in model.prompts['query-alpha'])
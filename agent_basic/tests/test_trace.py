@@ -0,0 +1,91 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from mcp.agent_engine import AgentEngine
+from mcp.trace import TraceRecorder, TraceReplayer, read_trace
+
+
+class ImageContent(SimpleNamespace):
+    """Shaped like mcp.types.ImageContent for the parts the trace uses"""
+
+    def model_dump(self, mode=None, exclude_none=False):
+        return dict(vars(self))
+
+    def __str__(self):
+        return f"type='image' data='{self.data}' mimeType='{self.mimeType}'"
+
+
+class FakeSession:
+    async def call_tool(self, name, arguments=None):
+        if name == 'draw':
+            return SimpleNamespace(content=[ImageContent(type='image', data='iVBORw0K', mimeType='image/png')],
+                                   isError=False)
+        return SimpleNamespace(content=[SimpleNamespace(type='text', text=str(sum(arguments['numbers'])))],
+                               isError=False)
+
+
+class ScriptedModel:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.prompts = []
+
+    def generate_content(self, contents):
+        self.prompts.append(contents)
+        return SimpleNamespace(text=self.responses.pop(0))
+
+
+RESPONSES = [
+    '{"response_type": "function_call", "function": {"name": "add_list", "parameters": {"numbers": "[1, 2]"}}}',
+    '{"response_type": "function_call", "function": {"name": "draw", "parameters": {}}}',
+    '{"response_type": "final_answer", "result": 3}',
+]
+
+
+def make_tools(session):
+    array = {'type': 'array', 'items': {'type': 'integer'}}
+    return [
+        SimpleNamespace(name='add_list', description='Add numbers', server_session=session,
+                        inputSchema={'properties': {'numbers': array}, 'required': ['numbers']}),
+        SimpleNamespace(name='draw', description='Draw', server_session=session,
+                        inputSchema={'properties': {}}),
+    ]
+
+
+@pytest.mark.parametrize('suffix', ['.jsonl', '.jsonl.zst'])
+def test_record_replay_round_trip(tmp_path, suffix):
+    if suffix.endswith('.zst'):
+        pytest.importorskip('zstandard')
+    path = str(tmp_path / f'run{suffix}')
+    model = ScriptedModel(RESPONSES)
+
+    with TraceRecorder(path) as recorder:
+        engine = AgentEngine(recorder.wrap_model(model), recorder.wrap_tools(make_tools(FakeSession())))
+        recorder.record_run('add and draw')
+        history = asyncio.run(engine.run('add and draw'))
+    assert history.final_answer['result'] == 3
+
+    replayer = TraceReplayer(path, speed=0)
+    replay_model = replayer.model()
+    # Strict replay: the prompt after the image step must hash like the recorded one
+    replayed = asyncio.run(AgentEngine(replay_model, replayer.tools()).run(replayer.queries[0]))
+    assert replayed.final_answer == history.final_answer
+    assert replayed.steps == history.steps
+    assert replayer.remaining() == 0
+
+    image = [event for event in read_trace(path) if event.get('tool') == 'draw'][0]['result']['content'][0]
+    assert image['type'] == 'image' and image['mimeType'] == 'image/png'
+
+
+def test_flushed_runs_are_readable_before_close(tmp_path):
+    pytest.importorskip('zstandard')
+    path = str(tmp_path / 'run.jsonl.zst')
+    recorder = TraceRecorder(path)
+    recorder.record_run('first')
+    recorder.record_run('second')
+    try:
+        assert [event['query'] for event in read_trace(path)] == ['first', 'second']
+    finally:
+        recorder.close()
+    recorder.close()